@@ -1,4 +1,11 @@
 from .mav_device import MAVDevice as MAVDevice
+from .mav_async import AsyncMAVDevice as AsyncMAVDevice
+from .mav_recorder import TelemetryLog as TelemetryLog
+from .mav_replay import ReplayEngine as ReplayEngine
+from .mav_metrics import metrics as metrics
+from .mav_history import History as History
+from .mav_clock import ClockSync as ClockSync
+from .mav_clock import clock as clock
 
 from mavcore import messages as messages
 from mavcore import protocols as protocols
@@ -0,0 +1,106 @@
+"""
+Compares one thread per listener against the shared Dispatcher pool.
+Does not need a SITL, messages are injected straight into a Receiver.
+
+python -m mavcore.dev.dispatcher_benchmark
+"""
+
+import threading
+import time
+
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.mav_dispatcher import Dispatcher
+from mavcore.mav_receiver import Receiver
+from mavcore.messages import Attitude
+
+LISTENER_COUNTS = [1, 10, 30, 100]
+MODES = {"thread per listener": None, "dispatcher (4 workers)": 4}
+NUM_MESSAGES = 100
+RATE_HZ = 40.0
+IDLE_SECONDS = 1.0
+
+
+class SeqAttitude(Attitude):
+    """
+    Attitude that also keeps time_boot_ms, used as a sequence number to check ordering.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.seq = -1
+
+    def decode(self, msg):
+        super().decode(msg)
+        self.seq = msg.time_boot_ms
+
+
+def run(num_listeners: int, workers: int | None) -> dict:
+    base_threads = threading.active_count()
+    dispatcher = Dispatcher(workers) if workers is not None else None
+    receiver = Receiver(dispatcher=dispatcher)
+    receiver.start_receiving()
+
+    counts = {"delivered": 0, "out_of_order": 0}
+    count_lock = threading.Lock()
+    last_seq: dict[int, int] = {}
+
+    def callback(msg):
+        with count_lock:
+            counts["delivered"] += 1
+            if msg.seq <= last_seq.get(id(msg), -1):
+                counts["out_of_order"] += 1
+            last_seq[id(msg)] = msg.seq
+
+    listeners = []
+    for _ in range(num_listeners):
+        listener = SeqAttitude()
+        listener.callback_func = callback
+        listeners.append(receiver.add_listener(listener))
+
+    threads = threading.active_count() - base_threads
+
+    cpu_start = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    idle_cpu_ms = (time.process_time() - cpu_start) * 1000.0 / IDLE_SECONDS
+
+    start = time.time()
+    for i in range(NUM_MESSAGES):
+        msg = dialect.MAVLink_attitude_message(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        receiver.update_queue(time.time(), msg)
+        time.sleep(1.0 / RATE_HZ)
+    expected = NUM_MESSAGES * num_listeners
+    deadline = time.time() + 2.0
+    while counts["delivered"] < expected and time.time() < deadline:
+        time.sleep(0.01)
+    elapsed = time.time() - start
+
+    receiver.stop_receiving()
+    for listener in listeners:
+        listener.stop_callback_thread()
+    if dispatcher is not None:
+        dispatcher.stop()
+
+    return {
+        "threads": threads,
+        "idle_cpu_ms_per_s": idle_cpu_ms,
+        "delivered": counts["delivered"],
+        "expected": expected,
+        "out_of_order": counts["out_of_order"],
+        "elapsed_s": elapsed,
+    }
+
+
+if __name__ == "__main__":
+    print(
+        f"{'mode':<24}{'listeners':>10}{'threads':>9}{'idle cpu ms/s':>15}{'delivered':>16}{'out of order':>14}"
+    )
+    for mode, workers in MODES.items():
+        for num_listeners in LISTENER_COUNTS:
+            res = run(num_listeners, workers)
+            delivered = f"{res['delivered']}/{res['expected']}"
+            print(
+                f"{mode:<24}{num_listeners:>10}{res['threads']:>9}{res['idle_cpu_ms_per_s']:>15.1f}"
+                f"{delivered:>16}{res['out_of_order']:>14}",
+                flush=True,
+            )
@@ -0,0 +1,44 @@
+import time
+import mavcore
+import mavcore.messages as messages
+import mavcore.protocols as protocols
+
+RATE_HZ = 200.0
+DURATION_S = 10.0
+
+device = mavcore.MAVDevice("udp:127.0.0.1:14550")
+
+imu = device.add_listener(messages.RawIMU())
+att = device.add_listener(messages.AttitudeQuat())
+local_pos = device.add_listener(messages.LocalPositionNED())
+
+# Throttled copy of the same stream, should decode at most 10 hz
+slow_pos = messages.LocalPositionNED()
+slow_pos.set_max_rate(10.0)
+device.add_listener(slow_pos)
+
+for msg_id in (
+    messages.IntervalMessageID.RAW_IMU,
+    messages.IntervalMessageID.ATTITUDE_QUATERNION,
+    messages.IntervalMessageID.LOCAL_POSITION_NED,
+):
+    device.run_protocol(protocols.RequestMessageProtocol(msg_id, rate_hz=RATE_HZ))
+
+time.sleep(2.0)
+for listener in (imu, att, local_pos, slow_pos):
+    listener.reset_delivery_stats()
+
+time.sleep(DURATION_S)
+
+for name, listener in (
+    ("RAW_IMU", imu),
+    ("ATTITUDE_QUATERNION", att),
+    ("LOCAL_POSITION_NED", local_pos),
+    ("LOCAL_POSITION_NED (10 hz max)", slow_pos),
+):
+    stats = listener.get_delivery_stats()
+    print(
+        f"{name}: {listener.get_hz()} hz, received {stats['received']}, delivered {stats['delivered']}, "
+        f"dropped {stats['dropped']}, throttled {stats['throttled']}",
+        flush=True,
+    )
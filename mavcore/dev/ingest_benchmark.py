@@ -0,0 +1,102 @@
+"""
+Compares CPU time to ingest a typical autopilot stream with recv_match (decodes everything)
+and with Ingest (decodes only subscribed types). No flight controller needed, the stream is generated.
+
+python -m mavcore.dev.ingest_benchmark
+"""
+
+import os
+import tempfile
+import time
+
+import pymavlink.dialects.v20.all as dialect
+import pymavlink.mavutil as utility
+
+from mavcore.mav_ingest import Ingest
+from mavcore.mav_receiver import Receiver
+from mavcore.messages import LocalPositionNED
+
+DURATION_S = 60.0  # seconds of simulated telemetry
+
+# (rate hz, factory) roughly what ArduCopter sends with SR0 streams at 10 hz plus a few fast ones
+STREAMS = [
+    (1, lambda m, t: m.heartbeat_encode(2, 3, 81, 4, 3)),
+    (50, lambda m, t: m.attitude_encode(t, 0.1, 0.2, 0.3, 0.0, 0.0, 0.0)),
+    (50, lambda m, t: m.attitude_quaternion_encode(t, 1, 0, 0, 0, 0, 0, 0)),
+    (50, lambda m, t: m.local_position_ned_encode(t, 1.0, 2.0, -3.0, 0, 0, 0)),
+    (50, lambda m, t: m.raw_imu_encode(t * 1000, 1, 2, 3, 4, 5, 6, 7, 8, 9)),
+    (50, lambda m, t: m.scaled_imu2_encode(t, 1, 2, 3, 4, 5, 6, 7, 8, 9)),
+    (10, lambda m, t: m.global_position_int_encode(t, 1, 2, 3, 4, 0, 0, 0, 0)),
+    (10, lambda m, t: m.vfr_hud_encode(1.0, 1.0, 90, 50, 3.0, 0.1)),
+    (10, lambda m, t: m.servo_output_raw_encode(t, 0, *[1500] * 8)),
+    (10, lambda m, t: m.rc_channels_encode(t, 8, *[1500] * 18, 255)),
+    (10, lambda m, t: m.nav_controller_output_encode(0, 0, 0, 0, 0, 0, 0, 0)),
+    (
+        5,
+        lambda m, t: m.sys_status_encode(0, 0, 0, 500, 12000, 10, 90, 0, 0, 0, 0, 0, 0),
+    ),
+    (5, lambda m, t: m.gps_raw_int_encode(t * 1000, 3, 1, 2, 3, 100, 100, 0, 0, 12)),
+    (5, lambda m, t: m.ekf_status_report_encode(0, 0.1, 0.1, 0.1, 0.1, 0.1)),
+    (5, lambda m, t: m.vibration_encode(t * 1000, 0.1, 0.1, 0.1, 0, 0, 0)),
+    (2, lambda m, t: m.battery_status_encode(0, 0, 0, 2500, [4000] * 10, 10, 0, 0, 90)),
+    (2, lambda m, t: m.system_time_encode(t * 1000, t)),
+]
+
+
+def generate_stream(path: str) -> int:
+    mav = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    mav.robust_parsing = True
+    count = 0
+    with open(path, "wb") as f:
+        for tick in range(int(DURATION_S * 50)):
+            t_ms = tick * 20
+            for rate, make in STREAMS:
+                if tick % (50 // rate) == 0:
+                    f.write(make(mav, t_ms).pack(mav))
+                    count += 1
+    return count
+
+
+def bench_recv_match(path: str) -> tuple[float, int]:
+    connection = utility.mavlink_connection(path, notimestamps=True)
+    receiver = Receiver()
+    start = time.process_time()
+    decoded = 0
+    while True:
+        msg = connection.recv_match()
+        if msg is None:
+            break
+        receiver.update_queue(time.time(), msg)
+        decoded += 1
+    return time.process_time() - start, decoded
+
+
+def bench_ingest(path: str) -> tuple[float, int]:
+    connection = utility.mavlink_connection(path, notimestamps=True)
+    receiver = Receiver()
+    receiver.add_listener(LocalPositionNED())
+    ingest = Ingest(connection, receiver)
+    start = time.process_time()
+    while True:
+        data = connection.recv(4096)
+        if not data:
+            break
+        ingest.feed(data, time.time())
+    return time.process_time() - start, ingest.frames_decoded
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stream.raw")
+        frames = generate_stream(path)
+        size = os.path.getsize(path)
+        print(
+            f"{frames} frames, {size / 1024:.0f} KiB, {DURATION_S:.0f} s of telemetry"
+        )
+        for name, bench in (("recv_match", bench_recv_match), ("ingest", bench_ingest)):
+            cpu, decoded = bench(path)
+            print(
+                f"{name}: {decoded} decoded, {cpu * 1000:.0f} ms cpu, "
+                f"{cpu / DURATION_S * 100:.2f}% of one core at real time rate",
+                flush=True,
+            )
@@ -17,6 +17,7 @@ device.run_protocol(request_local_pos)
 
 imu = messages.RawIMU()
 device.add_listener(imu)
+imu_history = device.enable_history("RAW_IMU", capacity=1000, fields=["xacc", "yacc", "zacc"])
 
 request_imu = protocols.RequestMessageProtocol(messages.IntervalMessageID.RAW_IMU, rate_hz=50.0)
 device.run_protocol(request_imu)
@@ -48,13 +49,11 @@ device.run_protocol(dive)
 request_brake = protocols.SetModeProtocol(messages.FlightMode.BRAKE)
 device.run_protocol(request_brake)
 
-highest = 0.0
-i = 1000
+dive_start = time.time()
+time.sleep(10)
 
-while i > 0:
-    gs = np.linalg.norm([imu.xac, imu.yac, imu.zac])
-    if gs > highest:
-        highest = gs
-    i -= 1
-    time.sleep(0.01)
+# Every sample of the dive, not just the ones a polling loop happens to see
+samples = imu_history.between(dive_start, time.time())
+gs = np.linalg.norm(np.stack([samples["xacc"], samples["yacc"], samples["zacc"]]).astype(np.float64), axis=0)
+highest = gs.max() if len(gs) else 0.0
 print(f"highest G: {highest}", flush=True)
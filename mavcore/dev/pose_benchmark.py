@@ -0,0 +1,200 @@
+"""
+Times the Pose operations FullPose runs per sample and per query against building scipy Rotation / Slerp
+objects for each one (how Pose worked before it kept the raw quaternion), and checks both give the same
+numbers, then compares FullPose prediction past the newest pose (velocity and body rates) with extrapolating
+the last two poses on a simulated circular flight. No flight controller needed.
+
+python -m mavcore.dev.pose_benchmark
+"""
+
+import timeit
+
+import numpy as np
+from scipy.spatial.transform import Rotation, Slerp
+
+from mavcore.messages import FullPose
+from mavcore.types import Pose
+
+REPEAT = 20000
+RATE = 30.0  # Hz of the simulated LOCAL_POSITION_NED / ATTITUDE_QUATERNION streams
+
+
+def scipy_from_array(position, quat):
+    return position, Rotation.from_quat(quat, scalar_first=True)
+
+
+def scipy_interpolate(a, b, proportion):
+    position = a[0] + proportion * (b[0] - a[0])
+    if 0 <= proportion <= 1:
+        return position, Slerp([0, 1], Rotation.concatenate([a[1], b[1]]))(proportion)
+    relative = b[1] * a[1].inv()
+    return position, Rotation.from_rotvec(relative.as_rotvec() * proportion) * a[1]
+
+
+def scipy_as_quat(pose):
+    quat = pose[1].as_quat()
+    return np.array([quat[3], quat[0], quat[1], quat[2]])
+
+
+def per_call_us(func) -> float:
+    return min(timeit.repeat(func, number=REPEAT, repeat=3)) / REPEAT * 1e6
+
+
+def check(rng: np.random.Generator, samples: int = 2000) -> tuple[float, float]:
+    """
+    Largest position (m) and rotation (rad) difference between the two implementations.
+    """
+    worst_position = 0.0
+    worst_rotation = 0.0
+    for _ in range(samples):
+        pa, pb = rng.normal(size=3), rng.normal(size=3)
+        qa, qb = rng.normal(size=4), rng.normal(size=4)
+        proportion = rng.uniform(-1.0, 2.0)
+        ref = scipy_interpolate(
+            scipy_from_array(pa, qa), scipy_from_array(pb, qb), proportion
+        )
+        pose = Pose.from_array(pa, qa).interpolate(Pose.from_array(pb, qb), proportion)
+        worst_position = max(worst_position, np.abs(ref[0] - pose.position).max())
+        worst_rotation = max(worst_rotation, (ref[1].inv() * pose.rotation).magnitude())
+    return worst_position, worst_rotation
+
+
+def feed(fp: FullPose, t: float, position_ned, velocity_ned, quat_wxyz, rates):
+    """
+    One LOCAL_POSITION_NED and ATTITUDE_QUATERNION sample at autopilot time t (s), received at 1000 + t.
+    """
+    fp.attitude.time_boot_ms = fp.local_position.time_boot_ms = int(round(t * 1000))
+    received = 1000.0 + t
+    fp.attitude.timestamp = fp.local_position.timestamp = received
+    fp.attitude.w, fp.attitude.x, fp.attitude.y, fp.attitude.z = quat_wxyz
+    fp.attitude.rollspeed, fp.attitude.pitchspeed, fp.attitude.yawspeed = rates
+    fp.local_position.x, fp.local_position.y, fp.local_position.z = position_ned
+    fp.local_position.vx, fp.local_position.vy, fp.local_position.vz = velocity_ned
+    fp.attitude.publish(received)
+    fp.local_position.publish(received)
+    fp.attitude_callback(None)
+    fp.pose_callback(None)
+
+
+def full_pose(rng: np.random.Generator) -> FullPose:
+    """
+    A FullPose with a full buffer of random 30 Hz poses.
+    """
+    fp = FullPose()
+    for i in range(fp.buffer_size):
+        quat = Rotation.random(random_state=i).as_quat(scalar_first=True)
+        feed(fp, i / RATE, rng.normal(size=3), rng.normal(size=3), quat, np.zeros(3))
+    return fp
+
+
+def circle(t: float, radius: float = 10.0, speed: float = 5.0):
+    """
+    Truth of a flight around a circle facing along the path with a slow roll wobble: NED position and
+    velocity, attitude (w, x, y, z) and body rates.
+    """
+    rate = speed / radius
+    position = [radius * np.cos(rate * t), radius * np.sin(rate * t), -20.0]
+    velocity = [-speed * np.sin(rate * t), speed * np.cos(rate * t), 0.0]
+    yaw = rate * t + np.pi / 2
+    roll = 0.2 * np.sin(2.0 * t)
+    quat = Rotation.from_euler("ZX", [yaw, roll]).as_quat(scalar_first=True)
+    # body rates of yaw about world down followed by roll about body x
+    rates = [0.4 * np.cos(2.0 * t), rate * np.sin(roll), rate * np.cos(roll)]
+    return position, velocity, quat, rates
+
+
+def prediction_errors(
+    ahead: float, samples: int = 300
+) -> tuple[float, float, float, float]:
+    """
+    Mean position (m) and rotation (rad) error of a pose queried ahead seconds past the newest one:
+    FullPose prediction and extrapolation of the last two poses.
+    """
+    fp = FullPose()
+    errors = np.zeros(4)
+    for i in range(samples):
+        # whole milliseconds like time_boot_ms, so receive time - boot time is exact
+        t = round(i / RATE, 3)
+        feed(fp, t, *circle(t))
+        if i < 10:
+            continue
+        query = fp.timestamp + ahead
+        position, _, quat, _ = circle(query - 1000.0)
+        truth = Rotation.from_quat(quat, scalar_first=True)
+        enu = np.array([position[1], position[0], -position[2]])
+        for column, pose in (
+            (0, fp.get_local_position(query)),
+            (2, fp.pose_buffer.at(query)),
+        ):
+            errors[column] += np.linalg.norm(pose.position - enu)
+            errors[column + 1] += (truth.inv() * pose.rotation).magnitude()
+    return tuple(errors / (samples - 10))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    position_error, rotation_error = check(rng)
+    print(
+        f"max difference to scipy: position {position_error:.1e} m, rotation {rotation_error:.1e} rad"
+    )
+
+    pa, pb = rng.normal(size=3), rng.normal(size=3)
+    qa, qb = rng.normal(size=4), rng.normal(size=4)
+    qa, qb = qa / np.linalg.norm(qa), qb / np.linalg.norm(qb)
+    sa, sb = scipy_from_array(pa, qa), scipy_from_array(pb, qb)
+    a, b = Pose.from_array(pa, qa), Pose.from_array(pb, qb)
+    a.as_euler()
+
+    cases = [
+        (
+            "from_array",
+            lambda: scipy_from_array(pa, qa),
+            lambda: Pose.from_array(pa, qa),
+        ),
+        (
+            "interpolate",
+            lambda: scipy_interpolate(sa, sb, 0.4),
+            lambda: a.interpolate(b, 0.4),
+        ),
+        (
+            "extrapolate",
+            lambda: scipy_interpolate(sa, sb, 1.3),
+            lambda: a.interpolate(b, 1.3),
+        ),
+        ("as_quat", lambda: scipy_as_quat(sa), lambda: a.as_quat()),
+        (
+            "as_euler (repeated)",
+            lambda: sa[1].as_euler("zyx", degrees=True),
+            lambda: a.as_euler(),
+        ),
+    ]
+    print(f"{'operation':<28}{'scipy us':>10}{'Pose us':>10}{'speedup':>10}")
+    for name, scipy_func, pose_func in cases:
+        before = per_call_us(scipy_func)
+        after = per_call_us(pose_func)
+        print(f"{name:<28}{before:>10.2f}{after:>10.2f}{before / after:>9.1f}x")
+
+    print(
+        f"{'ahead ms':<10}{'predicted m':>14}{'rad':>10}{'two pose m':>14}{'rad':>10}"
+    )
+    for ahead in (0.01, 0.033, 0.1, 0.2):
+        errors = prediction_errors(ahead)
+        print(
+            f"{ahead * 1000:<10.0f}{errors[0]:>14.4f}{errors[1]:>10.5f}{errors[2]:>14.4f}{errors[3]:>10.5f}"
+        )
+
+    fp = full_pose(rng)
+    timestamps = fp.pose_buffer.timestamps()
+    queries = rng.uniform(timestamps[0], timestamps[-1] + 0.1, 1000)
+    print(
+        f"FullPose.get_local_position(t): {per_call_us(lambda: fp.get_local_position(queries[0])):.1f} us, "
+        f"get_local_positions of {len(queries)}: "
+        f"{per_call_us(lambda: fp.get_local_positions(queries)) / 1000:.2f} ms"
+    )
+    ahead = timestamps[-1] + 0.05
+    print(
+        f"FullPose.get_local_position(newest + 50 ms): {per_call_us(lambda: fp.get_local_position(ahead)):.1f} us"
+    )
+    print(
+        f"FullPose.pose_callback: {per_call_us(lambda: fp.pose_callback(None)):.1f} us"
+    )
@@ -0,0 +1,125 @@
+"""
+Measures setpoint latency on a saturated 57600 baud telemetry radio, with and without outbound priorities.
+The radio is emulated: bytes leave at the baud rate, and writes only block once the 4 KB OS serial buffer is full.
+Latency is measured until the last byte of the setpoint is on the wire.
+
+python -m mavcore.dev.priority_latency_benchmark
+"""
+
+import random
+import threading
+import time
+
+import numpy as np
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.mav_bandwidth import LinkBudget
+from mavcore.mav_sender import Sender
+from mavcore.messages import SetpointVelocity, StatusText, MAVSeverity
+from mavcore.messages.rtk_msg import RTKData
+
+BAUD_RATE = 57600
+DURATION_S = 5.0
+SETPOINT_HZ = 20.0
+RTK_BYTES_PER_S = (
+    4000  # multi constellation RTCM, enough to saturate the radio with the rest
+)
+STATUS_TEXT_HZ = 5.0
+OS_BUFFER_BYTES = 4096
+
+
+class EmulatedRadio:
+    """
+    Connection stand in for Sender. Bytes take 10 bits / baud seconds each on the wire (8N1 framing)
+    and queue up in an OS buffer of buffer_bytes before that. Writes block while the buffer is full.
+    """
+
+    def __init__(self, baud_rate: int, buffer_bytes: int):
+        self.baud_rate = baud_rate
+        self.buffer_bytes = buffer_bytes
+        self.portdead = False
+        self.source_system = 255
+        self.mav = dialect.MAVLink(self, srcSystem=255, srcComponent=0)
+        self.bytes_written = 0
+        self.wire_free_at = time.time()  # when the last written byte will have left
+
+    def write(self, buf):
+        byte_time = 10.0 / self.baud_rate
+        now = time.time()
+        buffered = max(0.0, self.wire_free_at - now) / byte_time
+        overflow = buffered + len(buf) - self.buffer_bytes
+        if overflow > 0:
+            time.sleep(overflow * byte_time)
+            now = time.time()
+        self.wire_free_at = max(self.wire_free_at, now) + len(buf) * byte_time
+        self.bytes_written += len(buf)
+
+
+def run(prioritize: bool, paced: bool) -> dict:
+    radio = EmulatedRadio(BAUD_RATE, OS_BUFFER_BYTES)
+    budget = LinkBudget(BAUD_RATE) if paced else None
+    sender = Sender(1, 1, radio, prioritize=prioritize, budget=budget)
+    latencies: list[float] = []
+    stop = threading.Event()
+
+    def send_bulk():
+        seq = 0
+        next_rtk = time.time()
+        next_text = time.time()
+        while not stop.is_set():
+            now = time.time()
+            if now >= next_rtk:
+                # RTCM corrections arrive in bursts of full 180 byte fragments once a second
+                for frag in range(max(1, RTK_BYTES_PER_S // 180)):
+                    payload = [random.randrange(256) for _ in range(180)]
+                    sender.send_msg(RTKData(True, frag % 4, seq % 32, payload))
+                seq += 1
+                next_rtk += 1.0
+            if now >= next_text:
+                sender.send_msg(StatusText("companion status ok", MAVSeverity.INFO))
+                next_text += 1.0 / STATUS_TEXT_HZ
+            time.sleep(0.005)
+
+    bulk_thread = threading.Thread(target=send_bulk, daemon=True)
+    bulk_thread.start()
+
+    boot_time_ms = int(time.time() * 1000)
+    start = time.time()
+    while time.time() - start < DURATION_S:
+        setpoint = SetpointVelocity(1, 1, boot_time_ms, 1.0, 0.0, 0.0)
+        submitted = time.time()
+        handle = sender.send_msg(setpoint)
+        # Done callbacks run on the writer thread right after the write, so wire_free_at is this frame's
+        handle.add_done_callback(
+            lambda h, t=submitted: latencies.append(radio.wire_free_at - t)
+        )
+        time.sleep(1.0 / SETPOINT_HZ)
+
+    stop.set()
+    bulk_thread.join()
+    elapsed = time.time() - start
+    # Only count what made it onto the wire, not what is still sitting in the OS buffer
+    still_buffered = max(0.0, radio.wire_free_at - time.time()) * BAUD_RATE / 10.0
+    bytes_sent = radio.bytes_written - still_buffered
+    sender.flush()
+    sender.writer.stop()
+    sender.scheduler.stop()
+
+    ms = np.array(latencies) * 1000.0
+    return {
+        "setpoints": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "link_utilization": bytes_sent * 10.0 / BAUD_RATE / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    for prioritize, paced in ((False, False), (True, False), (True, True)):
+        res = run(prioritize, paced)
+        print(
+            f"prioritize={prioritize} paced={paced}: {res['setpoints']} setpoints, latency p50 {res['p50_ms']:.1f} ms, "
+            f"p99 {res['p99_ms']:.1f} ms, max {res['max_ms']:.1f} ms, link utilization {res['link_utilization']:.0%}",
+            flush=True,
+        )
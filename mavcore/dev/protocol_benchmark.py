@@ -0,0 +1,73 @@
+"""
+Times the protocols against a SimVehicle and load tests the setpoint path. No SITL needed.
+
+python -m mavcore.dev.protocol_benchmark
+"""
+
+import time
+
+import numpy as np
+
+from mavcore import MAVDevice, protocols
+from mavcore.mav_sim import SimVehicle
+from mavcore.messages import FlightMode, IntervalMessageID, SetpointLocal
+
+ADDRESS = "udp:127.0.0.1:14551"
+RUNS = 200
+SETPOINT_HZ = 200
+SETPOINT_SECONDS = 5.0
+
+
+def time_protocol(device: MAVDevice, make) -> np.ndarray:
+    times = []
+    for _ in range(RUNS):
+        protocol = make()
+        start = time.perf_counter()
+        device.run_protocol(protocol)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+
+if __name__ == "__main__":
+    with SimVehicle(ADDRESS) as sim:
+        device = MAVDevice(ADDRESS)
+        benchmarks = [
+            ("SetModeProtocol", lambda: protocols.SetModeProtocol(FlightMode.GUIDED)),
+            ("ArmProtocol", lambda: protocols.ArmProtocol()),
+            ("TakeoffProtocol", lambda: protocols.TakeoffProtocol(10.0)),
+            (
+                "RequestMessageProtocol",
+                lambda: protocols.RequestMessageProtocol(
+                    IntervalMessageID.LOCAL_POSITION_NED, rate_hz=30.0
+                ),
+            ),
+            (
+                "FenceUploadProtocol (20 vertices)",
+                lambda: protocols.FenceUploadProtocol(
+                    [(33.64 + i * 1e-4, -117.82) for i in range(20)]
+                ),
+            ),
+        ]
+        for name, make in benchmarks:
+            ms = time_protocol(device, make)
+            print(
+                f"{name}: p50 {np.percentile(ms, 50):.2f} ms, p99 {np.percentile(ms, 99):.2f} ms, "
+                f"max {ms.max():.2f} ms",
+                flush=True,
+            )
+
+        boot_time_ms = int(time.time() * 1000)
+        received_before = sim.setpoints_received
+        start = time.perf_counter()
+        sent = 0
+        while time.perf_counter() - start < SETPOINT_SECONDS:
+            device.sender.send_msg(
+                SetpointLocal(1, 1, boot_time_ms, 0.0, 0.0, -10.0 - sent % 2)
+            )
+            sent += 1
+            time.sleep(max(0.0, start + sent / SETPOINT_HZ - time.perf_counter()))
+        time.sleep(0.5)
+        print(
+            f"setpoints: {sent} sent at {SETPOINT_HZ} hz, "
+            f"{sim.setpoints_received - received_before} received by the vehicle"
+        )
@@ -0,0 +1,336 @@
+"""
+Receive path benchmark. A separate process sends synthetic telemetry over udp to a MAVDevice at fixed rates
+while the number of listeners, message types and callback cost are varied. For every configuration and rate
+it reports p50 / p99 / max latency of each stage, drop counts, and the highest rate sustained: a rate counts
+as sustained when most of its --trials runs miss at most --max-loss of the messages and meet --max-p99-ms.
+
+Stages (all time.time(), the sender writes a message counter into time_boot_ms):
+    socket: sent -> read from the socket (Ingest receive timestamp)
+    receiver_queue: read -> Receiver.deliver starts (update_queue / Receiver.process)
+    listener_queue: Receiver.deliver starts -> listener decode starts (MAVMessage queue, thread or dispatcher)
+    callback: decode starts -> callback returns
+    end_to_end: sent -> callback returns
+
+python -m mavcore.dev.receive_benchmark --json results.json
+python -m mavcore.dev.receive_benchmark --listeners 1,20 --types 4 --callback-us 0,200 --rates 2000,8000
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import socket
+import subprocess
+import time
+
+import numpy as np
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore import MAVDevice
+from mavcore.mav_message import MAVMessage
+
+PORT = 14560
+# Message types with a uint32 time_boot_ms, used to carry the message counter
+ENCODERS = {
+    "LOCAL_POSITION_NED": lambda m, c: m.local_position_ned_encode(c, 1, 2, 3, 0, 0, 0),
+    "ATTITUDE_QUATERNION": lambda m, c: m.attitude_quaternion_encode(
+        c, 1, 0, 0, 0, 0, 0, 0
+    ),
+    "GLOBAL_POSITION_INT": lambda m, c: m.global_position_int_encode(
+        c, 1, 2, 3, 4, 0, 0, 0, 0
+    ),
+    "ATTITUDE": lambda m, c: m.attitude_encode(c, 0.1, 0.2, 0.3, 0, 0, 0),
+    "SCALED_IMU2": lambda m, c: m.scaled_imu2_encode(c, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    "SERVO_OUTPUT_RAW": lambda m, c: m.servo_output_raw_encode(c, 0, *[1500] * 8),
+}
+STAGES = ["socket", "receiver_queue", "listener_queue", "callback", "end_to_end"]
+
+
+def send(port: int, types: list[str], rate: float, count: int, sent_at):
+    """
+    Sender process: sends count messages at rate, cycling through types, one frame per datagram.
+    Message i carries i in time_boot_ms, its send time is stored in sent_at[i].
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    mav = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    encoders = [ENCODERS[name] for name in types]
+    heartbeat = mav.heartbeat_encode(2, 3, 81, 4, 3).pack(mav)
+    sock.sendto(heartbeat, ("127.0.0.1", port))
+    start = time.perf_counter() + 0.05
+    for i in range(count):
+        frame = encoders[i % len(encoders)](mav, i).pack(mav)
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0.0005:
+            time.sleep(delay)
+        while time.perf_counter() < start + i / rate:
+            pass
+        sent_at[i] = time.time()
+        sock.sendto(frame, ("127.0.0.1", port))
+
+
+class BenchListener(MAVMessage):
+    """
+    Records (counter, decode start, callback end) for every message and burns cost_s of cpu in its callback.
+    """
+
+    def __init__(self, name: str, cost_s: float):
+        super().__init__(name, callback_func=self._on_message)
+        self.cost_s = cost_s
+        self.samples: list[tuple[int, float, float]] = []
+        self._counter = -1
+        self._start = 0.0
+
+    def decode(self, msg):
+        self._start = time.time()
+        self._counter = msg.time_boot_ms
+
+    def _on_message(self, _):
+        if self.cost_s > 0:
+            end = time.perf_counter() + self.cost_s
+            while time.perf_counter() < end:
+                pass
+        self.samples.append((self._counter, self._start, time.time()))
+
+
+class Probe:
+    """
+    Wraps Receiver.deliver to record the socket read and deliver start time of every benchmark message.
+    """
+
+    def __init__(self, device: MAVDevice, size: int):
+        self.read_at = np.full(size, np.nan)
+        self.deliver_at = np.full(size, np.nan)
+        self._deliver = device.receiver.deliver
+        device.receiver.deliver = self.deliver
+
+    def deliver(self, timestamp: float, msg):
+        counter = getattr(msg, "time_boot_ms", None)
+        if counter is not None and msg.get_type() in ENCODERS:
+            if counter < len(self.read_at):
+                self.read_at[counter] = timestamp
+                self.deliver_at[counter] = time.time()
+        self._deliver(timestamp, msg)
+
+
+def percentiles(values: np.ndarray) -> dict[str, float]:
+    values = values[~np.isnan(values)] * 1000
+    if len(values) == 0:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "max_ms": round(float(values.max()), 4),
+    }
+
+
+def run_case(
+    device: MAVDevice,
+    num_listeners: int,
+    types: list[str],
+    cost_us: float,
+    rate: float,
+    duration: float,
+    max_p99_ms: float,
+    max_loss: float,
+) -> dict:
+    count = int(rate * duration)
+    listeners = [
+        BenchListener(types[i % len(types)], cost_us * 1e-6)
+        for i in range(num_listeners)
+    ]
+    for listener in listeners:
+        device.add_listener(listener)
+    probe = Probe(device, count)
+    sent_at = multiprocessing.Array("d", count, lock=False)
+    sender = multiprocessing.Process(
+        target=send, args=(PORT, types, rate, count, sent_at)
+    )
+    sender.start()
+    sender.join()
+    # Let the pipeline drain, queues are never more than a few seconds deep
+    deadline = time.time() + 5.0
+    expected = [
+        count // len(types) + (i % len(types) < count % len(types))
+        for i in range(len(types))
+    ]
+    while time.time() < deadline:
+        if all(
+            len(listener.samples) >= expected[types.index(listener.name)]
+            for listener in listeners
+        ):
+            break
+        time.sleep(0.05)
+    for listener in listeners:
+        device.remove_listener(listener)
+        # Otherwise its thread keeps polling and takes cpu from the later cases
+        listener.stop_callback_thread()
+    device.receiver.deliver = probe._deliver
+
+    sent = np.frombuffer(sent_at, dtype=np.float64)
+    achieved = (count - 1) / (sent[-1] - sent[0]) if count > 1 else 0.0
+    stages: dict[str, list[np.ndarray]] = {stage: [] for stage in STAGES}
+    unprocessed = 0
+    for listener in listeners:
+        if len(listener.samples) == 0:
+            unprocessed += expected[types.index(listener.name)]
+            continue
+        samples = np.array(listener.samples)
+        counters = samples[:, 0].astype(np.int64)
+        unprocessed += expected[types.index(listener.name)] - len(samples)
+        stages["listener_queue"].append(samples[:, 1] - probe.deliver_at[counters])
+        stages["callback"].append(samples[:, 2] - samples[:, 1])
+        stages["end_to_end"].append(samples[:, 2] - sent[counters])
+    stages["socket"].append(probe.read_at - sent)
+    stages["receiver_queue"].append(probe.deliver_at - probe.read_at)
+
+    # Types without a listener are skipped by Ingest, only count the subscribed ones as lost
+    subscribed = sorted({types.index(listener.name) for listener in listeners})
+    counters = np.arange(count)
+    lost = int(
+        np.isnan(probe.read_at[np.isin(counters % len(types), subscribed)]).sum()
+    )
+    dropped = sum(listener.dropped_count for listener in listeners)
+    latency = {
+        stage: percentiles(np.concatenate(values) if values else np.array([]))
+        for stage, values in stages.items()
+    }
+    e2e_p99 = latency["end_to_end"]["p99_ms"]
+    # Messages some listener never processed: lost in the socket, dropped from its queue or still queued
+    total = sum(expected[types.index(listener.name)] for listener in listeners)
+    missing = max(0, unprocessed) / total if total else 0.0
+    return {
+        "listeners": num_listeners,
+        "types": len(types),
+        "callback_us": cost_us,
+        "rate": rate,
+        "sent": count,
+        "send_rate": round(achieved, 1),
+        "lost_in_socket": lost,
+        "dropped_listener_queue": dropped,
+        "unprocessed": max(0, unprocessed - dropped),
+        "missing_fraction": round(missing, 6),
+        "latency": latency,
+        "sustained": bool(
+            missing <= max_loss
+            and e2e_p99 is not None
+            and e2e_p99 <= max_p99_ms
+            and achieved >= 0.95 * rate
+        ),
+    }
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def int_list(text: str) -> list[int]:
+    return [int(x) for x in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--listeners", type=int_list, default=[1, 10, 50])
+    parser.add_argument("--types", type=int_list, default=[1, 4])
+    parser.add_argument("--callback-us", type=int_list, default=[0, 100])
+    parser.add_argument(
+        "--rates", type=int_list, default=[1000, 2000, 5000, 10000, 20000]
+    )
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="dispatch_workers of the MAVDevice, default one thread per listener",
+    )
+    parser.add_argument(
+        "--max-p99-ms",
+        type=float,
+        default=50.0,
+        help="end to end p99 above which a rate does not count as sustained",
+    )
+    parser.add_argument(
+        "--trials",
+        type=int,
+        default=3,
+        help="runs per rate, the rate is sustained if most of them are",
+    )
+    parser.add_argument(
+        "--max-loss",
+        type=float,
+        default=0.001,
+        help="fraction of messages a run may miss and still count as sustained",
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    device = MAVDevice(f"udpin:127.0.0.1:{PORT}", dispatch_workers=args.workers)
+    results = []
+    best = []
+    for num_listeners in args.listeners:
+        for num_types in args.types:
+            types = list(ENCODERS)[:num_types]
+            for cost_us in args.callback_us:
+                best_rate = 0
+                for rate in args.rates:
+                    passed = 0
+                    for trial in range(args.trials):
+                        result = run_case(
+                            device,
+                            num_listeners,
+                            types,
+                            cost_us,
+                            rate,
+                            args.duration,
+                            args.max_p99_ms,
+                            args.max_loss,
+                        )
+                        result["trial"] = trial
+                        results.append(result)
+                        passed += result["sustained"]
+                        e2e = result["latency"]["end_to_end"]
+                        print(
+                            f"listeners {num_listeners:3d}, types {num_types}, callback {cost_us:4d} us, "
+                            f"{rate:6d} msg/s #{trial}: e2e p50 {e2e['p50_ms']} ms, p99 {e2e['p99_ms']} ms, "
+                            f"lost {result['lost_in_socket']}, dropped {result['dropped_listener_queue']}, "
+                            f"unprocessed {result['unprocessed']}"
+                            + ("" if result["sustained"] else "  (not sustained)"),
+                            flush=True,
+                        )
+                    if 2 * passed <= args.trials:
+                        break
+                    best_rate = rate
+                best.append(
+                    {
+                        "listeners": num_listeners,
+                        "types": num_types,
+                        "callback_us": cost_us,
+                        "max_sustained_rate": best_rate,
+                    }
+                )
+
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "duration_s": args.duration,
+        "dispatch_workers": args.workers,
+        "max_p99_ms": args.max_p99_ms,
+        "trials": args.trials,
+        "max_loss": args.max_loss,
+        "max_sustained": best,
+        "runs": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+    else:
+        print(json.dumps({"max_sustained": best}, indent=2))
@@ -0,0 +1,94 @@
+"""
+Records a synthetic multi-hour flight with Recorder, then times seeking in it with TelemetryLog.
+No flight controller needed.
+
+python -m mavcore.dev.recorder_benchmark [hours]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.dev.ingest_benchmark import STREAMS
+from mavcore.mav_recorder import Recorder, TelemetryLog, index_path
+
+TICK_HZ = 50
+
+
+def record(path: str, hours: float) -> tuple[int, float, float]:
+    mav = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    # One packed frame per stream, re-used, only the receive timestamps differ
+    frames = []
+    for rate, make in STREAMS:
+        msg = make(mav, 0)
+        frames.append((TICK_HZ // rate, msg.get_msgId(), bytes(msg.pack(mav))))
+
+    recorder = Recorder(path)
+    start = 1.7e9
+    count = 0
+    record_time = 0.0
+    for tick in range(int(hours * 3600 * TICK_HZ)):
+        timestamp = start + tick / TICK_HZ
+        t0 = time.perf_counter()
+        for every, msgid, frame in frames:
+            if tick % every == 0:
+                recorder.record(timestamp, msgid, frame)
+                count += 1
+        record_time += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    recorder.stop()
+    return count, record_time, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flight.mavc")
+        count, record_time, stop_time = record(path, hours)
+        size = os.path.getsize(path) + os.path.getsize(index_path(path))
+        print(
+            f"{count} frames ({hours:.1f} h), {size / 1e6:.0f} MB, "
+            f"record() {record_time / count * 1e6:.2f} us per frame, final flush {stop_time * 1000:.0f} ms"
+        )
+
+        t0 = time.perf_counter()
+        log = TelemetryLog(path)
+        first, last = log.time_range()
+        print(f"open: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        t0 = time.perf_counter()
+        log.seek_time(first)
+        print(
+            f"first seek (loads time column): {(time.perf_counter() - t0) * 1000:.1f} ms"
+        )
+
+        t0 = time.perf_counter()
+        for i in range(1000):
+            log.seek_time(first + (last - first) * i / 1000)
+        print(f"seek by time: {(time.perf_counter() - t0) * 1000:.3f} us per seek")
+
+        middle = (first + last) / 2
+        t0 = time.perf_counter()
+        n = sum(1 for _ in log.messages(middle, middle + 1.0))
+        print(
+            f"decode 1 s window in the middle: {n} messages, {(time.perf_counter() - t0) * 1000:.1f} ms"
+        )
+
+        t0 = time.perf_counter()
+        positions = log.positions(dialect.MAVLINK_MSG_ID_HEARTBEAT)
+        print(
+            f"index all {len(positions)} heartbeats: {(time.perf_counter() - t0) * 1000:.1f} ms"
+        )
+
+        t0 = time.perf_counter()
+        n = sum(
+            1 for _ in log.messages(middle, middle + 60.0, types=["LOCAL_POSITION_NED"])
+        )
+        print(
+            f"decode 1 min of LOCAL_POSITION_NED in the middle: {n} messages, "
+            f"{(time.perf_counter() - t0) * 1000:.1f} ms"
+        )
+        log.close()
@@ -0,0 +1,85 @@
+"""
+Replays a flight log into FullPose and a few listeners: checks that two deterministic replays leave the
+listeners in the same state, then measures the highest sustained replay rate inline and through the
+receiver / listener threads. Uses a generated tlog unless one is given.
+
+python -m mavcore.dev.replay_benchmark [flight.tlog | flight.mavc]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.dev.ingest_benchmark import STREAMS
+from mavcore.mav_replay import ReplayEngine
+from mavcore.messages import FullPose, GPSRaw, Heartbeat, VFRHUD
+
+DURATION_S = 300.0  # seconds of generated telemetry
+TICK_HZ = 50
+
+
+def generate_tlog(path: str):
+    mav = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    start_us = 1_700_000_000_000_000
+    with open(path, "wb") as f:
+        for tick in range(int(DURATION_S * TICK_HZ)):
+            t_ms = tick * 1000 // TICK_HZ
+            for rate, make in STREAMS:
+                if tick % (TICK_HZ // rate) == 0:
+                    frame = make(mav, t_ms).pack(mav)
+                    f.write(struct.pack(">Q", start_us + t_ms * 1000) + frame)
+
+
+def listeners():
+    return [FullPose(), Heartbeat(), GPSRaw(), VFRHUD()]
+
+
+def state(msgs) -> list[str]:
+    pose = msgs[0]
+    return [repr(m) for m in msgs] + [
+        repr(pose.pose_buffer.timestamps().tolist()),
+        repr(
+            pose.get_local_positions(pose.pose_buffer.timestamps()).positions.tolist()
+        ),
+        repr([m.get_delivery_stats() for m in pose.submessages]),
+    ]
+
+
+def replay(path: str, speed: float | None, deterministic: bool):
+    engine = ReplayEngine(path, speed=speed, deterministic=deterministic)
+    msgs = [engine.add_listener(m) for m in listeners()]
+    return engine.run(), msgs
+
+
+def report(name: str, stats: dict[str, float]):
+    print(
+        f"{name}: {stats['frames']} frames ({stats['decoded']} decoded) in {stats['elapsed_seconds']:.2f} s, "
+        f"{stats['frames_per_second']:.0f} frames/s, "
+        f"{stats['log_seconds'] / stats['elapsed_seconds']:.0f}x real time, "
+        f"max lag {stats['max_lag_seconds'] * 1000:.1f} ms, max queue {stats['max_queue']}, "
+        f"dropped {stats['dropped']}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            path = sys.argv[1]
+        else:
+            path = os.path.join(tmp, "flight.tlog")
+            generate_tlog(path)
+
+        stats, first = replay(path, None, True)
+        report("inline, as fast as possible", stats)
+        _, second = replay(path, None, True)
+        print(
+            f"deterministic: {state(first) == state(second)} "
+            f"({len(first[0].pose_buffer)} poses in the FullPose buffer)"
+        )
+
+        report("threaded, as fast as possible", replay(path, None, False)[0])
+        report("inline, 50x", replay(path, 50.0, True)[0])
@@ -0,0 +1,26 @@
+"""
+Runs a SimVehicle sending to udp:127.0.0.1:14550 until ctrl+c, so the other dev scripts can run without a SITL.
+
+python -m mavcore.dev.sim_vehicle [udp:host:port]
+"""
+
+import sys
+import time
+
+from mavcore.mav_sim import SimVehicle
+
+if __name__ == "__main__":
+    address = sys.argv[1] if len(sys.argv) > 1 else "udp:127.0.0.1:14550"
+    with SimVehicle(address) as sim:
+        print(f"Simulated vehicle sending to {address}, ctrl+c to stop")
+        try:
+            while True:
+                time.sleep(1.0)
+                north, east, down = sim.position
+                print(
+                    f"armed: {sim.armed}, mode: {sim.mode}, ned: ({north:.1f}, {east:.1f}, {down:.1f}), "
+                    f"received: {sim.messages_received}",
+                    flush=True,
+                )
+        except KeyboardInterrupt:
+            pass
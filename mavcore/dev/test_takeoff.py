@@ -15,13 +15,15 @@ request_att = protocols.RequestMessageProtocol(
 fp = messages.FullPose()
 device.add_listener(fp)
 
+streams = {"LOCAL_POSITION_NED": 25.0, "ATTITUDE_QUATERNION": 25.0}
 while True:
     device.run_protocol(request_att)
     device.run_protocol(request_pos)
-    time.sleep(5.0)
-    print(fp.local_position.get_hz(), fp.attitude.get_hz())
-    if fp.local_position.get_hz() > 25.0:
+    if device.wait_for_streams(streams, timeout=5.0, max_jitter=0.01):
         break
+    stats = device.get_stream_stats()
+    for name in streams:
+        print(name, stats.get(name))
 # while True:
 time.sleep(2)
 set_mode_protocol = protocols.SetModeProtocol(
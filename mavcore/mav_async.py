@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any
+
+from mavcore.mav_device import MAVDevice
+from mavcore.mav_message import MAVMessage
+from mavcore.mav_protocol import MAVProtocol
+from mavcore.mav_vehicle import VehicleView
+
+
+class MessageStream:
+    """
+    Async iterator over updates of a listener, created with AsyncMAVDevice.stream.
+
+    Yields the listener itself every time it was decoded. Updates that arrive while the consumer is busy
+    are folded into the next one, so a slow consumer always sees the latest values instead of a backlog.
+    """
+
+    def __init__(self, owner: Any, msg: MAVMessage):
+        self._owner = owner
+        self.msg = msg
+        self._event = asyncio.Event()
+        self._closed = False
+        self._callback = msg.callback_func
+
+        def on_update(updated):
+            self._callback(updated)
+            self._event.set()
+
+        msg.callback_func = on_update
+        owner.add_listener(msg)
+
+    def __aiter__(self) -> "MessageStream":
+        return self
+
+    async def __anext__(self) -> MAVMessage:
+        if self._closed:
+            raise StopAsyncIteration
+        await self._event.wait()
+        self._event.clear()
+        if self._closed:
+            raise StopAsyncIteration
+        return self.msg
+
+    def close(self):
+        """
+        Removes the listener and ends the iteration.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._owner.remove_listener(self.msg)
+        self.msg.callback_func = self._callback
+        self._event.set()
+
+    async def __aenter__(self) -> "MessageStream":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+class AsyncVehicleView(VehicleView):
+    """
+    VehicleView of an AsyncMAVDevice, with awaitable protocols and streams.
+    """
+
+    async def run_protocol(self, protocol: MAVProtocol) -> MAVProtocol:
+        self._check_target(protocol)
+        await protocol.run_async(self.sender, self.receiver)
+        return protocol
+
+    def stream(self, msg: MAVMessage) -> MessageStream:
+        return MessageStream(self, msg)
+
+    async def wait_for_msg(
+        self, msg: MAVMessage, timeout: float | None = None
+    ) -> MAVMessage:
+        return await _wait(self.receiver, msg, timeout)
+
+
+class AsyncMAVDevice(MAVDevice):
+    """
+    MAVDevice for asyncio programs. Must be created inside a running event loop.
+
+    The connection is read on the event loop (loop.add_reader) and messages are routed, decoded and
+    their callbacks run on the loop thread, so there is no reader, receiver or listener thread and waiting
+    on a message costs a coroutine, not a thread. Keep listener callbacks short.
+    Outbound frames still go through the Sender's writer thread, so sending never blocks the loop
+    and keeps its priorities and link pacing.
+    """
+
+    _vehicle_type = AsyncVehicleView
+
+    def __init__(
+        self,
+        device_address: str,
+        baud_rate: int = 115200,
+        source_system: int = 255,
+        source_component: int = 0,
+        attempt_reconnect: bool = True,
+        link_capacity_bps: float | None = None,
+    ):
+        self.loop = asyncio.get_running_loop()
+        super().__init__(
+            device_address,
+            baud_rate,
+            source_system,
+            source_component,
+            attempt_reconnect,
+            dispatch_workers=0,
+            link_capacity_bps=link_capacity_bps,
+        )
+
+    def _start_reading(self):
+        fd = self.connection.fd
+        if fd is None:
+            raise RuntimeError("Connection has no selectable file descriptor.")
+        self.ingest.deliver = self.receiver.deliver
+        self.loop.add_reader(fd, self._on_readable)
+
+    def _on_readable(self):
+        self.ingest.poll(timeout=0)
+
+    def stop_reading(self):
+        """
+        Stops reading from the connection.
+        """
+        self.reading = False
+        if self.connection.fd is not None:
+            self.loop.remove_reader(self.connection.fd)
+
+    async def close(self):
+        """
+        Stops reading, sends what is still queued and closes the connection.
+        """
+        self.stop_reading()
+        await self.loop.run_in_executor(None, self.sender.writer.stop)
+        self.sender.scheduler.stop()
+        self.dispatcher.stop()
+        self.connection.close()
+
+    async def __aenter__(self) -> "AsyncMAVDevice":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def wait_for_heartbeat(self, timeout: float | None = None) -> bool:
+        """
+        Waits until a vehicle heartbeat was received and the target system is known. Returns False on timeout.
+        """
+
+        async def heartbeat():
+            while self.connection.target_system == 0:
+                await asyncio.sleep(0.05)
+
+        try:
+            await asyncio.wait_for(heartbeat(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.sender.sys_id = self.connection.target_system
+        self.sender.component_id = self.connection.target_component
+        return True
+
+    async def run_protocol(self, protocol: MAVProtocol) -> MAVProtocol:
+        """
+        Runs a MAVProtocol with its run_async. Protocols without one run on the loop's executor.
+        """
+        await protocol.run_async(self.sender, self.receiver)
+        return protocol
+
+    def stream(self, msg: MAVMessage) -> MessageStream:
+        """
+        Adds msg as a listener and returns an async iterator over its updates:
+        async for pos in device.stream(LocalPositionNED()): ...
+        """
+        return MessageStream(self, msg)
+
+    async def wait_for_msg(
+        self, msg: MAVMessage, timeout: float | None = None
+    ) -> MAVMessage:
+        """
+        Waits for the next msg. Raises asyncio.TimeoutError after timeout seconds.
+        """
+        return await _wait(self.receiver, msg, timeout)
+
+
+async def _wait(receiver: Any, msg: MAVMessage, timeout: float | None) -> MAVMessage:
+    future = asyncio.wrap_future(receiver.expect_msg(msg))
+    await asyncio.wait_for(future, timeout)
+    return msg
@@ -0,0 +1,278 @@
+import threading
+import time
+from typing import Any
+
+import pymavlink.mavutil as utility
+
+from mavcore.mav_message import SendPriority
+
+MAVLINK2_OVERHEAD = 12  # 10 byte header + 2 byte checksum
+MAX_FRAME_SIZE = 280  # largest possible MAVLink 2 frame
+BITS_PER_BYTE = 10  # serial 8N1: start bit + 8 data bits + stop bit
+
+
+def frame_size(mav_msg: Any) -> int:
+    """
+    Wire size in bytes of a pymavlink message. Exact once it was packed or received,
+    otherwise an upper bound (MAVLink 2 trims trailing zero bytes off the payload).
+    """
+    buf = getattr(mav_msg, "_msgbuf", None)
+    if buf:
+        return len(buf)
+    unpacker = getattr(mav_msg, "unpacker", None)
+    if unpacker is None:
+        return MAX_FRAME_SIZE
+    return unpacker.size + MAVLINK2_OVERHEAD
+
+
+_dialect_sizes: dict[str, int] = {}
+
+
+def dialect_frame_size(name: str) -> int:
+    """
+    Untrimmed MAVLink 2 frame size of a message type in the loaded dialect, MAX_FRAME_SIZE if unknown.
+    """
+    if not _dialect_sizes:
+        for cls in utility.mavlink.mavlink_map.values():
+            _dialect_sizes[cls.msgname] = cls.unpacker.size + MAVLINK2_OVERHEAD
+    return _dialect_sizes.get(name, MAX_FRAME_SIZE)
+
+
+class TokenBucket:
+    """
+    Classic token bucket in bytes. Fills at rate bytes/s up to burst bytes.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_consume(self, amount: float) -> float:
+        """
+        Takes amount tokens if available and returns 0. Otherwise takes nothing and returns
+        the seconds until enough tokens will be available.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        amount = min(
+            amount, self.burst
+        )  # a frame bigger than the burst could never go out
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        if self.rate <= 0.0:
+            return float("inf")
+        return (amount - self._tokens) / self.rate
+
+    def force_consume(self, amount: float):
+        """
+        Takes amount tokens even if that puts the bucket in debt. Used for traffic that is never held back.
+        """
+        self._refill(time.monotonic())
+        self._tokens -= amount
+
+    def refund(self, amount: float):
+        self._tokens = min(self.burst, self._tokens + amount)
+
+
+class RateMeter:
+    """
+    Bytes per second over a sliding window, O(1) per update.
+    """
+
+    def __init__(self, window: float = 1.0, slots: int = 10):
+        self.window = window
+        self._slot_len = window / slots
+        self._slots = [0] * slots
+        self._slot_num = int(time.monotonic() / self._slot_len)
+        self.total_bytes = 0
+        self.total_frames = 0
+
+    def _advance(self, now: float):
+        slot_num = int(now / self._slot_len)
+        steps = min(slot_num - self._slot_num, len(self._slots))
+        for i in range(1, steps + 1):
+            self._slots[(self._slot_num + i) % len(self._slots)] = 0
+        self._slot_num = max(self._slot_num, slot_num)
+
+    def add(self, nbytes: int):
+        self._advance(time.monotonic())
+        self._slots[self._slot_num % len(self._slots)] += nbytes
+        self.total_bytes += nbytes
+        self.total_frames += 1
+
+    def rate(self) -> float:
+        self._advance(time.monotonic())
+        return sum(self._slots) / self.window
+
+
+class LinkBudget:
+    """
+    Tracks inbound and outbound bytes/s against the link capacity and paces low priority outbound traffic.
+
+    capacity_bps: link capacity in bits/s (the serial baud rate or the telemetry radio air rate).
+        None for links that are effectively unlimited (e.g. local UDP), then only rates are tracked.
+    outbound_share: fraction of the capacity that NORMAL and BULK frames may use together.
+    bulk_share: fraction of the capacity BULK frames may use.
+    CONTROL frames are never held back but still count against both buckets.
+
+    Pacing outbound traffic to the real link rate keeps the backlog in the Outbox, where priorities apply,
+    instead of in the OS serial buffer.
+    """
+
+    def __init__(
+        self,
+        capacity_bps: float | None = None,
+        outbound_share: float = 0.9,
+        bulk_share: float = 0.7,
+    ):
+        self.capacity_bps = capacity_bps
+        self._lock = threading.Lock()
+        self.inbound = RateMeter()
+        self.outbound = RateMeter()
+        self._inbound_types: dict[str, list[int]] = {}  # name -> [frames, bytes]
+        self._outbound_types: dict[str, list[int]] = {}
+        self.outbound_bucket: TokenBucket | None = None
+        self.bulk_bucket: TokenBucket | None = None
+        if capacity_bps is not None:
+            capacity = self.capacity_bytes()
+            burst = max(MAX_FRAME_SIZE, capacity * 0.05)
+            self.outbound_bucket = TokenBucket(capacity * outbound_share, burst)
+            self.bulk_bucket = TokenBucket(capacity * bulk_share, burst)
+
+    def capacity_bytes(self) -> float | None:
+        """
+        Link capacity in bytes/s.
+        """
+        if self.capacity_bps is None:
+            return None
+        return self.capacity_bps / BITS_PER_BYTE
+
+    def record_inbound(self, name: str, nbytes: int):
+        with self._lock:
+            self.inbound.add(nbytes)
+            self._count(self._inbound_types, name, nbytes)
+
+    def record_outbound(self, name: str, nbytes: int):
+        with self._lock:
+            self.outbound.add(nbytes)
+            self._count(self._outbound_types, name, nbytes)
+
+    @staticmethod
+    def _count(types: dict[str, list[int]], name: str, nbytes: int):
+        counts = types.get(name)
+        if counts is None:
+            types[name] = [1, nbytes]
+        else:
+            counts[0] += 1
+            counts[1] += nbytes
+
+    def admit(self, lane: SendPriority, nbytes: int) -> float:
+        """
+        Called by the Outbox before sending a frame. Returns 0 and takes the tokens if the frame
+        may go out now, otherwise the seconds to wait before trying again.
+        """
+        if self.outbound_bucket is None:
+            return 0.0
+        with self._lock:
+            if lane >= SendPriority.CONTROL:
+                self.outbound_bucket.force_consume(nbytes)
+                self.bulk_bucket.force_consume(nbytes)
+                return 0.0
+            if lane <= SendPriority.BULK:
+                wait = self.bulk_bucket.try_consume(nbytes)
+                if wait > 0.0:
+                    return wait
+                wait = self.outbound_bucket.try_consume(nbytes)
+                if wait > 0.0:
+                    self.bulk_bucket.refund(nbytes)
+                return wait
+            wait = self.outbound_bucket.try_consume(nbytes)
+            if wait == 0.0:
+                self.bulk_bucket.force_consume(nbytes)
+            return wait
+
+    def settle(self, estimated: int, actual: int):
+        """
+        Gives back tokens taken for an estimated frame size once the real size is known.
+        """
+        if self.outbound_bucket is None or actual >= estimated:
+            return
+        with self._lock:
+            self.outbound_bucket.refund(estimated - actual)
+            self.bulk_bucket.refund(estimated - actual)
+
+    def average_size(self, name: str) -> float | None:
+        """
+        Average received frame size in bytes for a message type, None if it was never received.
+        """
+        with self._lock:
+            counts = self._inbound_types.get(name) or self._outbound_types.get(name)
+            if counts is None:
+                return None
+            return counts[1] / counts[0]
+
+    def stream_cost(
+        self, name: str, rate_hz: float, frame_bytes: int | None = None
+    ) -> float:
+        """
+        Bytes/s a stream of message type name at rate_hz needs. Uses the observed frame size,
+        else frame_bytes, else the full frame size from the dialect.
+        """
+        size = self.average_size(name) or frame_bytes or dialect_frame_size(name)
+        return size * rate_hz
+
+    def plan(self, streams: dict[str, float]) -> dict[str, Any]:
+        """
+        Predicts the inbound load of a set of requested streams {message name: rate hz},
+        on top of the current traffic from message types not in streams.
+        """
+        requested = {name: self.stream_cost(name, hz) for name, hz in streams.items()}
+        with self._lock:
+            current = self.inbound.rate()
+            # Leave out what the requested streams use right now so they are not counted twice,
+            # assuming each type keeps its long run share of the inbound bytes
+            if self.inbound.total_bytes > 0:
+                replaced = sum(
+                    self._inbound_types[name][1]
+                    for name in streams
+                    if name in self._inbound_types
+                )
+                current *= 1.0 - replaced / self.inbound.total_bytes
+        total = current + sum(requested.values())
+        capacity = self.capacity_bytes()
+        return {
+            "streams_bytes_per_s": requested,
+            "other_bytes_per_s": current,
+            "total_bytes_per_s": total,
+            "capacity_bytes_per_s": capacity,
+            "utilization": total / capacity if capacity else None,
+        }
+
+    def get_utilization(self) -> dict[str, Any]:
+        """
+        Current inbound and outbound bytes/s and their fraction of the link capacity.
+        """
+        with self._lock:
+            inbound = self.inbound.rate()
+            outbound = self.outbound.rate()
+            inbound_types = {name: tuple(c) for name, c in self._inbound_types.items()}
+            outbound_types = {
+                name: tuple(c) for name, c in self._outbound_types.items()
+            }
+        capacity = self.capacity_bytes()
+        return {
+            "capacity_bytes_per_s": capacity,
+            "inbound_bytes_per_s": inbound,
+            "outbound_bytes_per_s": outbound,
+            "inbound_utilization": inbound / capacity if capacity else None,
+            "outbound_utilization": outbound / capacity if capacity else None,
+            "inbound_by_type": inbound_types,  # name -> (frames, bytes) since start
+            "outbound_by_type": outbound_types,
+        }
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from typing import Any
+
+WINDOW = 32  # TIMESYNC samples kept for the estimate
+# Share of the window with the lowest round trip time used for the fit
+BEST_FRACTION = 0.25
+MIN_SKEW_SPAN = 10.0  # seconds of samples needed before drift is estimated
+# Larger drift estimates are noise, crystal oscillators are within ~100 ppm
+MAX_SKEW = 1e-3
+# Seconds the autopilot clock may fall behind the estimate before it counts as a reboot
+REBOOT_JUMP = 1.0
+# Seconds after the last TIMESYNC reply before passive samples are used again
+TIMESYNC_STALE = 10.0
+# How fast the passive offset follows downward (drift), per sample
+PASSIVE_DECAY = 0.002
+
+
+class ClockSync:
+    """
+    Estimates the autopilot boot clock (time_boot_ms) against the host clocks and converts between
+    autopilot boot time, host monotonic time (time.monotonic()) and Unix time (time.time()). All times in seconds.
+
+    Fed with TIMESYNC round trips (add_timesync, see MAVDevice.start_clock_sync): each reply gives the
+    autopilot time at the midpoint of the round trip. The samples with the lowest round trip time in the
+    last WINDOW are fitted with a line, offset and drift (skew). Until the first reply, or when replies stop,
+    one way samples (add_passive, e.g. SYSTEM_TIME) bound the offset by the smallest observed delay.
+
+    A process wide instance is mavcore.mav_clock.clock, used by setpoints and FullPose by default.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[float, float, float]] = deque(maxlen=WINDOW)
+        # (reference host monotonic time, boot - monotonic at reference, skew), replaced as a whole
+        self._estimate: tuple[float, float, float] | None = None
+        self._passive: float | None = None
+        self.last_timesync = float("-inf")
+        self.rtt = 0.0  # round trip time of the best sample in the window
+        self.timesync_count = 0
+        self.passive_count = 0
+        self.reboots = 0
+        # Autopilot Unix time (SYSTEM_TIME, usually GPS) - host Unix time, None until known
+        self.unix_offset: float | None = None
+
+    @property
+    def synced(self) -> bool:
+        """
+        True once there is any estimate of the boot clock.
+        """
+        return self._estimate is not None or self._passive is not None
+
+    def add_timesync(self, tc1_ns: int, ts1_ns: int, received_ns: int | None = None):
+        """
+        A TIMESYNC reply: tc1 autopilot boot time, ts1 the host monotonic_ns sent in the request,
+        received_ns host monotonic_ns when the reply arrived.
+        """
+        if received_ns is None:
+            received_ns = time.monotonic_ns()
+        rtt = (received_ns - ts1_ns) / 1e9
+        if rtt < 0.0 or tc1_ns <= 0:
+            return
+        midpoint = (ts1_ns + received_ns) / 2e9
+        offset = tc1_ns / 1e9 - midpoint
+        with self._lock:
+            if self._estimate is not None:
+                expected = self._offset_at(self._estimate, midpoint)
+                if offset < expected - REBOOT_JUMP - rtt:
+                    self._reboot()
+            self._samples.append((midpoint, offset, rtt))
+            self.last_timesync = midpoint
+            self.timesync_count += 1
+            self._fit()
+
+    def add_passive(self, time_boot_ms: int, receive_time: float):
+        """
+        A one way sample: a message stamped time_boot_ms received at receive_time (time.time()).
+        Only used while there are no recent TIMESYNC replies.
+        """
+        receive = receive_time - (time.time() - time.monotonic())
+        # The message was sent before it was received, so this never overestimates the offset
+        offset = time_boot_ms / 1000.0 - receive
+        with self._lock:
+            self.passive_count += 1
+            if self._passive is not None and offset < self._passive - REBOOT_JUMP:
+                self._reboot()
+            if self._passive is None or offset > self._passive:
+                self._passive = offset
+            else:
+                self._passive += PASSIVE_DECAY * (offset - self._passive)
+
+    def add_system_time(
+        self, time_unix_usec: int, time_boot_ms: int, receive_time: float
+    ):
+        """
+        A SYSTEM_TIME message: a passive boot time sample and, once the autopilot has a time source,
+        the offset of its Unix time.
+        """
+        self.add_passive(time_boot_ms, receive_time)
+        if time_unix_usec > 0:
+            autopilot_unix = time_unix_usec / 1e6
+            self.unix_offset = autopilot_unix - self.boot_to_unix(time_boot_ms / 1000.0)
+
+    def _reboot(self):
+        """
+        Forgets all samples, the autopilot clock restarted. Call with _lock held.
+        """
+        self._samples.clear()
+        self._estimate = None
+        self._passive = None
+        self.reboots += 1
+
+    def _fit(self):
+        """
+        Least squares line through the samples with the lowest round trip times. Call with _lock held.
+        """
+        samples = sorted(self._samples, key=lambda sample: sample[2])
+        best = samples[: max(3, int(len(samples) * BEST_FRACTION))]
+        self.rtt = best[0][2]
+        reference = sum(sample[0] for sample in best) / len(best)
+        offset = sum(sample[1] for sample in best) / len(best)
+        skew = 0.0
+        span = max(sample[0] for sample in best) - min(sample[0] for sample in best)
+        if span >= MIN_SKEW_SPAN:
+            variance = sum((sample[0] - reference) ** 2 for sample in best)
+            covariance = sum(
+                (sample[0] - reference) * (sample[1] - offset) for sample in best
+            )
+            skew = min(max(covariance / variance, -MAX_SKEW), MAX_SKEW)
+        self._estimate = (reference, offset, skew)
+
+    @staticmethod
+    def _offset_at(estimate: tuple[float, float, float], monotonic: float) -> float:
+        reference, offset, skew = estimate
+        return offset + skew * (monotonic - reference)
+
+    def _try_current(self) -> tuple[tuple[float, float, float], str] | None:
+        """
+        The estimate in use and its source, timesync unless replies stopped and passive samples exist.
+        None if there are no samples (yet, or since a reboot).
+        """
+        estimate = self._estimate
+        passive = self._passive
+        if estimate is not None and (
+            passive is None or time.monotonic() - self.last_timesync < TIMESYNC_STALE
+        ):
+            return estimate, "timesync"
+        if passive is not None:
+            return (0.0, passive, 0.0), "passive"
+        return None
+
+    def _current(self) -> tuple[tuple[float, float, float], str]:
+        current = self._try_current()
+        if current is None:
+            raise RuntimeError("ClockSync has no samples yet")
+        return current
+
+    @staticmethod
+    def _to_monotonic(estimate: tuple[float, float, float], boot: float) -> float:
+        reference, offset, skew = estimate
+        # boot = m + offset + skew * (m - reference), solved for m
+        return (boot - offset + skew * reference) / (1.0 + skew)
+
+    def monotonic_to_boot(self, monotonic: float) -> float:
+        """
+        Autopilot boot time (s) at a host time.monotonic().
+        """
+        return monotonic + self._offset_at(self._current()[0], monotonic)
+
+    def boot_to_monotonic(self, boot: float) -> float:
+        """
+        Host time.monotonic() at an autopilot boot time (s).
+        """
+        return self._to_monotonic(self._current()[0], boot)
+
+    def unix_to_boot(self, unix: float) -> float:
+        return self.monotonic_to_boot(unix - (time.time() - time.monotonic()))
+
+    def boot_to_unix(self, boot: float) -> float:
+        """
+        Host time.time() at an autopilot boot time (s), comparable to receive timestamps.
+        """
+        return self.boot_to_monotonic(boot) + (time.time() - time.monotonic())
+
+    def try_boot_to_unix(self, boot: float) -> float | None:
+        """
+        boot_to_unix, or None if there is no estimate. Checking synced first races with a reboot
+        clearing the samples on the listener thread, this reads the estimate once.
+        """
+        current = self._try_current()
+        if current is None:
+            return None
+        return self._to_monotonic(current[0], boot) + (time.time() - time.monotonic())
+
+    def now_boot_ms(self) -> int:
+        """
+        Current autopilot time_boot_ms.
+        """
+        return int(self.monotonic_to_boot(time.monotonic()) * 1000.0)
+
+    def try_now_boot_ms(self) -> int | None:
+        """
+        now_boot_ms, or None if there is no estimate, see try_boot_to_unix.
+        """
+        current = self._try_current()
+        if current is None:
+            return None
+        now = time.monotonic()
+        return int((now + self._offset_at(current[0], now)) * 1000.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Current estimate: source (timesync / passive / None), offset and skew, best round trip time, sample counts.
+        """
+        current = self._try_current()
+        if current is None:
+            offset, skew, source = None, None, None
+        else:
+            (_, offset, skew), source = current
+        return {
+            "source": source,
+            "offset_s": offset,
+            "skew_ppm": skew * 1e6 if skew is not None else None,
+            "rtt_ms": self.rtt * 1000.0 if self.timesync_count else None,
+            "timesync_samples": self.timesync_count,
+            "passive_samples": self.passive_count,
+            "reboots": self.reboots,
+            "unix_offset_s": self.unix_offset,
+        }
+
+
+def time_boot_ms(boot_time_ms: int | None = None, sync: ClockSync | None = None) -> int:
+    """
+    time_boot_ms for an outgoing message. From the clock (default: the shared one) once it is synced,
+    otherwise the time since boot_time_ms (host time.time() in ms, usually when the script started).
+    0 if neither is known. Wrapped to uint32.
+    """
+    sync = sync if sync is not None else clock
+    value = sync.try_now_boot_ms()
+    if value is None:
+        if boot_time_ms is not None:
+            value = int(time.time() * 1000 - boot_time_ms)
+        else:
+            value = 0
+    return max(value, 0) & 0xFFFFFFFF
+
+
+# Shared by the whole process, like metrics
+clock = ClockSync()
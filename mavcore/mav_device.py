@@ -2,17 +2,33 @@ import pymavlink.mavutil as utility
 import threading
 import time
 
+from mavcore.mav_bandwidth import LinkBudget, frame_size
+from mavcore.mav_clock import ClockSync, clock
+from mavcore.mav_dispatcher import Dispatcher
+from mavcore.mav_history import History
+from mavcore.mav_ingest import Ingest
 from mavcore.mav_protocol import MAVProtocol
+from mavcore.mav_recorder import Recorder
 from mavcore.mav_receiver import Receiver
 from mavcore.mav_sender import Sender
+from mavcore.mav_vehicle import VehicleView, _start_clock_sync, _stop_clock_sync
 from mavcore.mav_message import MAVMessage
 
 
 class MAVDevice:
     """
     Primary class for MAVCore. Manages drone connection, sending, and receiving mavlink messages.
+
+    dispatch_workers: if set, listeners share a pool of this many worker threads instead of one thread each.
+    link_capacity_bps: link capacity in bits/s used to pace outbound traffic (see LinkBudget).
+        Defaults to baud_rate on serial links and unlimited on udp. Set it to the radio air rate
+        when a telemetry radio is slower than the serial port it is plugged into.
+    decode_all: decode every received message like recv_match does, instead of only the types
+        that have a listener or waiter (plus HEARTBEAT).
     """
 
+    _vehicle_type = VehicleView
+
     def __init__(
         self,
         device_address: str,
@@ -20,21 +36,41 @@ class MAVDevice:
         source_system: int = 255,
         source_component: int = 0,
         attempt_reconnect: bool = True,
+        dispatch_workers: int | None = None,
+        link_capacity_bps: float | None = None,
+        decode_all: bool = False,
     ):
         self.attempt_reconnect = attempt_reconnect
-        self.receiver = Receiver()
+        self.dispatcher = (
+            Dispatcher(dispatch_workers) if dispatch_workers is not None else None
+        )
+        self.receiver = Receiver(dispatcher=self.dispatcher)
         self.connection: utility.mavudp | utility.mavserial = self._connect(
             device_address, baud_rate, source_system, source_component
         )
+        if link_capacity_bps is None and type(self.connection) is utility.mavserial:
+            link_capacity_bps = baud_rate
+        self.budget = LinkBudget(link_capacity_bps)
         self.sender = Sender(
             self.connection.target_system,
             self.connection.target_component,
             self.connection,
+            budget=self.budget,
         )
-
-        self.receiver.start_receiving()
+        self.decode_all = decode_all
+        self.vehicles: dict[int, VehicleView] = {}
+        self.recorder: Recorder | None = None
+        self._clock_msgs: list[MAVMessage] = []
+        self.ingest = Ingest(self.connection, self.receiver, self.budget)
 
         self.reading = True
+        self._start_reading()
+
+    def _start_reading(self):
+        """
+        Starts the receiver and reader threads, then gives the connection a second to find the vehicle.
+        """
+        self.receiver.start_receiving()
         self.thread = threading.Thread(target=self._main_loop, daemon=True)
         self.thread.start()
         time.sleep(1)
@@ -76,6 +112,72 @@ class MAVDevice:
         self.receiver.add_listener(listener)
         return listener
 
+    def enable_history(
+        self, name: str, capacity: int = 1024, fields: list[str] | None = None
+    ) -> History:
+        """
+        Keeps the last capacity samples of a message type in a numpy ring buffer (see History):
+        history.between(t0, t1), history.nearest(t) and history.latest(n).
+        """
+        return self.receiver.enable_history(name, capacity, fields)
+
+    def start_recording(self, path: str, **kwargs) -> Recorder:
+        """
+        Records every raw frame received from now on to path (see Recorder, read it back with TelemetryLog).
+        kwargs are passed to Recorder.
+        """
+        if self.recorder is not None:
+            raise RuntimeError("Already recording.")
+        self.recorder = Recorder(path, **kwargs)
+        self.ingest.on_frame = self.recorder.record
+        return self.recorder
+
+    def stop_recording(self):
+        """
+        Stops recording and writes what is still queued.
+        """
+        recorder = self.recorder
+        if recorder is None:
+            return
+        self.ingest.on_frame = None
+        self.recorder = None
+        recorder.stop()
+
+    def start_clock_sync(
+        self,
+        period: float = 1.0,
+        sync: ClockSync | None = None,
+        system_id: int | None = None,
+        component_id: int = 1,
+    ) -> ClockSync:
+        """
+        Sends a TIMESYNC request every period seconds and feeds the replies and SYSTEM_TIME messages from
+        system_id / component_id to sync (default the shared mavcore.mav_clock.clock, which setpoints and
+        FullPose use). system_id defaults to the connection's target system, or 1 before a heartbeat.
+        With several vehicles on the link use VehicleView.start_clock_sync instead. Returns the ClockSync.
+        """
+        self.stop_clock_sync()
+        sync = sync if sync is not None else clock
+        if system_id is None:
+            system_id = self.connection.target_system or 1
+        self._clock_msgs = _start_clock_sync(
+            self.receiver, self.sender, sync, period, system_id, component_id
+        )
+        return sync
+
+    def stop_clock_sync(self):
+        """
+        Stops the TIMESYNC requests, the ClockSync keeps its last estimate.
+        """
+        _stop_clock_sync(self.receiver, self.sender, self._clock_msgs)
+        self._clock_msgs = []
+
+    def remove_listener(self, listener: MAVMessage | str) -> bool:
+        """
+        Stops listening with listener, or with every listener for a message name.
+        """
+        return self.receiver.remove_listener(listener)
+
     def run_protocol(self, protocol: MAVProtocol) -> MAVProtocol:
         """
         Runs a MAVProtocol object that sends and receives messages to complete the protcol.
@@ -83,8 +185,87 @@ class MAVDevice:
         protocol.run(self.sender, self.receiver)
         return protocol
 
+    def vehicle(self, system_id: int, component_id: int = 1) -> VehicleView:
+        """
+        Returns the view of one vehicle on this connection, with its own listeners and sender target ids.
+        Views share this device's reader and writer threads, so any number of them can be used.
+        """
+        view = self.vehicles.get(system_id)
+        if view is None:
+            view = self._vehicle_type(
+                self.receiver, self.sender, system_id, component_id
+            )
+            self.vehicles[system_id] = view
+        return view
+
+    def discovered_systems(self) -> list[int]:
+        """
+        System ids a heartbeat has been received from.
+        """
+        return [
+            sysid
+            for sysid, state in list(self.connection.sysid_state.items())
+            if "HEARTBEAT" in state.messages
+        ]
+
+    def get_link_utilization(self) -> dict:
+        """
+        Current inbound and outbound bytes/s, their share of the link capacity and totals per message type.
+        """
+        return self.budget.get_utilization()
+
+    def get_stream_stats(self) -> dict[str, dict]:
+        """
+        Rate, jitter, gaps and interval percentiles of every message type received (see StreamStats).
+        """
+        return self.receiver.stream_report(time.time())
+
+    def get_link_stats(self) -> dict[tuple[int, int], dict]:
+        """
+        Frames received and lost (from packet sequence gaps) per (system id, component id).
+        """
+        return {key: link.snapshot() for key, link in list(self.ingest.links.items())}
+
+    def wait_for_streams(
+        self,
+        min_rates: dict[str, float],
+        timeout: float = 10.0,
+        max_jitter: float | None = None,
+    ) -> bool:
+        """
+        Blocks until every message type in min_rates (name -> hz) is received at least that fast and,
+        if max_jitter (seconds) is given, that steady. The types need a listener. Returns False on timeout.
+        """
+        deadline = time.time() + timeout
+        while True:
+            now = time.time()
+            ready = True
+            for name, min_rate in min_rates.items():
+                stats = self.receiver.get_stream_stats(name)
+                if stats is None or not stats.is_ready(min_rate, now, max_jitter):
+                    ready = False
+                    break
+            if ready:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(0.05)
+
     def _main_loop(self):
+        if not self.decode_all:
+            while self.reading:
+                self.ingest.poll(timeout=1)
+            return
         while self.reading:
             msg = self.connection.recv_match(blocking=True, timeout=1)
             if msg:
-                self.receiver.update_queue(time.time(), msg)
+                timestamp = time.time()
+                self.budget.record_inbound(msg.get_type(), frame_size(msg))
+                if msg.get_type() != "BAD_DATA":
+                    self.ingest.track_sequence(
+                        msg.get_srcSystem(), msg.get_srcComponent(), msg.get_seq()
+                    )
+                recorder = self.recorder
+                if recorder is not None:
+                    recorder.record(timestamp, msg.get_msgId(), msg.get_msgbuf())
+                self.receiver.update_queue(timestamp, msg)
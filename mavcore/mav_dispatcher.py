@@ -0,0 +1,85 @@
+import queue
+import threading
+from typing import Any
+
+
+class Dispatcher:
+    """
+    Shared pool of worker threads that runs the decode and callback function of MAVMessage listeners.
+
+    Used instead of the default one thread per listener, so the number of threads stays fixed no matter
+    how many listeners are subscribed. Each listener keeps its own message queue and is only ever handled
+    by one worker at a time, so messages for a listener are always decoded in the order they arrived.
+
+    num_workers: number of worker threads. 0 runs listeners inline on the thread that delivers the message.
+    batch_size: max messages a worker handles for one listener before giving other listeners a turn.
+    """
+
+    def __init__(self, num_workers: int = 4, batch_size: int = 8):
+        if num_workers < 0:
+            raise ValueError("num_workers must be >= 0")
+        self.num_workers = num_workers
+        self.batch_size = max(1, batch_size)
+        self._ready: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._workers: list[threading.Thread] = []
+        self.running = True
+        for i in range(num_workers):
+            worker = threading.Thread(
+                target=self._work_loop, name=f"mavcore-dispatch-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def schedule(self, msg: Any):
+        """
+        Marks a listener as having queued messages. Called by MAVMessage.process_message. <br>
+        A listener that is already scheduled or being processed is not queued twice.
+        """
+        with msg._queuelock:
+            if msg._scheduled:
+                return
+            msg._scheduled = True
+        if self.num_workers == 0:
+            self._run(msg)
+        else:
+            self._ready.put(msg)
+
+    def _run(self, msg: Any):
+        try:
+            while True:
+                msg._drain(self.batch_size)
+                with msg._queuelock:
+                    if msg._msg_queue.empty() or msg._dispatcher is not self:
+                        msg._scheduled = False
+                        return
+                if self.num_workers > 0:
+                    # Still has messages, go to the back of the line so other listeners get a turn
+                    self._ready.put(msg)
+                    return
+        except BaseException:
+            # Decode errors are handled by the listener, this is anything else. Unschedule so the next
+            # message schedules the listener again instead of it going silent
+            with msg._queuelock:
+                msg._scheduled = False
+            raise
+
+    def _work_loop(self):
+        while self.running:
+            msg = self._ready.get()
+            if msg is None:
+                break
+            try:
+                self._run(msg)
+            except Exception as e:
+                print(f"Dispatcher error processing {msg.name}: {e!r}")
+
+    def stop(self):
+        """
+        Stops all worker threads. Listeners still attached will no longer be processed.
+        """
+        self.running = False
+        for _ in self._workers:
+            self._ready.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
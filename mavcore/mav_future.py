@@ -0,0 +1,45 @@
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable
+
+
+class MAVFuture(Future):
+    """
+    A concurrent.futures.Future that is resolved by MAVCore instead of an executor.
+
+    Receiving: returned by Receiver.expect_msg, resolved with the MAVMessage the moment its decode finishes.
+    Cancelling it removes the pending waiter from the Receiver.
+
+    Supports result(timeout), cancel(), done() and add_done_callback(fn) like any other Future,
+    and can be awaited from asyncio with asyncio.wrap_future.
+    """
+
+    def __init__(self, msg: Any = None, on_cancel: Callable[[Any], None] | None = None):
+        super().__init__()
+        self.msg = msg
+        self._on_cancel = on_cancel
+
+    def cancel(self) -> bool:
+        cancelled = super().cancel()
+        if cancelled and self._on_cancel is not None:
+            self._on_cancel(self)
+        return cancelled
+
+    def _resolve(self, result: Any) -> bool:
+        """
+        Sets the result unless the future was already resolved or cancelled. Returns whether it was set.
+        """
+        try:
+            self.set_result(result)
+        except InvalidStateError:
+            return False
+        return True
+
+    def _fail(self, exception: BaseException) -> bool:
+        """
+        Sets the exception unless the future was already resolved or cancelled. Returns whether it was set.
+        """
+        try:
+            self.set_exception(exception)
+        except InvalidStateError:
+            return False
+        return True
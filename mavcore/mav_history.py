@@ -0,0 +1,142 @@
+import bisect
+from typing import Any
+
+import numpy as np
+import pymavlink.dialects.v20.all as dialect
+
+# numpy type of each MAVLink field type, char fields (strings) are not kept
+FIELD_TYPES = {
+    "float": np.float32,
+    "double": np.float64,
+    "int8_t": np.int8,
+    "uint8_t": np.uint8,
+    "uint8_t_mavlink_version": np.uint8,
+    "int16_t": np.int16,
+    "uint16_t": np.uint16,
+    "int32_t": np.int32,
+    "uint32_t": np.uint32,
+    "int64_t": np.int64,
+    "uint64_t": np.uint64,
+}
+
+
+def message_dtype(name: str, fields: list[str] | None = None) -> np.dtype:
+    """
+    Structured dtype (timestamp + fields) for a MAVLink message type. Defaults to every numeric field.
+    """
+    msg_type = None
+    for candidate in dialect.mavlink_map.values():
+        if candidate.msgname == name:
+            msg_type = candidate
+            break
+    if msg_type is None:
+        raise ValueError(f"Unknown MAVLink message {name}")
+    columns: list[Any] = [("timestamp", np.float64)]
+    for field, field_type, length in zip(
+        msg_type.fieldnames, msg_type.fieldtypes, msg_type.array_lengths
+    ):
+        if fields is not None and field not in fields:
+            continue
+        numpy_type = FIELD_TYPES.get(field_type)
+        if numpy_type is None:
+            if fields is not None:
+                raise ValueError(f"{name}.{field} ({field_type}) is not numeric")
+            continue
+        columns.append(
+            (field, numpy_type, (length,)) if length else (field, numpy_type)
+        )
+    if fields is not None:
+        missing = set(fields) - {column[0] for column in columns}
+        if missing:
+            raise ValueError(f"{name} has no field {', '.join(sorted(missing))}")
+    return np.dtype(columns)
+
+
+class History:
+    """
+    Fixed capacity ring buffer of one message type's decoded fields plus receive timestamps (time.time(), s),
+    a numpy structured array allocated once. Create with Receiver.enable_history / MAVDevice.enable_history.
+
+    Every sample is written twice (slot i and i + capacity), so the newest samples are always one contiguous
+    block and latest / between return array views without copying. Views alias the buffer: they see the
+    samples at the time of the call, but slots are reused once capacity newer samples arrive, so copy()
+    what you keep longer. Timestamps never decrease (a clock step back is clamped), so lookups bisect.
+    """
+
+    def __init__(
+        self, name: str, capacity: int = 1024, fields: list[str] | None = None
+    ):
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.name = name
+        self.capacity = capacity
+        self.dtype = message_dtype(name, fields)
+        self.fields = list(self.dtype.names[1:])
+        self._buf = np.zeros(2 * capacity, dtype=self.dtype)
+        # Column views into _buf, append writes each field in place without building a row
+        self._timestamps = self._buf["timestamp"]
+        self._columns = [(field, self._buf[field]) for field in self.fields]
+        self.count = 0  # samples appended since creation
+        self._last = float("-inf")
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp: float, msg: Any):
+        """
+        Adds one pymavlink message. Called by the Receiver.
+        """
+        if timestamp < self._last:
+            timestamp = self._last
+        self._last = timestamp
+        slot = self.count % self.capacity
+        mirror = slot + self.capacity
+        self._timestamps[slot] = self._timestamps[mirror] = timestamp
+        for field, column in self._columns:
+            column[slot] = column[mirror] = getattr(msg, field)
+        self.count += 1
+
+    def _window(self) -> np.ndarray:
+        count = self.count
+        if count == 0:
+            return self._buf[:0]
+        end = (count - 1) % self.capacity + self.capacity + 1
+        return self._buf[end - min(count, self.capacity) : end]
+
+    def latest(self, n: int | None = None) -> np.ndarray:
+        """
+        The newest n samples (all kept if None), oldest first.
+        """
+        window = self._window()
+        if n is None or n >= len(window):
+            return window
+        return window[len(window) - n :] if n > 0 else window[:0]
+
+    def between(self, start: float, end: float) -> np.ndarray:
+        """
+        Samples received in [start, end), oldest first.
+        """
+        window = self._window()
+        timestamps = window["timestamp"]
+        first = bisect.bisect_left(timestamps, start)
+        last = bisect.bisect_left(timestamps, end, first)
+        return window[first:last]
+
+    def nearest(self, timestamp: float) -> np.void | None:
+        """
+        The sample received closest to timestamp, None if empty.
+        """
+        window = self._window()
+        if len(window) == 0:
+            return None
+        timestamps = window["timestamp"]
+        i = bisect.bisect_left(timestamps, timestamp)
+        if i == len(window) or (
+            i > 0 and timestamp - timestamps[i - 1] <= timestamps[i] - timestamp
+        ):
+            i -= 1
+        return window[i]
+
+    def clear(self):
+        self.count = 0
+        self._last = float("-inf")
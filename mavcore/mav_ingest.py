@@ -0,0 +1,210 @@
+import struct
+import time
+from typing import Any, Callable
+
+import pymavlink.mavutil as utility
+
+from mavcore.mav_bandwidth import LinkBudget
+from mavcore.mav_metrics import RECEIVE, metrics
+from mavcore.mav_receiver import Receiver
+from mavcore.mav_stats import LinkStats
+
+MAGIC_V1 = 0xFE
+MAGIC_V2 = 0xFD
+IFLAG_SIGNED = 0x01
+READ_SIZE = 4096
+
+# Decoded even without subscribers, pymavlink tracks target system, flight mode and armed state from it
+ALWAYS_DECODE = frozenset({"HEARTBEAT"})
+
+
+class Ingest:
+    """
+    Reads raw bytes from the connection and splits them into MAVLink frames.
+    Only frames of message types the Receiver subscribes to are decoded, the rest are skipped after
+    peeking at the msgid in the header. This makes CPU use depend on what is consumed, not on what the
+    flight controller sends.
+
+    Skipped frames are not crc checked, they are framed by their length and the next frame's magic byte,
+    so the last skipped frame of a read waits for the next one.
+    Decoded messages go through connection.post_message like with recv_match. pymavlink's loss counter
+    (connection.mav_loss) only sees decoded frames, so it counts skipped frames as lost.
+
+    on_frame: optional on_frame(timestamp, msgid, frame) called with every raw frame, decoded or not.
+    deliver: called with (timestamp, msg) for every decoded message, defaults to receiver.update_queue.
+    """
+
+    def __init__(
+        self,
+        connection: utility.mavudp | utility.mavserial,
+        receiver: Receiver,
+        budget: LinkBudget | None = None,
+        always_decode: frozenset[str] = ALWAYS_DECODE,
+        deliver: Callable[[float, Any], None] | None = None,
+    ):
+        self.connection = connection
+        self.receiver = receiver
+        self.deliver = deliver if deliver is not None else receiver.update_queue
+        self.budget = budget
+        self.always_decode = always_decode
+        self.on_frame: Callable[[float, int, bytearray], None] | None = None
+        self._buf = bytearray()
+        self._mav = None
+        self._map: dict[int, Any] = {}
+        self._names: frozenset[str] | None = None
+        self._wanted: frozenset[int] = frozenset()
+
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.bad_bytes = 0  # noise and frames that failed their crc
+        # Frames received / lost per (system id, component id), from the packet sequence numbers
+        self.links: dict[tuple[int, int], LinkStats] = {}
+
+    def poll(self, timeout: float) -> int:
+        """
+        Waits up to timeout seconds for data, reads what is available and delivers the complete frames in it.
+        Returns the number of frames decoded.
+        """
+        connection = self.connection
+        if not connection.select(timeout):
+            return 0
+        data = connection.recv(READ_SIZE)
+        if not data:
+            return 0
+        if connection.logfile_raw:
+            connection.logfile_raw.write(data)
+        if connection.first_byte:
+            connection.auto_mavlink_version(data)
+        return self.feed(data, time.time())
+
+    def feed(self, data: bytes, timestamp: float) -> int:
+        """
+        Adds raw bytes read from the link and delivers every complete frame. Returns the number of frames decoded.
+        """
+        self._buf += data
+        self._refresh()
+        buf = self._buf
+        end = len(buf)
+        pos = 0
+        decoded = 0
+        while pos < end:
+            magic = buf[pos]
+            if magic != MAGIC_V2 and magic != MAGIC_V1:
+                start = self._find_magic(pos)
+                self.bad_bytes += start - pos
+                pos = start
+                continue
+            if magic == MAGIC_V2:
+                if end - pos < 10:
+                    break
+                payload_len = buf[pos + 1]
+                size = payload_len + 12
+                if buf[pos + 2] & IFLAG_SIGNED:
+                    size += 13
+                msgid = buf[pos + 7] | buf[pos + 8] << 8 | buf[pos + 9] << 16
+                header = pos + 4  # seq, system id, component id
+            else:
+                if end - pos < 6:
+                    break
+                payload_len = buf[pos + 1]
+                size = payload_len + 8
+                msgid = buf[pos + 5]
+                header = pos + 2
+            msg_type = self._map.get(msgid)
+            if msg_type is not None and payload_len > msg_type.unpacker.size:
+                # Longer than the message can be, this magic byte is not a frame start
+                self.bad_bytes += 1
+                pos += 1
+                continue
+            wanted = msgid in self._wanted
+            if end - pos < size:
+                break
+            if not wanted:
+                # Skipped frames get no crc check, so only trust the length if the next frame starts right after
+                if end - pos == size:
+                    break
+                after = buf[pos + size]
+                if after != MAGIC_V2 and after != MAGIC_V1:
+                    self.bad_bytes += 1
+                    pos += 1
+                    continue
+
+            frame = buf[pos : pos + size]
+            if wanted:
+                try:
+                    if metrics.enabled:
+                        start = time.perf_counter()
+                        msg = self._mav.decode(frame)
+                        metrics.record(
+                            RECEIVE, msg_type.msgname, time.perf_counter() - start
+                        )
+                    else:
+                        msg = self._mav.decode(frame)
+                except Exception:
+                    # Bad crc or header, resync on the next magic byte
+                    self.bad_bytes += 1
+                    pos += 1
+                    continue
+                self._deliver_frame(timestamp, msgid, frame)
+                self.connection.post_message(msg)
+                self.deliver(timestamp, msg)
+                self.frames_decoded += 1
+                decoded += 1
+            else:
+                self._deliver_frame(timestamp, msgid, frame)
+                self.frames_skipped += 1
+            self.track_sequence(buf[header + 1], buf[header + 2], buf[header])
+            if self.budget is not None:
+                self.budget.record_inbound(
+                    msg_type.msgname if msg_type is not None else f"UNKNOWN_{msgid}",
+                    size,
+                )
+            pos += size
+
+        del buf[:pos]
+        return decoded
+
+    def track_sequence(self, system: int, component: int, seq: int):
+        """
+        Counts a received frame and the frames lost before it on the (system, component) link.
+        """
+        link = self.links.get((system, component))
+        if link is None:
+            link = self.links[(system, component)] = LinkStats()
+        link.update(seq)
+
+    def _find_magic(self, pos: int) -> int:
+        v2 = self._buf.find(MAGIC_V2, pos)
+        v1 = self._buf.find(MAGIC_V1, pos)
+        if v2 < 0 and v1 < 0:
+            return len(self._buf)
+        if v2 < 0 or v1 < 0:
+            return max(v1, v2)
+        return min(v1, v2)
+
+    def _deliver_frame(self, timestamp: float, msgid: int, frame: bytearray):
+        self.frames_received += 1
+        if self.connection.logfile:
+            usec = int(timestamp * 1.0e6) & ~3
+            self.connection.logfile.write(struct.pack(">Q", usec) + frame)
+        if self.on_frame is not None:
+            self.on_frame(timestamp, msgid, frame)
+
+    def _refresh(self):
+        """
+        Rebuilds the set of wanted msgids when the subscriptions or the dialect changed.
+        """
+        mav = self.connection.mav
+        if mav is not self._mav:
+            self._mav = mav
+            self._map = utility.mavlink.mavlink_map
+            self._names = None
+        names = self.receiver.subscriptions
+        if names is self._names:
+            return
+        self._names = names
+        wanted = names | self.always_decode
+        self._wanted = frozenset(
+            msgid for msgid, msg_type in self._map.items() if msg_type.msgname in wanted
+        )
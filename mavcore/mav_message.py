@@ -1,26 +1,40 @@
+from enum import IntEnum
 from typing import Any, Callable
 import time
 import threading
 import queue
+from concurrent.futures import CancelledError, TimeoutError
+
+from mavcore.mav_future import MAVFuture
+from mavcore.mav_metrics import CALLBACK, DECODE, LISTENER_WAIT, metrics
+from mavcore.mav_stats import StreamStats
 
 
 def thread_safe(func):
     def wrapper(*args, **kwargs) -> Any:
         self: MAVMessage = args[0]
-        self._lock.acquire()
-        output = func(*args, **kwargs)
-        self._lock.release()
-        return output
+        with self._lock:
+            return func(*args, **kwargs)
 
     return wrapper
 
 
+class SendPriority(IntEnum):
+    """
+    Outbound priority of a MAVMessage, see Outbox.
+    """
+
+    BULK = -1  # large or non urgent traffic (rtk corrections, status text), sent when the link has room
+    NORMAL = 0  # commands, heartbeats, everything else
+    CONTROL = 1  # setpoints and rc override, always sent first
+
+
 class MAVMessage:
     def __init__(
         self,
         name: str,
         timestamp: float = 0.0,
-        priority=0,
+        priority: int = SendPriority.NORMAL,
         repeat_period: float = 0.0,
         callback_func: Callable[[Any], None] = lambda msg: None,
     ):
@@ -29,10 +43,11 @@ class MAVMessage:
 
         name: the mavlink message name to look for
         timestamp: the time in seconds the message was recieved
-        priority: unused for now
+        priority: SendPriority used by the Sender to order outgoing messages when the link is busy
         repeat_period: the interval at which the message will be repeatedly sent
         callback_func: a function that will be executed when this message is recieved and processed,
-            this message instance is passed in to the first and only argument.
+            this message instance is passed in to the first and only argument. Runs after decode without
+            the message lock, exceptions are printed and counted in callback_errors.
         non_blocking: if true, the callback function will be executed in a new thread
         """
         self.name = name
@@ -40,23 +55,47 @@ class MAVMessage:
         self.priority = priority
         self.repeat_period = repeat_period
         self.callback_func = callback_func
+        # Only receive messages from this system / component id, None accepts any.
+        # Read when the message is added to the Receiver, use from_source to set them.
+        self.source_system: int | None = None
+        self.source_component: int | None = None
         self._lock = threading.RLock()
-        self._thread: None | threading.Thread = None
+        # Set by Receiver.expect_msg, resolved after decode
+        self._future: None | MAVFuture = None
         self.submessages: list[MAVMessage] = []
-        # For calculating receive rate
+        # Receive rate, jitter and gaps, updated with every timestamp
+        self.stats = StreamStats()
         self.hz: float = 0.0
-        self._pastdt: list[float] = []
         """
         Callback processing. Similar to ROS each listener has its own thread for processing messages so that
         one slow listener does not block others from being processed. There will be a queue of up to 15 messages
         for each listener. If the queue is full, the oldest message will be dropped.
+        If the Receiver has a Dispatcher, the listener is processed by its shared worker pool instead of its own thread.
         """
         self._msg_queue: "queue.Queue[Any]" = queue.Queue(maxsize=15)
         self._decodethread: None | threading.Thread = None
         self._queuelock = threading.Lock()
+        self._dispatcher: Any = None
+        self._scheduled = False  # Guarded by _queuelock, True while queued on or run by the dispatcher
         self.end = False
 
+        # Optional throttle, messages arriving faster than this are skipped before decode. 0 = no limit.
+        self.max_rate_hz: float = 0.0
+        self._last_accepted = 0.0
+        # Delivery counters, guarded by _queuelock
+        self.received_count = 0  # handed to this listener by the receiver
+        self.delivered_count = 0  # decoded and passed to the callback
+        self.dropped_count = 0  # pushed out of a full queue before being decoded
+        self.throttled_count = 0  # skipped because of max_rate_hz
+        self.callback_errors = 0  # callbacks that raised, still counted as delivered
+        self.decode_errors = 0  # decode raised, not delivered
+
         self._decoded = False  # Set False on wait_for_msg, True after decoded
+        # Receive time (s) of the message decode last ran on. timestamp is set when a message is queued,
+        # so with a backlog it belongs to a newer message than the decoded fields
+        self.decoded_timestamp = 0.0
+        # Immutable record of the decoded fields, replaced as a whole after every decode, see snapshot
+        self._snapshot: Any = None
 
         # Logging util
         self.logging_callback: Callable | None = None
@@ -98,28 +137,45 @@ class MAVMessage:
                 continue
 
     @thread_safe
+    def from_source(
+        self, system: int | None = None, component: int | None = None
+    ) -> "MAVMessage":
+        """
+        Filters received messages by the sending system and component id, None accepts any. <br>
+        Must be called before the message is added as a listener or waiter. Returns self.
+        """
+        self.source_system = system
+        self.source_component = component
+        for submsg in self.submessages:
+            submsg.from_source(system, component)
+        return self
+
+    def accepts_source(self, system: int, component: int) -> bool:
+        """
+        True if a message from system / component passes the source filter.
+        """
+        return (self.source_system is None or self.source_system == system) and (
+            self.source_component is None or self.source_component == component
+        )
+
     def update_timestamp(self, timestamp: float):
         """
-        Thread-safe for updating the timestamp and calculating the receive rate (hz).
+        Updates the timestamp and the receive statistics (stats, hz). Not locked: only called by the Receiver
+        on its receiving thread (FullPose calls it for itself under its _sync_lock), so there is one writer
+        per message. Readers see whole float values but not an atomic stats + timestamp pair.
         Do not override this method.
         """
-        if self.timestamp == 0.0:
-            self.timestamp = timestamp
-            return
-        dt = timestamp - self.timestamp
-        self._pastdt.append(dt)
-        if len(self._pastdt) > 10:
-            self._pastdt.pop(0)
-        self.hz = len(self._pastdt) / sum(self._pastdt)
+        self.stats.update(timestamp)
+        self.hz = self.stats.rate()
         self.timestamp = timestamp
 
     @thread_safe
     def get_hz(self) -> float:
         """
-        Thread-safe for getting the receive rate (hz).
+        Thread-safe for getting the receive rate (hz), averaged over about the last 10 messages.
         Do not override this method.
         """
-        return int(self.hz)
+        return self.hz
 
     @thread_safe
     def _start_callback_thread(self):
@@ -133,6 +189,17 @@ class MAVMessage:
         self._decodethread = threading.Thread(target=self._process, daemon=True)
         self._decodethread.start()
 
+    @thread_safe
+    def _attach_dispatcher(self, dispatcher: Any):
+        """
+        Processes the decode and callback function on a shared Dispatcher instead of an internal thread. <br>
+        Do not override this method.
+        """
+        if self._decodethread is not None and self._decodethread.is_alive():
+            return  # Already has its own thread
+        self.end = False
+        self._dispatcher = dispatcher
+
     @thread_safe
     def stop_callback_thread(self):
         """
@@ -140,24 +207,92 @@ class MAVMessage:
         Do not override this method.
         """
         self.end = True
+        self._dispatcher = None
         if self._log_thread.is_alive():
             self._log_thread.join()
         if self._decodethread is not None:
             self._decodethread.join()
             self._decodethread = None
 
-    @thread_safe
+    def set_max_rate(self, rate_hz: float):
+        """
+        Limits how often this listener decodes and runs its callback. Messages that arrive sooner than
+        1 / rate_hz after the last accepted one are skipped and counted as throttled. 0 removes the limit.
+        """
+        if rate_hz < 0:
+            raise ValueError("rate_hz must be >= 0")
+        self.max_rate_hz = rate_hz
+
+    def get_delivery_stats(self) -> dict[str, int]:
+        """
+        Returns how many messages were received, delivered, dropped (queue full) and throttled (max rate),
+        how many failed to decode, how many callbacks raised and how many messages are still queued.
+        """
+        with self._queuelock:
+            return {
+                "received": self.received_count,
+                "delivered": self.delivered_count,
+                "dropped": self.dropped_count,
+                "throttled": self.throttled_count,
+                "decode_errors": self.decode_errors,
+                "callback_errors": self.callback_errors,
+                "queued": self._msg_queue.qsize(),
+            }
+
+    def reset_delivery_stats(self):
+        """
+        Sets all delivery counters back to 0.
+        """
+        with self._queuelock:
+            self.received_count = 0
+            self.delivered_count = 0
+            self.dropped_count = 0
+            self.throttled_count = 0
+            self.decode_errors = 0
+            self.callback_errors = 0
+
     def process_message(self, msg: Any):
         """
         Adds a message to the internal queue for processing. <br>
         Do not override this method.
         """
-        if self._msg_queue.full():
+        with self._queuelock:
+            self.received_count += 1
+            if self.max_rate_hz > 0.0:
+                now = time.monotonic()
+                if now - self._last_accepted < 1.0 / self.max_rate_hz:
+                    self.throttled_count += 1
+                    if metrics.enabled:
+                        metrics.count(f"throttled.{self.name}")
+                    return
+                self._last_accepted = now
+            if self._msg_queue.full():
+                try:
+                    self._msg_queue.get_nowait()
+                    self.dropped_count += 1
+                    if metrics.enabled:
+                        metrics.count(f"dropped.{self.name}")
+                except queue.Empty:
+                    pass
+            if metrics.enabled:
+                # Shared by every listener of the message, they are all queued within microseconds
+                msg._mavcore_queued = time.perf_counter()
+            self._msg_queue.put_nowait(msg)
+        dispatcher = self._dispatcher
+        if dispatcher is not None:
+            dispatcher.schedule(self)
+
+    def _drain(self, max_count: int):
+        """
+        Decodes up to max_count queued messages without blocking. Used by the Dispatcher. <br>
+        Do not override this method.
+        """
+        for _ in range(max_count):
             try:
-                self._msg_queue.get_nowait()
+                msg = self._msg_queue.get_nowait()
             except queue.Empty:
-                pass
-        self._msg_queue.put(msg)
+                return
+            self._handle(msg)
 
     def _process(self):
         """
@@ -167,11 +302,32 @@ class MAVMessage:
         while not self.end:
             try:
                 msg = self._msg_queue.get(timeout=0.1)
-                self._decode(msg)
             except queue.Empty:
-                time.sleep(0.02)
                 continue
-            time.sleep(0.02)  # Assumes no message > 50 Hz
+            self._handle(msg)
+
+    def _handle(self, msg: Any):
+        """
+        Decodes one queued message, runs the callback and resolves any pending wait. A message that fails
+        to decode is printed and counted in decode_errors, fails the pending wait with the exception,
+        and the listener keeps processing. <br>
+        Do not override this method.
+        """
+        try:
+            self._decode(msg)
+        except Exception as e:
+            with self._queuelock:
+                self.decode_errors += 1
+            if metrics.enabled:
+                metrics.count(f"decode_errors.{self.name}")
+            print(f"Error decoding {self.name}: {e!r}")
+            future = self._future
+            if future is not None:
+                future._fail(e)
+            return
+        with self._queuelock:
+            self.delivered_count += 1
+        self._resolve_future()
 
     @thread_safe
     def _encode(self, system_id, component_id) -> Any:
@@ -186,14 +342,45 @@ class MAVMessage:
         """
         pass
 
-    @thread_safe
     def _decode(self, msg):
         """
-        Thread-safe wrapper for decode. Do not override this method.
+        Thread-safe wrapper for decode, then runs the callback. Only decode holds the lock, the callback runs
+        after it is released so getters never wait on it, and an exception in the callback is printed and
+        counted (callback_errors) instead of stopping the listener. Do not override this method.
         """
-        self.decode(msg)
-        self._decoded = True
-        self.callback_func(self)
+        if metrics.enabled:
+            self._timed_decode(msg)
+            return
+        self._decode_fields(msg)
+        self._run_callback()
+
+    def _timed_decode(self, msg):
+        start = time.perf_counter()
+        queued = getattr(msg, "_mavcore_queued", None)
+        if queued is not None:
+            metrics.record(LISTENER_WAIT, self.name, start - queued)
+        self._decode_fields(msg)
+        decoded = time.perf_counter()
+        self._run_callback()
+        metrics.record(DECODE, self.name, decoded - start)
+        metrics.record(CALLBACK, self.name, time.perf_counter() - decoded)
+
+    def _decode_fields(self, msg):
+        with self._lock:
+            self.decoded_timestamp = getattr(msg, "_mavcore_received", self.timestamp)
+            self.decode(msg)
+            self._snapshot = self.freeze()
+            self._decoded = True
+
+    def _run_callback(self):
+        try:
+            self.callback_func(self)
+        except Exception as e:
+            with self._queuelock:
+                self.callback_errors += 1
+            if metrics.enabled:
+                metrics.count(f"callback_errors.{self.name}")
+            print(f"Error in {self.name} callback: {e!r}")
 
     def decode(self, msg):
         """
@@ -201,6 +388,40 @@ class MAVMessage:
         """
         pass
 
+    def freeze(self) -> Any:
+        """
+        Returns an immutable record (e.g. a frozen dataclass) of the decoded fields for snapshot,
+        None if the message does not publish one. Runs right after decode with the lock held.
+        """
+        return None
+
+    def publish(self, timestamp: float | None = None):
+        """
+        Replaces the snapshot with the current fields, stamped with timestamp (default self.timestamp).
+        Done after every decode, only needed after setting fields by hand.
+        """
+        if timestamp is None:
+            timestamp = self.timestamp
+        with self._lock:
+            self.decoded_timestamp = timestamp
+            self._snapshot = self.freeze()
+
+    def snapshot(self) -> Any:
+        """
+        The record published after the latest decode (see freeze). Reads one reference without locking,
+        so it never blocks behind decode or a slow callback and never sees a partially decoded message.
+        """
+        return self._snapshot
+
+    def _resolve_future(self):
+        """
+        Resolves the pending MAVFuture (if any) with this message. Called right after decode. <br>
+        Do not override this method.
+        """
+        future = self._future
+        if future is not None:
+            future._resolve(self)
+
     @thread_safe
     def __repr__(self) -> str:
         return f"({self.name}) timestamp: {self.timestamp} ms"
@@ -208,19 +429,27 @@ class MAVMessage:
     def __str__(self) -> str:
         return self.__repr__()
 
-    def wait_until_finished(self):
-        """
-        Blocks until the internal wait thread is finished executing.
-        """
-        if type(self._thread) is not threading.Thread:
-            return
-
-        while self._thread.is_alive() or not self._decoded:
-            time.sleep(0.1)
-        self._thread = None
+    def wait_until_finished(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until the pending wait on this message is resolved or timeout (seconds) passes.
+        Returns True if the message was received and decoded, False if it timed out, was cancelled
+        or failed to decode (see decode_errors).
+        """
+        future = self._future
+        if future is None:
+            return True
+        try:
+            future.result(timeout)
+        except (TimeoutError, CancelledError):
+            return False
+        except Exception:
+            return False
+        return True
 
     def is_finished(self) -> bool:
         """
-        Returns whether the internal wait thread is finished executing.
+        Returns whether the pending wait on this message is finished (received, failed to decode, timed out
+        or cancelled).
         """
-        return self._thread is None
+        future = self._future
+        return future is None or future.done()
@@ -0,0 +1,181 @@
+import threading
+import time
+from typing import Any
+
+# Histogram buckets: exact below 2 * SUB_BUCKETS microseconds, then SUB_BUCKETS per power of two (~3% wide)
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_SHIFT = 32  # largest trackable value is about 2^38 us (3 days)
+NUM_BUCKETS = 2 * SUB_BUCKETS + MAX_SHIFT * SUB_BUCKETS
+
+# Stages timed per message type
+RECEIVE = "receive"  # Ingest: pymavlink decode of a raw frame
+QUEUE_WAIT = "queue_wait"  # socket read -> Receiver.process picks the message up
+LISTENER_WAIT = "listener_wait"  # Receiver queues it for a listener -> decode starts
+DECODE = "decode"  # MAVMessage.decode
+CALLBACK = "callback"  # MAVMessage.callback_func
+SEND = "send"  # Sender.send_msg -> frame written by the Writer (queueing, pacing and write)
+
+
+def _bucket(value_us: int) -> int:
+    if value_us < 2 * SUB_BUCKETS:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    if shift > MAX_SHIFT:
+        return NUM_BUCKETS - 1
+    return shift * SUB_BUCKETS + (value_us >> shift)
+
+
+def _bucket_value(index: int) -> int:
+    """
+    Highest value (us) counted in a bucket.
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    base = index - shift * SUB_BUCKETS
+    return ((base + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Latency histogram with log-linear buckets like HdrHistogram: values are kept in microseconds with about
+    3% relative precision from 1 us to days, in a fixed array of about a thousand buckets. Recording is O(1).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * NUM_BUCKETS
+            self.count = 0
+            self.total_us = 0
+            self.min_us = 0
+            self.max_us = 0
+
+    def record(self, seconds: float):
+        value = int(seconds * 1.0e6)
+        if value < 0:
+            value = 0
+        index = _bucket(value)
+        with self._lock:
+            self.counts[index] += 1
+            if self.count == 0 or value < self.min_us:
+                self.min_us = value
+            if value > self.max_us:
+                self.max_us = value
+            self.count += 1
+            self.total_us += value
+
+    def percentile(self, percent: float) -> int:
+        """
+        Value in microseconds below which percent of the recorded values are.
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0
+            rank = max(1, int(self.count * percent / 100.0 + 0.5))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(_bucket_value(index), self.max_us)
+            return self.max_us
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        count, mean, min, max and p50 / p90 / p99 / p99.9 in microseconds.
+        """
+        return {
+            "count": self.count,
+            "mean_us": self.total_us / self.count if self.count else 0.0,
+            "min_us": self.min_us,
+            "p50_us": self.percentile(50.0),
+            "p90_us": self.percentile(90.0),
+            "p99_us": self.percentile(99.0),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max_us,
+        }
+
+
+class MetricsRegistry:
+    """
+    Counters, high water marks and per (stage, message type) latency histograms of the receive and send path.
+
+    Disabled by default. Every instrumented spot checks metrics.enabled first, so when disabled the cost is
+    one attribute lookup. Turn it on at runtime with metrics.enable() and read it with metrics.snapshot().
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._high_water: dict[str, float] = {}
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self.started = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def high_water(self, name: str, value: float):
+        """
+        Keeps the largest value seen for name, e.g. a queue depth.
+        """
+        with self._lock:
+            if value > self._high_water.get(name, float("-inf")):
+                self._high_water[name] = value
+
+    def histogram(self, stage: str, msg_type: str) -> Histogram:
+        key = (stage, msg_type)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def record(self, stage: str, msg_type: str, seconds: float):
+        """
+        Records one latency for a stage and message type.
+        """
+        self.histogram(stage, msg_type).record(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns {"uptime_s", "counters", "high_water", "latency": {stage: {message type: Histogram.snapshot()}}}.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            high_water = dict(self._high_water)
+            histograms = list(self._histograms.items())
+        latency: dict[str, dict[str, dict[str, float]]] = {}
+        for (stage, msg_type), histogram in sorted(histograms):
+            latency.setdefault(stage, {})[msg_type] = histogram.snapshot()
+        return {
+            "uptime_s": time.time() - self.started,
+            "counters": counters,
+            "high_water": high_water,
+            "latency": latency,
+        }
+
+    def reset(self):
+        """
+        Clears every counter, high water mark and histogram.
+        """
+        with self._lock:
+            self._counters = {}
+            self._high_water = {}
+            self._histograms = {}
+            self.started = time.time()
+
+
+# Shared by the whole process, like the pymavlink dialect
+metrics = MetricsRegistry()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from mavcore.mav_message import SendPriority
+
+
+class Outbox:
+    """
+    Outbound queue with one FIFO lane per SendPriority, read by the Writer thread.
+
+    CONTROL frames (setpoints, rc override) always go out first.
+    NORMAL frames go before BULK frames (rtk, status text), but BULK is never starved: one BULK frame is sent
+    after every bulk_every NORMAL frames in a row, or as soon as the oldest one has waited max_bulk_wait seconds.
+    With prioritize=False everything shares one FIFO lane, like a plain queue.
+
+    gate: optional gate(lane, item) -> seconds called before an item leaves its lane. 0 lets it out,
+        anything else holds the lane back that long while the other lanes keep going (see LinkBudget).
+    """
+
+    def __init__(
+        self,
+        prioritize: bool = True,
+        bulk_every: int = 8,
+        max_bulk_wait: float = 0.5,
+        gate: Callable[[SendPriority, Any], float] | None = None,
+    ):
+        self.prioritize = prioritize
+        self.bulk_every = max(1, bulk_every)
+        self.max_bulk_wait = max_bulk_wait
+        self.gate = gate
+        self._retry_in: float | None = None
+        self._cond = threading.Condition()
+        self._lanes: dict[SendPriority, deque[tuple[float, Any]]] = {
+            priority: deque() for priority in SendPriority
+        }
+        self._normal_streak = 0
+
+    def lane_for(self, priority: int) -> SendPriority:
+        """
+        Maps a MAVMessage priority to the lane it is queued in.
+        """
+        if not self.prioritize:
+            return SendPriority.NORMAL
+        if priority >= SendPriority.CONTROL:
+            return SendPriority.CONTROL
+        if priority <= SendPriority.BULK:
+            return SendPriority.BULK
+        return SendPriority.NORMAL
+
+    def put(self, item: Any, priority: int = SendPriority.NORMAL):
+        with self._cond:
+            self._lanes[self.lane_for(priority)].append((time.monotonic(), item))
+            self._cond.notify()
+
+    def lanes_in_use(self) -> list[SendPriority]:
+        return list(SendPriority) if self.prioritize else [SendPriority.NORMAL]
+
+    def put_all(self, item: Any):
+        """
+        Queues item at the back of every lane in use.
+        Used for flush markers, which are done once every copy has come out.
+        """
+        with self._cond:
+            now = time.monotonic()
+            for lane in self.lanes_in_use():
+                self._lanes[lane].append((now, item))
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None) -> Any:
+        """
+        Removes and returns the next item to send, waiting up to timeout seconds. Returns None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                item = self._select()
+                if item is not None:
+                    return item
+                wait = self._retry_in
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def qsize(self) -> dict[str, int]:
+        with self._cond:
+            return {lane.name: len(items) for lane, items in self._lanes.items()}
+
+    def _select(self) -> Any:
+        self._retry_in = None
+        control = self._lanes[SendPriority.CONTROL]
+        if control:
+            item = self._take(SendPriority.CONTROL, control)
+            if item is not None:
+                return item
+        normal = self._lanes[SendPriority.NORMAL]
+        bulk = self._lanes[SendPriority.BULK]
+        bulk_due = bool(bulk) and (
+            not normal
+            or self._normal_streak >= self.bulk_every
+            or time.monotonic() - bulk[0][0] >= self.max_bulk_wait
+        )
+        if bulk_due:
+            item = self._take(SendPriority.BULK, bulk)
+            if item is not None:
+                self._normal_streak = 0
+                return item
+        if normal:
+            item = self._take(SendPriority.NORMAL, normal)
+            if item is not None:
+                self._normal_streak += 1
+                return item
+        if bulk and not bulk_due:
+            # NORMAL is held back by the gate, BULK may go ahead of it
+            item = self._take(SendPriority.BULK, bulk)
+            if item is not None:
+                self._normal_streak = 0
+                return item
+        return None
+
+    def _take(self, lane: SendPriority, items: deque[tuple[float, Any]]) -> Any:
+        """
+        Pops the head of a lane unless the gate holds it back.
+        """
+        if self.gate is not None:
+            wait = self.gate(lane, items[0][1])
+            if wait > 0.0:
+                if self._retry_in is None or wait < self._retry_in:
+                    self._retry_in = wait
+                return None
+        return items.popleft()[1]
@@ -1,3 +1,5 @@
+import asyncio
+
 from mavcore.mav_sender import Sender
 from mavcore.mav_receiver import Receiver
 
@@ -15,3 +17,12 @@ class MAVProtocol:
         Uses the sender and receiver to compelete a task according to a protcol. Automatically run when MAVDevice.run_protocol is used.
         """
         pass
+
+    async def run_async(self, sender: Sender, receiver: Receiver):
+        """
+        Async version of run, awaited by AsyncMAVDevice.run_protocol. <br>
+        Defaults to running run on the event loop's executor. Override it to wait with
+        await asyncio.wrap_future(receiver.expect_msg(msg)) so no thread is blocked.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.run, sender, receiver)
@@ -1,18 +1,135 @@
-import time
 import threading
+import time
 from queue import Queue
 from typing import Any
 from mavcore.mav_message import MAVMessage
+from mavcore.mav_future import MAVFuture
+from mavcore.mav_dispatcher import Dispatcher
+from mavcore.mav_history import History
+from mavcore.mav_metrics import QUEUE_WAIT, metrics
+from mavcore.mav_stats import StreamStats
+
+BACKLOG_WARNING = 50  # receiver queue length that prints a warning
+BACKLOG_WARNING_PERIOD = 5.0  # seconds between backlog warnings
 
 
 class Receiver:
-    def __init__(self, history_size: int = 100):
-        self.history_dict: dict[str, list] = {}
+    def __init__(self, history_size: int = 100, dispatcher: Dispatcher | None = None):
+        """
+        Routes received pymavlink messages to listeners and waiters.
+        Routing is keyed on (message name, source system, source component), so listeners only get
+        messages from the sources they accept (see MAVMessage.from_source).
+
+        dispatcher: if given, listeners are processed on this shared worker pool instead of one thread each.
+        history_size: default capacity of enable_history.
+        """
+        self.dispatcher = dispatcher
+        # Message name -> History of its samples, see enable_history
+        self.history_dict: dict[str, History] = {}
         self.queue = Queue()
         self.listeners: dict[str, list[MAVMessage]] = {}
         self.waiting: dict[str, list[MAVMessage]] = {}
         self.history_size = history_size
         self.receiving = False
+        self._lock = threading.Lock()
+        # Names of the message types with a listener or waiter, replaced (never mutated) on every change
+        self.subscriptions: frozenset[str] = frozenset()
+        # (name, src system, src component) -> listeners accepting it, filled on first use
+        # and replaced with an empty dict whenever listeners change
+        self._routes: dict[tuple[str, int, int], tuple[MAVMessage, ...]] = {}
+        # Per vehicle receivers fed by this one (see attach), keyed by system id
+        self.vehicle_receivers: dict[int, Receiver] = {}
+        self._parent: Receiver | None = None
+        self._own_subscriptions: frozenset[str] = frozenset()
+        self._last_backlog_warning = 0.0
+        # Receive statistics of every message type delivered here, i.e. every subscribed type
+        self.stream_stats: dict[str, StreamStats] = {}
+
+    def _update_subscriptions(self):
+        """
+        Rebuilds subscriptions and drops the route cache. Call with _lock held.
+        """
+        self._own_subscriptions = (
+            frozenset(name for name, msgs in self.listeners.items() if len(msgs) > 0)
+            | frozenset(self.waiting)
+            | frozenset(self.history_dict)
+        )
+        self._routes = {}
+        self._publish_subscriptions()
+
+    def _publish_subscriptions(self):
+        """
+        Combines own and vehicle receiver subscriptions and passes the change up. Call with _lock held.
+        """
+        subscriptions = self._own_subscriptions
+        for child in self.vehicle_receivers.values():
+            subscriptions = subscriptions | child.subscriptions
+        self.subscriptions = subscriptions
+        if self._parent is not None:
+            self._parent._child_changed()
+
+    def _child_changed(self):
+        with self._lock:
+            self._publish_subscriptions()
+
+    def attach(self, system_id: int, receiver: "Receiver"):
+        """
+        Forwards every message from system_id to receiver after routing it here.
+        The attached receiver is fed from this receiver's thread and must not be started itself.
+        """
+        with self._lock:
+            if receiver._parent is not None and receiver._parent is not self:
+                raise ValueError("Receiver is already attached to another receiver")
+            receiver._parent = self
+            self.vehicle_receivers[system_id] = receiver
+            self._publish_subscriptions()
+
+    def detach(self, system_id: int) -> bool:
+        """
+        Stops forwarding messages from system_id. Returns False if nothing was attached for it.
+        """
+        with self._lock:
+            receiver = self.vehicle_receivers.pop(system_id, None)
+            if receiver is None:
+                return False
+            receiver._parent = None
+            self._publish_subscriptions()
+            return True
+
+    def route(self, name: str, system: int, component: int) -> tuple[MAVMessage, ...]:
+        """
+        Returns the listeners for a message name from system / component.
+        """
+        routes = self._routes
+        listeners = routes.get((name, system, component))
+        if listeners is None:
+            with self._lock:
+                listeners = tuple(
+                    listener
+                    for listener in self.listeners.get(name, ())
+                    if listener.accepts_source(system, component)
+                )
+                if routes is self._routes:
+                    routes[(name, system, component)] = listeners
+        return listeners
+
+    def _take_waiters(self, name: str, system: int, component: int) -> list[MAVMessage]:
+        """
+        Removes and returns the waiters for a message name that accept system / component.
+        """
+        with self._lock:
+            waiters = self.waiting.get(name)
+            if waiters is None:
+                return []
+            taken = [w for w in waiters if w.accepts_source(system, component)]
+            if len(taken) == 0:
+                return taken
+            if len(taken) == len(waiters):
+                self.waiting.pop(name)
+            else:
+                self.waiting[name] = [w for w in waiters if w not in taken]
+            self._update_subscriptions()
+            return taken
 
     def __add_to_dict(
         self, target_dict: dict[str, list[MAVMessage]], msg: MAVMessage
@@ -25,16 +142,42 @@ class Receiver:
                 target_dict[msg.name].append(msg)
             else:
                 target_dict[msg.name] = [msg]
-            msg._start_callback_thread()
+            if self.dispatcher is not None:
+                msg._attach_dispatcher(self.dispatcher)
+            else:
+                msg._start_callback_thread()
         return msg
 
     def add_listener(self, msg: MAVMessage) -> MAVMessage:
-        return self.__add_to_dict(self.listeners, msg)
+        with self._lock:
+            self.__add_to_dict(self.listeners, msg)
+            self._update_subscriptions()
+        return msg
 
     def _add_waiter(self, msg: MAVMessage) -> MAVMessage:
-        return self.__add_to_dict(self.waiting, msg)
+        with self._lock:
+            self.__add_to_dict(self.waiting, msg)
+            self._update_subscriptions()
+        return msg
+
+    def _remove_waiter(self, msg: MAVMessage) -> bool:
+        with self._lock:
+            waiters = self.waiting.get(msg.name)
+            if waiters is None or msg not in waiters:
+                return False
+            waiters.remove(msg)
+            if len(waiters) == 0:
+                self.waiting.pop(msg.name, None)
+                self._update_subscriptions()
+            return True
 
     def remove_listener(self, msg: MAVMessage | str) -> bool:
+        with self._lock:
+            removed = self.__remove_listener(msg)
+            self._update_subscriptions()
+        return removed
+
+    def __remove_listener(self, msg: MAVMessage | str) -> bool:
         if isinstance(msg, str):
             res = self.listeners.pop(msg, None)  # removes all with that message name
             return res is not None
@@ -42,7 +185,7 @@ class Receiver:
             if len(msg.submessages) > 0:
                 removed_all = True
                 for submsg in msg.submessages:
-                    removed = self.remove_listener(submsg)
+                    removed = self.__remove_listener(submsg)
                     removed_all = removed_all and removed
                 return removed_all
             elif msg.name in self.listeners and msg in self.listeners[msg.name]:
@@ -64,56 +207,126 @@ class Receiver:
     def process(self):
         while self.receiving:
             timestamp, msg = self.queue.get()
-            msg_name = msg.get_type()
-
-            if self.queue.qsize() > 50:
-                print(f"queue size: {self.queue.qsize()}", flush=True)
-
-            # Check if waiting for this message
-            if msg_name in self.waiting:
-                for wait_msg in self.waiting[msg_name]:
-                    wait_msg.update_timestamp(timestamp)
-                    wait_msg.process_message(msg)
-                self.waiting.pop(msg_name)
-
-            # Update listeners
-            if msg_name in self.listeners:
-                for listener in self.listeners[msg_name]:
-                    if listener.timestamp < timestamp:
-                        listener.update_timestamp(timestamp)
-                        listener.process_message(msg)
-
-            # # Manage message history
-            # if msg_name in self.history_dict:
-            #     self.history_dict[msg_name].insert(0, (timestamp, msg))
-
-            #     # Manage history length
-            #     if len(self.history_dict[msg_name]) > self.history_size:
-            #         self.history_dict[msg_name].pop()
-            # else:
-            #     # Brand new message type
-            #     self.history_dict[msg_name] = [(timestamp, msg)]
+
+            backlog = self.queue.qsize()
+            if metrics.enabled:
+                metrics.record(QUEUE_WAIT, msg.get_type(), time.time() - timestamp)
+                metrics.high_water("receiver_queue", backlog)
+            if backlog > BACKLOG_WARNING:
+                now = time.monotonic()
+                if now - self._last_backlog_warning > BACKLOG_WARNING_PERIOD:
+                    self._last_backlog_warning = now
+                    print(f"Receiver falling behind, queue size: {backlog}", flush=True)
+
+            self.deliver(timestamp, msg)
+
+    def deliver(self, timestamp: float, msg: Any):
+        """
+        Routes one received message to the waiters, listeners and vehicle receiver accepting it.
+        Runs on the receiving thread.
+        """
+        msg_name = msg.get_type()
+        # Carried to decode (MAVMessage.decoded_timestamp), listener timestamps move on when newer ones queue
+        msg._mavcore_received = timestamp
+        src_system = msg.get_srcSystem()
+        src_component = msg.get_srcComponent()
+
+        stats = self.stream_stats.get(msg_name)
+        if stats is None:
+            stats = self.stream_stats[msg_name] = StreamStats()
+        stats.update(timestamp)
+
+        history = self.history_dict.get(msg_name)
+        if history is not None:
+            history.append(timestamp, msg)
+
+        # Check if waiting for this message
+        if msg_name in self.waiting:
+            for wait_msg in self._take_waiters(msg_name, src_system, src_component):
+                wait_msg.update_timestamp(timestamp)
+                wait_msg.process_message(msg)
+
+        # Update listeners
+        for listener in self.route(msg_name, src_system, src_component):
+            if listener.timestamp < timestamp:
+                listener.update_timestamp(timestamp)
+                listener.process_message(msg)
+
+        vehicle_receiver = self.vehicle_receivers.get(src_system)
+        if vehicle_receiver is not None:
+            vehicle_receiver.deliver(timestamp, msg)
+
+    def enable_history(
+        self, name: str, capacity: int | None = None, fields: list[str] | None = None
+    ) -> History:
+        """
+        Starts keeping the last capacity (default history_size) samples of a message type, all numeric fields
+        unless fields are given. Recorded on the receiving thread before listeners run, so no sample is
+        missed. Enabling a type again returns its existing History.
+        """
+        with self._lock:
+            history = self.history_dict.get(name)
+            if history is None:
+                history = History(
+                    name,
+                    capacity if capacity is not None else self.history_size,
+                    fields,
+                )
+                self.history_dict[name] = history
+                self._update_subscriptions()
+            return history
+
+    def disable_history(self, name: str) -> bool:
+        """
+        Stops keeping history of a message type. Returns False if it had none.
+        """
+        with self._lock:
+            if self.history_dict.pop(name, None) is None:
+                return False
+            self._update_subscriptions()
+            return True
+
+    def get_stream_stats(self, name: str) -> StreamStats | None:
+        """
+        Receive statistics of a message type, None if it was never received.
+        """
+        return self.stream_stats.get(name)
+
+    def stream_report(self, now: float | None = None) -> dict[str, dict]:
+        """
+        StreamStats.snapshot of every message type received so far.
+        """
+        return {
+            name: stats.snapshot(now) for name, stats in list(self.stream_stats.items())
+        }
+
+    def expect_msg(self, msg: MAVMessage) -> MAVFuture:
+        """
+        Registers msg to be filled by the next matching message and returns a MAVFuture. <br>
+        The future resolves with msg as soon as it is decoded. Cancelling it stops the wait.
+        """
+        if msg._future is not None and not msg._future.done():
+            msg._future.cancel()
+        msg._decoded = False
+        msg.timestamp = 0.0
+        future = MAVFuture(msg, on_cancel=lambda _: self._remove_waiter(msg))
+        msg._future = future
+        self._add_waiter(msg)
+        return future
 
     def wait_for_msg(
         self, msg: MAVMessage, timeout_seconds: float = -1.0, blocking=True
     ) -> MAVMessage:
         """
         Will wait for msg to occur. Once it does, will return the updated object. <br>
-        If blocking will return a FutureMsg.
+        If not blocking, returns msg right away; use msg.wait_until_finished() or msg._future to wait on it.
         """
-        msg._decoded = False
+        future = self.expect_msg(msg)
         if not blocking:
-            msg._thread = threading.Thread(
-                target=lambda: self.wait_for_msg(msg), daemon=True
-            )
-            msg._thread.start()
             return msg
 
-        timeout_timer = time.time()
-        msg.timestamp = 0.0
-        self._add_waiter(msg)
-        while (msg.timestamp == 0.0 or not msg._decoded) and (
-            timeout_seconds < 0 or time.time() - timeout_timer < timeout_seconds
+        if not msg.wait_until_finished(
+            None if timeout_seconds < 0 else timeout_seconds
         ):
-            time.sleep(0.01)
+            future.cancel()
         return msg
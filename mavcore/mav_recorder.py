@@ -0,0 +1,269 @@
+import os
+import struct
+import threading
+from typing import Any, Iterator
+
+import numpy as np
+import pymavlink.dialects.v20.all as dialect
+
+DATA_MAGIC = b"MAVCREC1"
+INDEX_MAGIC = b"MAVCIDX1"
+RECORD_HEADER = struct.Struct("<dH")  # receive timestamp (time.time(), s), frame length
+INDEX_DTYPE = np.dtype([("msgid", "<u4"), ("timestamp", "<f8"), ("offset", "<u8")])
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class Recorder:
+    """
+    Appends every raw MAVLink frame with its receive timestamp to a binary log, see MAVDevice.start_recording.
+
+    Data file: DATA_MAGIC, then per frame RECORD_HEADER + frame bytes.
+    Index file (path + ".idx"): INDEX_MAGIC, then one INDEX_DTYPE entry (msgid, timestamp, offset of the record)
+    per frame. Index timestamps never decrease (clock steps back are clamped) so they can be binary searched.
+
+    record only queues the frame. A background thread writes the queued frames in batches every
+    flush_interval seconds, or as soon as batch_frames are queued. Data is written before its index entries,
+    so after a crash the index never points past the data. An existing log is appended to.
+    """
+
+    def __init__(
+        self, path: str, flush_interval: float = 0.5, batch_frames: int = 1024
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_frames = batch_frames
+        self._data = self._open(path, DATA_MAGIC)
+        self._last_timestamp = self._trim_index(index_path(path))
+        self._index = self._open(index_path(path), INDEX_MAGIC)
+        self._offset = self._data.tell()
+        self._cond = threading.Condition()
+        # Held while taking a batch and writing it, flush and the thread write one batch at a time in order
+        self._write_lock = threading.Lock()
+        self._pending: list[tuple[float, int, bytes]] = []
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="mavcore-recorder", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _trim_index(path: str) -> float:
+        """
+        Drops a partly written last entry (e.g. after a crash) and returns the last indexed timestamp.
+        """
+        if not os.path.exists(path):
+            return 0.0
+        entries = (os.path.getsize(path) - len(INDEX_MAGIC)) // INDEX_DTYPE.itemsize
+        if entries <= 0:
+            return 0.0
+        os.truncate(path, len(INDEX_MAGIC) + entries * INDEX_DTYPE.itemsize)
+        with open(path, "rb") as f:
+            f.seek(len(INDEX_MAGIC) + (entries - 1) * INDEX_DTYPE.itemsize)
+            last = np.frombuffer(f.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)
+        return float(last["timestamp"][0])
+
+    @staticmethod
+    def _open(path: str, magic: bytes):
+        f = open(path, "ab")
+        if f.tell() == 0:
+            f.write(magic)
+        else:
+            with open(path, "rb") as existing:
+                if existing.read(len(magic)) != magic:
+                    f.close()
+                    raise ValueError(f"{path} is not a mavcore telemetry log")
+        return f
+
+    def record(self, timestamp: float, msgid: int, frame: Any):
+        """
+        Queues one raw frame. Called from the reading thread, never waits on disk.
+        """
+        with self._cond:
+            self._pending.append((timestamp, msgid, bytes(frame)))
+            if len(self._pending) >= self.batch_frames:
+                self._cond.notify()
+
+    def flush(self):
+        """
+        Writes everything queued so far from the calling thread.
+        """
+        with self._write_lock:
+            with self._cond:
+                pending, self._pending = self._pending, []
+            self._write(pending)
+
+    def stop(self):
+        """
+        Writes what is still queued and closes the files.
+        """
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self.running and len(self._pending) < self.batch_frames:
+                    self._cond.wait(self.flush_interval)
+                if not self.running:
+                    return
+            self.flush()
+
+    def _write(self, pending: list[tuple[float, int, bytes]]):
+        """
+        Appends one batch to the data file and index. Call with _write_lock held.
+        """
+        if len(pending) == 0:
+            return
+        entries = np.empty(len(pending), dtype=INDEX_DTYPE)
+        chunks = []
+        offset = self._offset
+        last = self._last_timestamp
+        for i, (timestamp, msgid, frame) in enumerate(pending):
+            last = max(last, timestamp)
+            entries[i] = (msgid, last, offset)
+            chunks.append(RECORD_HEADER.pack(timestamp, len(frame)))
+            chunks.append(frame)
+            offset += RECORD_HEADER.size + len(frame)
+        self._data.write(b"".join(chunks))
+        self._data.flush()
+        self._index.write(entries.tobytes())
+        self._index.flush()
+        self.bytes_written += offset - self._offset
+        self.frames_written += len(pending)
+        self._offset = offset
+        self._last_timestamp = last
+
+
+class TelemetryLog:
+    """
+    Reads a log written by Recorder. Seeking by time or message type only touches the index,
+    so jumping anywhere in a multi-hour flight does not scan the data file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = open(path, "rb")
+        if self._data.read(len(DATA_MAGIC)) != DATA_MAGIC:
+            raise ValueError(f"{path} is not a mavcore telemetry log")
+        idx = index_path(path)
+        with open(idx, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{idx} is not a mavcore telemetry index")
+        count = (os.path.getsize(idx) - len(INDEX_MAGIC)) // INDEX_DTYPE.itemsize
+        if count > 0:
+            self.index = np.memmap(
+                idx,
+                dtype=INDEX_DTYPE,
+                mode="r",
+                offset=len(INDEX_MAGIC),
+                shape=(count,),
+            )
+        else:
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self._timestamps: np.ndarray | None = None
+        self._by_msgid: dict[int, np.ndarray] = {}
+        self._mav = dialect.MAVLink(None)
+        self._mav.robust_parsing = True
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self) -> "TelemetryLog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def time_range(self) -> tuple[float, float]:
+        """
+        (first, last) receive timestamp in the log.
+        """
+        if len(self.index) == 0:
+            return (0.0, 0.0)
+        return (float(self.index["timestamp"][0]), float(self.index["timestamp"][-1]))
+
+    def seek_time(self, timestamp: float) -> int:
+        """
+        Position of the first frame received at or after timestamp.
+        """
+        if self._timestamps is None:
+            # Contiguous copy, searching the strided column directly would copy it on every call
+            self._timestamps = np.ascontiguousarray(self.index["timestamp"])
+        return int(np.searchsorted(self._timestamps, timestamp, side="left"))
+
+    def positions(self, msgid: int) -> np.ndarray:
+        """
+        Positions of every frame with msgid, in time order.
+        """
+        positions = self._by_msgid.get(msgid)
+        if positions is None:
+            positions = np.flatnonzero(self.index["msgid"] == msgid)
+            self._by_msgid[msgid] = positions
+        return positions
+
+    def read(self, position: int) -> tuple[float, int, bytes]:
+        """
+        Returns (timestamp, msgid, frame) of the frame at position.
+        """
+        entry = self.index[position]
+        self._data.seek(int(entry["offset"]))
+        timestamp, length = RECORD_HEADER.unpack(self._data.read(RECORD_HEADER.size))
+        return timestamp, int(entry["msgid"]), self._data.read(length)
+
+    def frames(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        msgids: list[int] | None = None,
+    ) -> Iterator[tuple[float, int, bytes]]:
+        """
+        Yields (timestamp, msgid, frame) for frames received in [start, end), optionally only the given msgids.
+        """
+        first = 0 if start is None else self.seek_time(start)
+        last = len(self.index) if end is None else self.seek_time(end)
+        if msgids is None:
+            positions: Any = range(first, last)
+        elif not msgids:
+            return
+        else:
+            positions = np.sort(np.concatenate([self.positions(m) for m in msgids]))
+            positions = positions[(positions >= first) & (positions < last)]
+        for position in positions:
+            yield self.read(int(position))
+
+    def messages(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        types: list[str] | None = None,
+    ) -> Iterator[tuple[float, Any]]:
+        """
+        Yields (timestamp, pymavlink message) in [start, end), optionally only the given message names.
+        Frames that fail to decode are skipped.
+        """
+        msgids = None
+        if types is not None:
+            msgids = [
+                msgid
+                for msgid, msg_type in dialect.mavlink_map.items()
+                if msg_type.msgname in types
+            ]
+        for timestamp, _, frame in self.frames(start, end, msgids):
+            try:
+                msg = self._mav.decode(bytearray(frame))
+            except Exception:
+                continue
+            yield timestamp, msg
@@ -0,0 +1,250 @@
+import mmap
+import struct
+import time
+from typing import Iterator
+
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.mav_dispatcher import Dispatcher
+from mavcore.mav_ingest import IFLAG_SIGNED, MAGIC_V1, MAGIC_V2
+from mavcore.mav_message import MAVMessage
+from mavcore.mav_receiver import Receiver
+from mavcore.mav_recorder import DATA_MAGIC, TelemetryLog
+
+# Microseconds since epoch, before every frame of a .tlog
+TLOG_TIMESTAMP = struct.Struct(">Q")
+# Queued messages per listener a threaded replay keeps below, MAVMessage queues hold 15
+LISTENER_QUEUE_ROOM = 14
+
+
+def read_tlog(path: str) -> Iterator[tuple[float, int, bytes]]:
+    """
+    Yields (timestamp, msgid, frame) from a pymavlink / mavproxy .tlog. Stops at the first broken record.
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = 0
+            end = len(data)
+            while pos + TLOG_TIMESTAMP.size + 6 <= end:
+                (usec,) = TLOG_TIMESTAMP.unpack_from(data, pos)
+                frame_start = pos + TLOG_TIMESTAMP.size
+                magic = data[frame_start]
+                if magic == MAGIC_V2:
+                    if frame_start + 10 > end:
+                        return
+                    size = data[frame_start + 1] + 12
+                    if data[frame_start + 2] & IFLAG_SIGNED:
+                        size += 13
+                    msgid = int.from_bytes(
+                        data[frame_start + 7 : frame_start + 10], "little"
+                    )
+                elif magic == MAGIC_V1:
+                    size = data[frame_start + 1] + 8
+                    msgid = data[frame_start + 5]
+                else:
+                    return
+                if frame_start + size > end:
+                    return
+                yield usec * 1.0e-6, msgid, data[frame_start : frame_start + size]
+                pos = frame_start + size
+
+
+def read_log(
+    path: str, start: float | None = None, end: float | None = None
+) -> Iterator[tuple[float, int, bytes]]:
+    """
+    Yields (timestamp, msgid, frame) from a Recorder log or a .tlog, whichever path is.
+    start / end (receive timestamps) only seek in Recorder logs, tlogs are read from the beginning.
+    """
+    with open(path, "rb") as f:
+        is_recorder_log = f.read(len(DATA_MAGIC)) == DATA_MAGIC
+    if is_recorder_log:
+        with TelemetryLog(path) as log:
+            yield from log.frames(start, end)
+        return
+    for timestamp, msgid, frame in read_tlog(path):
+        if start is not None and timestamp < start:
+            continue
+        if end is not None and timestamp >= end:
+            return
+        yield timestamp, msgid, frame
+
+
+class ReplayEngine:
+    """
+    Replays a recorded flight (Recorder log or .tlog) into a Receiver with the original receive timestamps,
+    so listeners, FullPose and protocols can be run and benchmarked without a vehicle.
+    Like Ingest, only message types the Receiver subscribes to are decoded.
+
+    speed: 1.0 replays in real time, N replays N times faster, None replays as fast as possible.
+    deterministic: messages are routed and listeners decoded and called back on the thread calling run,
+        in log order, so two replays of the same log leave listeners in the same state. The default Receiver
+        uses an inline Dispatcher for this, a Receiver passed in should too (Dispatcher(0)).
+        If False, messages go through receiver.update_queue and the receiver / listener threads like on a
+        live link. Replaying as fast as possible then waits whenever the receiver queue or a listener queue
+        backs up, so the reported rate is the highest rate the pipeline sustains without dropping messages.
+        Listener max rates (MAVMessage.set_max_rate) follow the wall clock and are not deterministic.
+    start / end: only replay frames received in [start, end).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        receiver: Receiver | None = None,
+        speed: float | None = 1.0,
+        deterministic: bool = True,
+        start: float | None = None,
+        end: float | None = None,
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be > 0, or None to replay as fast as possible")
+        self.path = path
+        if receiver is None:
+            receiver = Receiver(dispatcher=Dispatcher(0) if deterministic else None)
+        self.receiver = receiver
+        self.speed = speed
+        self.deterministic = deterministic
+        self.start = start
+        self.end = end
+        self.running = False
+        self._mav = dialect.MAVLink(None)
+        self._mav.robust_parsing = True
+        self._names: frozenset[str] | None = None
+        self._wanted: frozenset[int] = frozenset()
+        self._listeners: list[MAVMessage] = []
+
+    def add_listener(self, listener: MAVMessage) -> MAVMessage:
+        """
+        Pass in a MAVMessage to fill from the log.
+        """
+        self.receiver.add_listener(listener)
+        return listener
+
+    def stop(self):
+        """
+        Stops a running replay after the current frame.
+        """
+        self.running = False
+
+    def run(self) -> dict[str, float]:
+        """
+        Replays the log and returns its stats:
+        frames, decoded, bad_frames (failed to decode), log_seconds (recorded time span), elapsed_seconds,
+        frames_per_second / decoded_per_second (replay rate), max_lag_seconds (furthest behind the paced
+        schedule), max_queue (deepest receiver queue) and dropped (listener queue overflows).
+        """
+        receiver = self.receiver
+        deliver = receiver.deliver if self.deterministic else receiver.update_queue
+        if not self.deterministic and not receiver.receiving:
+            receiver.start_receiving()
+        dropped_before = self._dropped()
+
+        frames = decoded = bad_frames = 0
+        max_lag = 0.0
+        max_queue = 0
+        first_timestamp = last_timestamp = None
+        wall_start = time.perf_counter()
+        self.running = True
+        for timestamp, msgid, frame in read_log(self.path, self.start, self.end):
+            if not self.running:
+                break
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            last_timestamp = timestamp
+            frames += 1
+
+            if self.speed is not None:
+                due = wall_start + (timestamp - first_timestamp) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+
+            self._refresh()
+            if msgid not in self._wanted:
+                continue
+            if self.speed is None and not self.deterministic:
+                self._wait_for_backlog()
+            try:
+                msg = self._mav.decode(bytearray(frame))
+            except Exception:
+                bad_frames += 1
+                continue
+            deliver(timestamp, msg)
+            decoded += 1
+            if not self.deterministic:
+                max_queue = max(max_queue, receiver.queue.qsize())
+        self.running = False
+
+        if not self.deterministic:
+            self._drain()
+        elapsed = time.perf_counter() - wall_start
+        log_seconds = (
+            0.0 if first_timestamp is None else last_timestamp - first_timestamp
+        )
+        return {
+            "frames": frames,
+            "decoded": decoded,
+            "bad_frames": bad_frames,
+            "log_seconds": log_seconds,
+            "elapsed_seconds": elapsed,
+            "frames_per_second": frames / elapsed if elapsed > 0 else 0.0,
+            "decoded_per_second": decoded / elapsed if elapsed > 0 else 0.0,
+            "max_lag_seconds": max_lag,
+            "max_queue": max_queue,
+            "dropped": self._dropped() - dropped_before,
+        }
+
+    def _refresh(self):
+        """
+        Rebuilds the set of msgids to decode when the receiver's subscriptions changed.
+        """
+        names = self.receiver.subscriptions
+        if names is self._names:
+            return
+        self._names = names
+        self._listeners = self._find_listeners()
+        self._wanted = frozenset(
+            msgid
+            for msgid, msg_type in dialect.mavlink_map.items()
+            if msg_type.msgname in names
+        )
+
+    def _find_listeners(self, receiver: Receiver | None = None) -> list[MAVMessage]:
+        receiver = self.receiver if receiver is None else receiver
+        listeners = [
+            listener for msgs in list(receiver.listeners.values()) for listener in msgs
+        ]
+        for child in list(receiver.vehicle_receivers.values()):
+            listeners.extend(self._find_listeners(child))
+        return listeners
+
+    def _dropped(self) -> int:
+        return sum(listener.dropped_count for listener in self._find_listeners())
+
+    def _wait_for_backlog(self):
+        """
+        Waits until every listener queue has room for everything still in the receiver queue,
+        each of those messages adds at most one to a listener queue.
+        """
+        queue = self.receiver.queue
+        while True:
+            backlog = max(
+                (listener._msg_queue.qsize() for listener in self._listeners),
+                default=0,
+            )
+            if queue.qsize() + backlog < LISTENER_QUEUE_ROOM:
+                return
+            time.sleep(0.0002)
+
+    def _drain(self):
+        """
+        Waits until the receiver and listener queues are empty.
+        """
+        while self.receiver.queue.qsize() > 0 or any(
+            not listener._msg_queue.empty() for listener in self._find_listeners()
+        ):
+            time.sleep(0.001)
@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable
+
+
+class _Entry:
+    __slots__ = ("msg", "send", "period", "system_id", "component_id", "seq")
+
+    def __init__(
+        self,
+        msg: Any,
+        send: Callable[[Any, int | None, int | None], Any],
+        period: float,
+        system_id: int | None,
+        component_id: int | None,
+    ):
+        self.msg = msg
+        self.send = send
+        self.period = period
+        self.system_id = system_id
+        self.component_id = component_id
+        # Matches the live heap item, older heap items for this entry are stale
+        self.seq = -1
+
+
+class PeriodicScheduler:
+    """
+    Sends messages repeatedly, each at its own period, from a single thread.
+
+    Messages are keyed by identity, so registering the same MAVMessage again only updates it.
+    The next due times are kept in a min-heap and the thread sleeps exactly until the earliest one,
+    so CPU use does not depend on how long the scheduler has been running.
+    If a send runs late, the missed periods are skipped instead of sent in a burst.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, int]] = []  # (deadline, seq, key)
+        self._entries: dict[int, _Entry] = {}
+        self._counter = itertools.count()
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="mavcore-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def register(
+        self,
+        msg: Any,
+        send: Callable[[Any, int | None, int | None], Any],
+        period: float,
+        system_id: int | None = None,
+        component_id: int | None = None,
+    ):
+        """
+        Calls send(msg, system_id, component_id) every period seconds, starting one period from now.
+        If msg is already registered, its period, ids and next due time are updated.
+        """
+        if period <= 0.0:
+            raise ValueError("period must be > 0")
+        with self._cond:
+            entry = self._entries.get(id(msg))
+            if entry is None:
+                entry = _Entry(msg, send, period, system_id, component_id)
+                self._entries[id(msg)] = entry
+            else:
+                entry.send = send
+                entry.period = period
+                entry.system_id = system_id
+                entry.component_id = component_id
+            self._push(entry, time.monotonic() + period)
+
+    def update_period(self, msg: Any, period: float) -> bool:
+        """
+        Changes the period of a registered message. The next send is one new period after the update.
+        Returns False if msg is not registered.
+        """
+        if period <= 0.0:
+            raise ValueError("period must be > 0")
+        with self._cond:
+            entry = self._entries.get(id(msg))
+            if entry is None:
+                return False
+            entry.period = period
+            self._push(entry, time.monotonic() + period)
+            return True
+
+    def cancel(self, msg: Any) -> bool:
+        """
+        Stops repeating msg. Returns False if msg was not registered.
+        """
+        with self._cond:
+            # The heap item is left behind and skipped as stale when it comes up
+            return self._entries.pop(id(msg), None) is not None
+
+    def is_registered(self, msg: Any) -> bool:
+        with self._cond:
+            return id(msg) in self._entries
+
+    def registered(self) -> list[Any]:
+        """
+        Returns the messages currently being repeated.
+        """
+        with self._cond:
+            return [entry.msg for entry in self._entries.values()]
+
+    def stop(self):
+        """
+        Stops the scheduler thread. Registered messages are no longer sent.
+        """
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self._thread.join()
+
+    def _push(self, entry: _Entry, deadline: float):
+        entry.seq = next(self._counter)
+        heapq.heappush(self._heap, (deadline, entry.seq, id(entry.msg)))
+        if self._heap[0][1] == entry.seq:
+            self._cond.notify()  # New earliest deadline, wake the thread up
+
+    def _loop(self):
+        with self._cond:
+            while self.running:
+                if len(self._heap) == 0:
+                    self._cond.wait()
+                    continue
+                deadline, seq, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is None or entry.seq != seq:
+                    heapq.heappop(self._heap)  # Cancelled or rescheduled
+                    continue
+                now = time.monotonic()
+                if deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                next_deadline = deadline + entry.period
+                if next_deadline <= now:
+                    next_deadline = now + entry.period
+                self._push(entry, next_deadline)
+
+                self._cond.release()
+                try:
+                    entry.send(entry.msg, entry.system_id, entry.component_id)
+                except Exception as e:
+                    print(f"Failed to send repeated {entry.msg.name}: {e}", flush=True)
+                finally:
+                    self._cond.acquire()
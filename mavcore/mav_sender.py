@@ -1,9 +1,11 @@
-import time
 import threading
 import pymavlink.mavutil as utility
 
+from mavcore.mav_bandwidth import LinkBudget
+from mavcore.mav_future import MAVFuture
 from mavcore.mav_message import MAVMessage
-from mavcore.messages.rc_override_msg import RCOverride
+from mavcore.mav_scheduler import PeriodicScheduler
+from mavcore.mav_writer import Writer
 
 
 class Sender:
@@ -12,19 +14,38 @@ class Sender:
         sys_id: int,
         component_id: int,
         connection: utility.mavudp | utility.mavserial,
+        prioritize: bool = True,
+        budget: LinkBudget | None = None,
+        writer: Writer | None = None,
+        scheduler: PeriodicScheduler | None = None,
     ):
+        """
+        prioritize: send queued messages in MAVMessage.priority order (control setpoints first, bulk last)
+            instead of strictly in the order they were sent.
+        budget: optional LinkBudget used to pace outbound frames to the link capacity.
+        writer, scheduler: share the writer thread and repeat scheduler of another Sender on the same
+            connection (e.g. one Sender per vehicle) instead of starting new ones.
+        """
         self.sys_id = sys_id
         self.component_id = component_id
         self.connection = connection
         self._lock = threading.Lock()
         self._owner = None
-        self.repeating_msgs: list[tuple[MAVMessage, int | None, int | None]] = []
-        self._thread = threading.Thread(target=self.repeat_loop, daemon=True)
-        self._thread.start()
+        self.writer = (
+            writer if writer is not None else Writer(connection, prioritize, budget)
+        )
+        self.scheduler = scheduler if scheduler is not None else PeriodicScheduler()
+
+    @property
+    def repeating_msgs(self) -> list[MAVMessage]:
+        """
+        Messages that are currently being sent repeatedly.
+        """
+        return self.scheduler.registered()
 
     def acquire(self):
         """
-        Acquires send lock.
+        Acquires send lock. Optional, for callers that need exclusive use of the sender. send_msg does not take it.
         """
         self._lock.acquire()
         self._owner = threading.get_ident()
@@ -42,49 +63,64 @@ class Sender:
         """Checks if the current thread owns the lock"""
         return threading.get_ident() == self._owner
 
-    def send_msg(self, msg: MAVMessage, system_id=None, component_id=None):
+    def send_msg(self, msg: MAVMessage, system_id=None, component_id=None) -> MAVFuture:
         """
-        Sends a mavlink message. Must have aquired the lock (automatic if using run protocol).
+        Encodes and queues a mavlink message for the writer thread, never waits on I/O.
         Optional specified system and component ids otherwise connection defaults used.
+        If the message has a repeat_period it will keep being sent at that period (see start_repeating).
+        Returns a MAVFuture resolved with the send time once the frame was written.
         """
-        self.acquire()
-        if not self._is_owned():
-            raise RuntimeError("Current thread does not own the lock")
+        handle = self._send(msg, system_id, component_id)
+        if msg.repeat_period != 0.0:
+            self.scheduler.register(
+                msg, self._send, msg.repeat_period, system_id, component_id
+            )
+        return handle
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until every message queued so far has been written. Returns False on timeout.
+        """
+        return self.writer.flush(timeout)
+
+    def start_repeating(
+        self,
+        msg: MAVMessage,
+        period: float | None = None,
+        system_id=None,
+        component_id=None,
+    ) -> MAVFuture:
+        """
+        Sends msg now and then every period seconds (defaults to msg.repeat_period).
+        Calling it again for the same message object updates it instead of adding a second copy.
+        """
+        if period is not None:
+            msg.repeat_period = period
+        if msg.repeat_period <= 0.0:
+            raise ValueError("repeat period must be > 0")
+        return self.send_msg(msg, system_id, component_id)
 
-        self._check_disconnect()
+    def update_repeat_period(self, msg: MAVMessage, period: float) -> bool:
+        """
+        Changes how often a repeating message is sent. Returns False if it is not repeating.
+        """
+        if not self.scheduler.update_period(msg, period):
+            return False
+        msg.repeat_period = period
+        return True
 
-        if isinstance(msg, RCOverride):
-            self._old_src = self.connection.source_system
-            self.connection.mav.srcSystem = 255
+    def stop_repeating(self, msg: MAVMessage) -> bool:
+        """
+        Stops sending msg repeatedly. Returns False if it was not repeating.
+        """
+        return self.scheduler.cancel(msg)
 
+    def _send(self, msg: MAVMessage, system_id=None, component_id=None) -> MAVFuture:
+        """
+        Encodes a single message on the calling thread and hands it to the writer.
+        """
         mav_msg = msg._encode(
             self.sys_id if not system_id else system_id,
             self.component_id if not component_id else component_id,
         )
-        self.connection.mav.send(mav_msg)
-        msg.timestamp = time.time() * 1000
-
-        if isinstance(msg, RCOverride):
-            self.connection.mav.srcSystem = self._old_src
-
-        if msg.repeat_period != 0.0:
-            self.repeating_msgs.append((msg, system_id, component_id))
-
-        self.release()
-
-    def repeat_loop(self):
-        """
-        Loop in charge of running repeated messages.
-        """
-        while True:
-            for payload in self.repeating_msgs:
-                msg, sys_id, comp_id = payload
-                if time.time() - msg.timestamp > msg.repeat_period:
-                    self.acquire()
-                    self.send_msg(msg, sys_id, comp_id)
-                    self.release()
-            time.sleep(0.001)
-
-    def _check_disconnect(self):
-        while self.connection.portdead:
-            time.sleep(0.25)
+        return self.writer.submit(msg, mav_msg)
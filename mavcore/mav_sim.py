@@ -0,0 +1,407 @@
+import math
+import os
+import pty
+import select
+import socket
+import threading
+import time
+import tty
+from typing import Any, Callable
+
+import numpy as np
+import pymavlink.dialects.v20.all as dialect
+
+EARTH_RADIUS_M = 6378137.0
+GUIDED = 4  # ArduCopter custom mode
+STABILIZE = 0
+
+# Streams the vehicle can send, rates in hz. 0 disables a stream.
+DEFAULT_RATES = {
+    "HEARTBEAT": 1.0,
+    "LOCAL_POSITION_NED": 30.0,
+    "ATTITUDE_QUATERNION": 30.0,
+    "GLOBAL_POSITION_INT": 10.0,
+    "SYSTEM_TIME": 1.0,
+}
+
+
+class SimVehicle:
+    """
+    Lightweight stand-in for an ArduCopter flight controller, so MAVDevice, the protocols and the dev
+    benchmarks can run without a SITL.
+
+    Streams HEARTBEAT, LOCAL_POSITION_NED, ATTITUDE_QUATERNION, GLOBAL_POSITION_INT and SYSTEM_TIME at the
+    given rates, answers TIMESYNC requests, COMMAND_LONG (arm, set mode, takeoff, set message interval, request message, set home, reboot,
+    calibration) and SET_MODE with a COMMAND_ACK, serves MISSION_COUNT / MISSION_ITEM_INT uploads and
+    MISSION_CLEAR_ALL, and moves towards SET_POSITION_TARGET_LOCAL_NED position or velocity setpoints
+    while armed in GUIDED.
+    Mission items are requested with MISSION_REQUEST, which is what MissionRequestInt listens for.
+
+    address: 'udp:host:port' sends to a MAVDevice listening on that address (MAVDevice("udp:host:port")),
+        'pty' creates a pseudo terminal, connect MAVDevice to sim.device_address.
+    rates: overrides for DEFAULT_RATES.
+    home: (lat deg, lon deg, alt m) of the local origin, used for GLOBAL_POSITION_INT.
+    max_speed: m/s used when flying to a position setpoint.
+    clock_skew: how much faster the autopilot clock runs than the host's (1e-4 = 100 ppm), to exercise ClockSync.
+    """
+
+    def __init__(
+        self,
+        address: str = "udp:127.0.0.1:14550",
+        system_id: int = 1,
+        component_id: int = 1,
+        rates: dict[str, float] | None = None,
+        home: tuple[float, float, float] = (33.6429, -117.8263, 0.0),
+        max_speed: float = 5.0,
+        clock_skew: float = 0.0,
+    ):
+        self.system_id = system_id
+        self.component_id = component_id
+        self.home = home
+        self.max_speed = max_speed
+        self.clock_skew = clock_skew
+        self.rates = dict(DEFAULT_RATES)
+        if rates is not None:
+            self.rates.update(rates)
+
+        self._sock: socket.socket | None = None
+        self._master_fd: int | None = None
+        if address == "pty":
+            self._master_fd, slave_fd = pty.openpty()
+            tty.setraw(slave_fd)
+            self.device_address = os.ttyname(slave_fd)
+            self._slave_fd = slave_fd
+        elif address.startswith("udp:"):
+            host, port = address[4:].rsplit(":", 1)
+            self._peer = (host, int(port))
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.bind(("127.0.0.1" if host == "127.0.0.1" else "", 0))
+            self.device_address = address
+        else:
+            raise ValueError(
+                f"Unsupported sim address {address}, use 'udp:host:port' or 'pty'"
+            )
+
+        self.mav = dialect.MAVLink(self, system_id, component_id)
+        self.mav.robust_parsing = True
+        self._streams: dict[str, Callable[[], Any]] = {
+            "HEARTBEAT": self._heartbeat,
+            "LOCAL_POSITION_NED": self._local_position,
+            "ATTITUDE_QUATERNION": self._attitude,
+            "GLOBAL_POSITION_INT": self._global_position,
+            "SYSTEM_TIME": self._system_time,
+        }
+        self._stream_ids = {
+            dialect.mavlink_map[msgid].msgname: msgid
+            for msgid in dialect.mavlink_map
+            if dialect.mavlink_map[msgid].msgname in self._streams
+        }
+        self._next_send: dict[str, float] = {}
+
+        self._reset()
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.commands_received = 0
+        self.setpoints_received = 0
+        # Uploaded mission items by mission type
+        self.missions: dict[int, list[Any]] = {}
+        # (mission type, count, items received so far) of the upload in progress
+        self._upload: tuple[int, int, list[Any]] | None = None
+
+        self.running = False
+        self._thread: threading.Thread | None = None
+
+    def _reset(self):
+        self.boot_time = time.monotonic()
+        self.armed = False
+        self.mode = STABILIZE
+        self.position = np.zeros(3)  # NED m
+        self.velocity = np.zeros(3)  # NED m/s
+        self.target_position: np.ndarray | None = None
+        self.target_velocity: np.ndarray | None = None
+        self.yaw = 0.0
+        self._last_step = time.monotonic()
+
+    def start(self) -> "SimVehicle":
+        """
+        Starts the vehicle thread. Returns self.
+        """
+        if self.running:
+            return self
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="mavcore-sim", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+        if self._master_fd is not None:
+            os.close(self._master_fd)
+            os.close(self._slave_fd)
+
+    def __enter__(self) -> "SimVehicle":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def time_boot(self) -> float:
+        """
+        Autopilot clock, seconds since boot.
+        """
+        return (time.monotonic() - self.boot_time) * (1.0 + self.clock_skew)
+
+    def time_boot_ms(self) -> int:
+        return int(self.time_boot() * 1000)
+
+    def write(self, buf: bytes):
+        """
+        Called by pymavlink with every packed frame.
+        """
+        if self._sock is not None:
+            self._sock.sendto(buf, self._peer)
+        else:
+            os.write(self._master_fd, buf)
+        self.messages_sent += 1
+
+    def _loop(self):
+        fd = self._sock.fileno() if self._sock is not None else self._master_fd
+        while self.running:
+            now = time.monotonic()
+            self._step(now)
+            next_due = now + 0.1
+            for name, rate in self.rates.items():
+                if rate <= 0:
+                    continue
+                due = self._next_send.get(name, now)
+                if due <= now:
+                    self.mav.send(self._streams[name]())
+                    # Keep the schedule, unless far behind
+                    due = max(due + 1.0 / rate, now)
+                    self._next_send[name] = due
+                next_due = min(next_due, due)
+            readable, _, _ = select.select([fd], [], [], max(0.0, next_due - now))
+            if readable:
+                self._read()
+
+    def _read(self):
+        try:
+            if self._sock is not None:
+                data, _ = self._sock.recvfrom(65535)
+            else:
+                data = os.read(self._master_fd, 4096)
+        except OSError:
+            return
+        for msg in self.mav.parse_buffer(data) or []:
+            self.messages_received += 1
+            self._handle(msg)
+
+    def _step(self, now: float):
+        """
+        Integrates the kinematics up to now.
+        """
+        dt = now - self._last_step
+        self._last_step = now
+        if not self.armed:
+            self.velocity = np.zeros(3)
+        elif self.target_velocity is not None:
+            self.velocity = self.target_velocity.copy()
+        elif self.target_position is not None:
+            error = self.target_position - self.position
+            distance = float(np.linalg.norm(error))
+            if distance < 1e-3:
+                self.velocity = np.zeros(3)
+            else:
+                # Proportional (1/s) near the target, never past it in one step
+                speed = min(self.max_speed, distance / max(dt, 1e-3), distance)
+                self.velocity = error / distance * speed
+        else:
+            self.velocity = np.zeros(3)
+        self.position = self.position + self.velocity * dt
+        if self.position[2] > 0.0:
+            # Ground at z = 0 (NED, down is positive)
+            self.position[2] = 0.0
+            self.velocity[2] = min(self.velocity[2], 0.0)
+        if self.velocity[0] ** 2 + self.velocity[1] ** 2 > 0.01:
+            self.yaw = math.atan2(self.velocity[1], self.velocity[0])
+
+    def _heartbeat(self) -> Any:
+        base_mode = dialect.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+        if self.armed:
+            base_mode |= dialect.MAV_MODE_FLAG_SAFETY_ARMED
+        return self.mav.heartbeat_encode(
+            dialect.MAV_TYPE_QUADROTOR,
+            dialect.MAV_AUTOPILOT_ARDUPILOTMEGA,
+            base_mode,
+            self.mode,
+            dialect.MAV_STATE_ACTIVE if self.armed else dialect.MAV_STATE_STANDBY,
+        )
+
+    def _local_position(self) -> Any:
+        return self.mav.local_position_ned_encode(
+            self.time_boot_ms(), *self.position, *self.velocity
+        )
+
+    def _attitude(self) -> Any:
+        half = self.yaw / 2.0
+        return self.mav.attitude_quaternion_encode(
+            self.time_boot_ms(), math.cos(half), 0.0, 0.0, math.sin(half), 0, 0, 0
+        )
+
+    def _global_position(self) -> Any:
+        lat, lon, alt = self.home
+        north, east, down = self.position
+        lat += math.degrees(north / EARTH_RADIUS_M)
+        lon += math.degrees(east / (EARTH_RADIUS_M * math.cos(math.radians(lat))))
+        return self.mav.global_position_int_encode(
+            self.time_boot_ms(),
+            int(lat * 1e7),
+            int(lon * 1e7),
+            int((alt - down) * 1000),
+            int(-down * 1000),
+            int(self.velocity[0] * 100),
+            int(self.velocity[1] * 100),
+            int(self.velocity[2] * 100),
+            int(math.degrees(self.yaw) % 360 * 100),
+        )
+
+    def _system_time(self) -> Any:
+        return self.mav.system_time_encode(int(time.time() * 1e6), self.time_boot_ms())
+
+    def _targets_us(self, msg: Any) -> bool:
+        target_system = getattr(msg, "target_system", 0)
+        return target_system in (0, self.system_id)
+
+    def _handle(self, msg: Any):
+        name = msg.get_type()
+        if name == "BAD_DATA" or not self._targets_us(msg):
+            return
+        if name == "COMMAND_LONG":
+            self.commands_received += 1
+            self._ack(msg.command, self._command(msg))
+        elif name == "TIMESYNC":
+            if msg.tc1 == 0:
+                # Reply like ArduPilot: our boot time in ns, the requester's ts1 unchanged
+                self.mav.timesync_send(int(self.time_boot() * 1e9), msg.ts1)
+        elif name == "SET_MODE":
+            self.mode = int(msg.custom_mode)
+            self._ack(dialect.MAVLINK_MSG_ID_SET_MODE, dialect.MAV_RESULT_ACCEPTED)
+        elif name == "SET_POSITION_TARGET_LOCAL_NED":
+            self._setpoint(msg)
+        elif name == "MISSION_COUNT":
+            self._upload = (msg.mission_type, msg.count, [])
+            if msg.count == 0:
+                self.missions[msg.mission_type] = []
+                self._mission_ack(msg.mission_type, dialect.MAV_MISSION_ACCEPTED)
+                self._upload = None
+            else:
+                self._request_item(msg.mission_type, 0)
+        elif name in ("MISSION_ITEM_INT", "MISSION_ITEM"):
+            self._mission_item(msg)
+        elif name == "MISSION_CLEAR_ALL":
+            self.missions.pop(msg.mission_type, None)
+            self._mission_ack(msg.mission_type, dialect.MAV_MISSION_ACCEPTED)
+
+    def _ack(self, command: int, result: int):
+        self.mav.command_ack_send(command, result)
+
+    def _command(self, msg: Any) -> int:
+        """
+        Runs one COMMAND_LONG and returns its MAV_RESULT.
+        """
+        command = msg.command
+        if command == dialect.MAV_CMD_COMPONENT_ARM_DISARM:
+            self.armed = msg.param1 == 1.0
+            if not self.armed:
+                self.target_position = None
+                self.target_velocity = None
+            return dialect.MAV_RESULT_ACCEPTED
+        if command == dialect.MAV_CMD_DO_SET_MODE:
+            self.mode = int(msg.param2)
+            return dialect.MAV_RESULT_ACCEPTED
+        if command == dialect.MAV_CMD_NAV_TAKEOFF:
+            if not self.armed or self.mode != GUIDED:
+                return dialect.MAV_RESULT_TEMPORARILY_REJECTED
+            self.target_velocity = None
+            self.target_position = np.array(
+                [self.position[0], self.position[1], -msg.param7]
+            )
+            return dialect.MAV_RESULT_ACCEPTED
+        if command == dialect.MAV_CMD_SET_MESSAGE_INTERVAL:
+            return self._set_interval(int(msg.param1), msg.param2)
+        if command == dialect.MAV_CMD_REQUEST_MESSAGE:
+            name = self._stream_name(int(msg.param1))
+            if name is None:
+                return dialect.MAV_RESULT_UNSUPPORTED
+            self.mav.send(self._streams[name]())
+            return dialect.MAV_RESULT_ACCEPTED
+        if command == dialect.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN:
+            self._reset()
+            return dialect.MAV_RESULT_ACCEPTED
+        if command in (
+            dialect.MAV_CMD_DO_SET_HOME,
+            dialect.MAV_CMD_PREFLIGHT_CALIBRATION,
+            dialect.MAV_CMD_FIXED_MAG_CAL_YAW,
+        ):
+            return dialect.MAV_RESULT_ACCEPTED
+        return dialect.MAV_RESULT_UNSUPPORTED
+
+    def _stream_name(self, msgid: int) -> str | None:
+        for name, stream_id in self._stream_ids.items():
+            if stream_id == msgid:
+                return name
+        return None
+
+    def _set_interval(self, msgid: int, interval_us: float) -> int:
+        name = self._stream_name(msgid)
+        if name is None:
+            return dialect.MAV_RESULT_UNSUPPORTED
+        if interval_us < 0:
+            self.rates[name] = 0.0
+        elif interval_us == 0:
+            self.rates[name] = DEFAULT_RATES[name]
+        else:
+            self.rates[name] = 1.0e6 / interval_us
+        self._next_send.pop(name, None)
+        return dialect.MAV_RESULT_ACCEPTED
+
+    def _setpoint(self, msg: Any):
+        if not self.armed or self.mode != GUIDED:
+            return
+        self.setpoints_received += 1
+        mask = msg.type_mask
+        if not mask & dialect.POSITION_TARGET_TYPEMASK_X_IGNORE:
+            self.target_position = np.array([msg.x, msg.y, msg.z])
+            self.target_velocity = None
+        elif not mask & dialect.POSITION_TARGET_TYPEMASK_VX_IGNORE:
+            self.target_velocity = np.array([msg.vx, msg.vy, msg.vz])
+            self.target_position = None
+
+    def _request_item(self, mission_type: int, seq: int):
+        self.mav.mission_request_send(0, 0, seq, mission_type=mission_type)
+
+    def _mission_ack(self, mission_type: int, result: int):
+        self.mav.mission_ack_send(0, 0, result, mission_type=mission_type)
+
+    def _mission_item(self, msg: Any):
+        if self._upload is None or msg.mission_type != self._upload[0]:
+            return
+        mission_type, count, items = self._upload
+        if msg.seq != len(items):
+            # Out of order, ask again for the one we need
+            self._request_item(mission_type, len(items))
+            return
+        items.append(msg)
+        if len(items) < count:
+            self._request_item(mission_type, len(items))
+            return
+        self.missions[mission_type] = items
+        self._upload = None
+        self._mission_ack(mission_type, dialect.MAV_MISSION_ACCEPTED)
@@ -0,0 +1,123 @@
+from typing import Any
+
+from mavcore.mav_metrics import Histogram
+
+MIN_SAMPLES = 10  # intervals needed before a stream counts as ready
+
+
+class StreamStats:
+    """
+    Constant time receive statistics of one message stream, updated with every receive timestamp (seconds).
+
+    interval: exponentially weighted moving average of the time between messages, rate is 1 / interval.
+    jitter: smoothed absolute deviation of the interval from its average (like RFC 3550).
+    max_gap: longest time between two messages.
+    intervals: Histogram of the time between messages, for percentiles.
+
+    alpha: EWMA weight of the newest interval, 0.1 averages over roughly the last 10 messages.
+    """
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.intervals = Histogram()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.first = 0.0
+        self.last = 0.0
+        self.interval = 0.0
+        self.jitter = 0.0
+        self.max_gap = 0.0
+        self.out_of_order = 0
+        self.intervals.reset()
+
+    def update(self, timestamp: float):
+        if self.count == 0:
+            self.count = 1
+            self.first = timestamp
+            self.last = timestamp
+            return
+        dt = timestamp - self.last
+        if dt < 0.0:
+            self.out_of_order += 1
+            return
+        self.count += 1
+        self.last = timestamp
+        if self.count == 2:
+            self.interval = dt
+        else:
+            self.jitter += (abs(dt - self.interval) - self.jitter) / 16.0
+            self.interval += self.alpha * (dt - self.interval)
+        if dt > self.max_gap:
+            self.max_gap = dt
+        self.intervals.record(dt)
+
+    def rate(self, now: float | None = None) -> float:
+        """
+        Messages per second. If now is given, a stream that stopped decays towards 0 instead of keeping its last rate.
+        """
+        interval = self.interval
+        if now is not None and now - self.last > interval:
+            interval = now - self.last
+        # Identical timestamps shrink the average towards 0 (denormals), 1 / interval would overflow
+        if self.count < 2 or interval < 1e-9:
+            return 0.0
+        return 1.0 / interval
+
+    def is_ready(
+        self, min_rate: float, now: float, max_jitter: float | None = None
+    ) -> bool:
+        """
+        True once the stream has at least MIN_SAMPLES intervals, runs at min_rate or faster as of now
+        and, if max_jitter (seconds) is given, is that steady.
+        """
+        if self.count <= MIN_SAMPLES or self.rate(now) < min_rate:
+            return False
+        return max_jitter is None or self.jitter <= max_jitter
+
+    def snapshot(self, now: float | None = None) -> dict[str, Any]:
+        """
+        rate_hz, interval / jitter / max gap and interval percentiles in ms, message counts.
+        """
+        return {
+            "count": self.count,
+            "rate_hz": self.rate(now),
+            "interval_ms": self.interval * 1000,
+            "jitter_ms": self.jitter * 1000,
+            "max_gap_ms": self.max_gap * 1000,
+            "p50_interval_ms": self.intervals.percentile(50.0) / 1000,
+            "p99_interval_ms": self.intervals.percentile(99.0) / 1000,
+            "out_of_order": self.out_of_order,
+            "since_last_ms": (now - self.last) * 1000
+            if now is not None and self.count
+            else None,
+        }
+
+
+class LinkStats:
+    """
+    Counts frames lost on a link from the MAVLink packet sequence number, which the sender increments for
+    every frame it sends (all message types). One per (system id, component id).
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.lost = 0
+        self._last_seq = -1
+
+    def update(self, seq: int):
+        if self._last_seq >= 0:
+            self.lost += (seq - self._last_seq - 1) & 0xFF
+        self._last_seq = seq
+        self.received += 1
+
+    def loss(self) -> float:
+        """
+        Fraction of frames lost.
+        """
+        total = self.received + self.lost
+        return self.lost / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"received": self.received, "lost": self.lost, "loss": self.loss()}
@@ -0,0 +1,129 @@
+from mavcore.mav_clock import ClockSync
+from mavcore.mav_history import History
+from mavcore.mav_message import MAVMessage
+from mavcore.mav_protocol import MAVProtocol
+from mavcore.mav_receiver import Receiver
+from mavcore.mav_sender import Sender
+from mavcore.messages.system_time_msg import SystemTime
+from mavcore.messages.timesync_msg import TimeSync
+
+
+def _start_clock_sync(
+    receiver: Receiver,
+    sender: Sender,
+    sync: ClockSync,
+    period: float,
+    system_id: int,
+    component_id: int,
+) -> list[MAVMessage]:
+    """
+    Listens for TIMESYNC replies and SYSTEM_TIME from system_id / component_id only, other systems on the
+    link have their own boot clocks, and sends the first TIMESYNC request. Returns the listeners.
+    """
+    timesync = TimeSync(sync, repeat_period=period).from_source(system_id, component_id)
+    system_time = SystemTime(sync).from_source(system_id, component_id)
+    receiver.add_listener(timesync)
+    receiver.add_listener(system_time)
+    sender.send_msg(timesync.request)
+    return [timesync, system_time]
+
+
+def _stop_clock_sync(receiver: Receiver, sender: Sender, msgs: list[MAVMessage]):
+    for msg in msgs:
+        if isinstance(msg, TimeSync):
+            sender.stop_repeating(msg.request)
+        receiver.remove_listener(msg)
+
+
+class VehicleView:
+    """
+    One vehicle behind a shared MAVDevice connection, created with MAVDevice.vehicle(system_id).
+
+    Has its own Receiver, which only gets messages from system_id, and its own Sender targeting
+    system_id / component_id. Both are fed by the device's reader, receiver and writer threads,
+    so a view starts no threads of its own.
+
+    clock is this vehicle's ClockSync, fed by start_clock_sync. Pass it to FullPose and the setpoint
+    messages as sync when several vehicles share the process.
+    """
+
+    def __init__(
+        self,
+        device_receiver: Receiver,
+        device_sender: Sender,
+        system_id: int,
+        component_id: int = 1,
+    ):
+        self.system_id = system_id
+        self.component_id = component_id
+        self.receiver = Receiver(dispatcher=device_receiver.dispatcher)
+        self.sender = Sender(
+            system_id,
+            component_id,
+            device_sender.connection,
+            writer=device_sender.writer,
+            scheduler=device_sender.scheduler,
+        )
+        self.clock = ClockSync()
+        self._clock_msgs: list[MAVMessage] = []
+        device_receiver.attach(system_id, self.receiver)
+
+    def add_listener(self, listener: MAVMessage) -> MAVMessage:
+        """
+        Pass in a MAVMessage to listen for from this vehicle.
+        """
+        self.receiver.add_listener(listener)
+        return listener
+
+    def remove_listener(self, listener: MAVMessage | str) -> bool:
+        return self.receiver.remove_listener(listener)
+
+    def enable_history(
+        self, name: str, capacity: int = 1024, fields: list[str] | None = None
+    ) -> History:
+        """
+        Keeps the last capacity samples of a message type from this vehicle, see MAVDevice.enable_history.
+        """
+        return self.receiver.enable_history(name, capacity, fields)
+
+    def start_clock_sync(
+        self, period: float = 1.0, sync: ClockSync | None = None
+    ) -> ClockSync:
+        """
+        Like MAVDevice.start_clock_sync, but only this vehicle's TIMESYNC replies and SYSTEM_TIME feed
+        sync (default self.clock). Returns the ClockSync.
+        """
+        self.stop_clock_sync()
+        sync = sync if sync is not None else self.clock
+        self._clock_msgs = _start_clock_sync(
+            self.receiver, self.sender, sync, period, self.system_id, self.component_id
+        )
+        return sync
+
+    def stop_clock_sync(self):
+        """
+        Stops the TIMESYNC requests, the ClockSync keeps its last estimate.
+        """
+        _stop_clock_sync(self.receiver, self.sender, self._clock_msgs)
+        self._clock_msgs = []
+
+    def run_protocol(self, protocol: MAVProtocol) -> MAVProtocol:
+        """
+        Runs a MAVProtocol against this vehicle. Raises ValueError if the protocol targets another system.
+        """
+        self._check_target(protocol)
+        protocol.run(self.sender, self.receiver)
+        return protocol
+
+    def _check_target(self, protocol: MAVProtocol):
+        target_system = getattr(protocol, "target_system", None)
+        if target_system is not None and target_system != self.system_id:
+            raise ValueError(
+                f"{type(protocol).__name__} targets system {target_system}, this vehicle is system {self.system_id}"
+            )
+
+    def send_msg(self, msg: MAVMessage):
+        """
+        Sends msg to this vehicle, see Sender.send_msg.
+        """
+        return self.sender.send_msg(msg)
@@ -0,0 +1,133 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+from typing import Any
+import pymavlink.mavutil as utility
+
+from mavcore.mav_bandwidth import LinkBudget, frame_size
+from mavcore.mav_future import MAVFuture
+from mavcore.mav_message import MAVMessage, SendPriority
+from mavcore.mav_metrics import SEND, metrics
+from mavcore.mav_outbox import Outbox
+from mavcore.messages.rc_override_msg import RCOverride
+
+
+_STOP = object()
+
+
+class _FlushMarker:
+    def __init__(self, handle: MAVFuture, remaining: int):
+        self.handle = handle
+        self.remaining = remaining  # copies still queued, one per outbox lane
+
+
+class Writer:
+    """
+    Owns connection.mav.send on a single thread so callers never wait on socket or serial I/O.
+
+    Producers hand over already encoded pymavlink messages with submit, which never waits on I/O.
+    The writer thread sends them in MAVMessage.priority order (see Outbox) and resolves the returned
+    MAVFuture with the time (time.time(), seconds) the frame was written, or with the exception if writing failed.
+
+    prioritize: if False, frames are sent strictly in submit order.
+    budget: optional LinkBudget that paces frames to the link capacity and counts the bytes written.
+    """
+
+    def __init__(
+        self,
+        connection: utility.mavudp | utility.mavserial,
+        prioritize: bool = True,
+        budget: LinkBudget | None = None,
+    ):
+        self.connection = connection
+        self.budget = budget
+        self.outbox = Outbox(
+            prioritize,
+            gate=self._admit
+            if budget is not None and budget.capacity_bps is not None
+            else None,
+        )
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="mavcore-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, msg: MAVMessage, mav_msg: Any) -> MAVFuture:
+        """
+        Queues an encoded message for sending. Returns a MAVFuture resolved once it was written.
+        """
+        handle = MAVFuture(msg)
+        submitted = time.perf_counter() if metrics.enabled else 0.0
+        self.outbox.put((msg, mav_msg, handle, submitted), msg.priority)
+        return handle
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until everything submitted before this call has been written. Returns False on timeout.
+        """
+        marker = _FlushMarker(MAVFuture(), len(self.outbox.lanes_in_use()))
+        self.outbox.put_all(marker)
+        try:
+            marker.handle.result(timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def stop(self):
+        """
+        Stops the writer thread after the frames already queued are written.
+        """
+        self.flush()
+        self.running = False
+        self.outbox.put(_STOP, SendPriority.CONTROL)
+        self._thread.join()
+
+    def _loop(self):
+        while self.running:
+            item = self.outbox.get()
+            if item is _STOP:
+                break
+            if isinstance(item, _FlushMarker):
+                item.remaining -= 1
+                if item.remaining == 0:
+                    item.handle._resolve(time.time())
+                continue
+            self._write(*item)
+
+    def _admit(self, lane: SendPriority, item: Any) -> float:
+        if not isinstance(item, tuple):
+            return 0.0  # flush and stop markers take no bandwidth
+        return self.budget.admit(lane, frame_size(item[1]))
+
+    def _write(
+        self, msg: MAVMessage, mav_msg: Any, handle: MAVFuture, submitted: float
+    ):
+        self._check_disconnect()
+        estimated = frame_size(mav_msg)
+        try:
+            if isinstance(msg, RCOverride):
+                old_src = self.connection.mav.srcSystem
+                self.connection.mav.srcSystem = 255
+                try:
+                    self.connection.mav.send(mav_msg)
+                finally:
+                    self.connection.mav.srcSystem = old_src
+            else:
+                self.connection.mav.send(mav_msg)
+        except Exception as e:
+            handle._fail(e)
+            return
+        sent = time.time()
+        if metrics.enabled and submitted > 0.0:
+            metrics.record(SEND, mav_msg.get_type(), time.perf_counter() - submitted)
+        if self.budget is not None:
+            actual = frame_size(mav_msg)
+            self.budget.settle(estimated, actual)
+            self.budget.record_outbound(mav_msg.get_type(), actual)
+        msg.timestamp = sent * 1000
+        handle._resolve(sent)
+
+    def _check_disconnect(self):
+        while self.connection.portdead:
+            time.sleep(0.25)
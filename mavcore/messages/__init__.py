@@ -3,6 +3,7 @@
 from mavcore.messages.arm_msg import Arm as Arm
 from mavcore.messages.attitude_msg import Attitude as Attitude
 from mavcore.messages.attitude_quat_msg import AttitudeQuat as AttitudeQuat
+from mavcore.messages.attitude_quat_msg import AttitudeQuatState as AttitudeQuatState
 from mavcore.messages.battery_status_msg import (
     BatteryFunction as BatteryFunction,
     BatteryStatus as BatteryStatus,
@@ -17,7 +18,11 @@ from mavcore.messages.fence_mission_msgs import (
 from mavcore.messages.gps_raw_int_msg import FixType as FixType
 from mavcore.messages.heartbeat_msg import FlightMode as FlightMode
 from mavcore.messages.full_pose_msg import FullPose as FullPose
+from mavcore.messages.full_pose_msg import FullPoseState as FullPoseState
 from mavcore.messages.global_position_msg import GlobalPosition as GlobalPosition
+from mavcore.messages.global_position_msg import (
+    GlobalPositionState as GlobalPositionState,
+)
 from mavcore.messages.gps_raw_int_msg import GPSRaw as GPSRaw
 from mavcore.messages.heartbeat_msg import Heartbeat as Heartbeat
 from mavcore.messages.request_msg_interval_msg import (
@@ -29,6 +34,9 @@ from mavcore.messages.local_position_msg import (
 from mavcore.messages.local_position_msg import (
     LocalPosition as LocalPositionNED,
 )
+from mavcore.messages.local_position_msg import (
+    LocalPositionState as LocalPositionState,
+)
 from mavcore.messages.mission_ack_msg import MissionAck as MissionAck
 from mavcore.messages.mission_request_msg import MissionRequestInt as MissionRequestInt
 from mavcore.messages.mission_request_msg import MissionType as MissionType
@@ -52,6 +60,7 @@ from mavcore.messages.setpoint_velocity_msg import SetpointVelocity as SetpointV
 from mavcore.messages.status_text_msg import StatusText as StatusText
 from mavcore.messages.system_time_msg import SystemTime as SystemTime
 from mavcore.messages.takeoff_msg import Takeoff as Takeoff
+from mavcore.messages.timesync_msg import TimeSync as TimeSync
 from mavcore.messages.vfr_hud_msg import VFRHUD as VFRHUD
 from mavcore.messages.accel_calibration_msg import AccelCal
 from mavcore.messages.baro_calibration_msg import BaroCal
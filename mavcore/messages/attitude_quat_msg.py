@@ -1,6 +1,20 @@
 from mavcore.mav_message import MAVMessage, thread_safe
 
 import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AttitudeQuatState:
+    """
+    One decoded ATTITUDE_QUATERNION, see AttitudeQuat.snapshot.
+    quat is (w, x, y, z), rates are the body angular speeds (roll, pitch, yaw) in radians/sec.
+    """
+
+    timestamp: float  # receive time in seconds
+    time_boot_ms: int
+    quat: tuple[float, float, float, float]
+    rates: tuple[float, float, float]
 
 
 class AttitudeQuat(MAVMessage):
@@ -15,10 +29,13 @@ class AttitudeQuat(MAVMessage):
     This field is intended for systems in which the reference attitude may change during flight. For example, tailsitters
     VTOLs rotate their reference attitude by 90 degrees between hover mode and fixed wing mode, thus repr_offset_q is
     equal to [1, 0, 0, 0] in hover mode and equal to [0.7071, 0, 0.7071, 0] in fixed wing mode.
+
+    get_quat reads the latest AttitudeQuatState without locking.
     """
 
     def __init__(self):
         super().__init__("ATTITUDE_QUATERNION")
+        self.time_boot_ms = -1  # timestamp (time since system boot) in milliseconds
         self.w = 1.0
         self.x = 0.0
         self.y = 0.0
@@ -27,8 +44,10 @@ class AttitudeQuat(MAVMessage):
         self.pitchspeed = 0.0  # angular speed in radians/sec
         self.yawspeed = 0.0  # angular speed in radians/sec
         self.quat_offset = [0.0, 0.0, 0.0, 0.0]  # Not supported in Ardupilot?
+        self._snapshot: AttitudeQuatState = self.freeze()
 
     def decode(self, msg):
+        self.time_boot_ms = msg.time_boot_ms
         self.w = msg.q1
         self.x = msg.q2
         self.y = msg.q3
@@ -38,9 +57,16 @@ class AttitudeQuat(MAVMessage):
         self.yawspeed = msg.yawspeed
         self.quat_offset = msg.repr_offset_q  # Mavlink 2 only
 
-    @thread_safe
+    def freeze(self) -> AttitudeQuatState:
+        return AttitudeQuatState(
+            timestamp=self.decoded_timestamp,
+            time_boot_ms=self.time_boot_ms,
+            quat=(self.w, self.x, self.y, self.z),
+            rates=(self.rollspeed, self.pitchspeed, self.yawspeed),
+        )
+
     def get_quat(self) -> np.ndarray:
-        return np.array([self.w, self.x, self.y, self.z])
+        return np.array(self._snapshot.quat)
 
     @thread_safe
     def __repr__(self) -> str:
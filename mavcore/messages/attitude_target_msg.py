@@ -1,7 +1,7 @@
 import pymavlink.dialects.v20.all as dialect
-import time
 import numpy as np
-from mavcore.mav_message import MAVMessage
+from mavcore.mav_clock import ClockSync, time_boot_ms
+from mavcore.mav_message import MAVMessage, SendPriority
 
 
 class SetpointAttitude(MAVMessage):
@@ -11,26 +11,31 @@ class SetpointAttitude(MAVMessage):
     Quaternion is (w, x, y, z).
     Body rates are in rad/s.
     Thrust is typically normalized [0.0, 1.0] on ArduCopter, depending on GUID_OPTIONS.
+    time_boot_ms comes from sync (default the shared ClockSync) once it is synced (start_clock_sync), otherwise
+    it is the time since boot_time_ms (host time.time() in ms, e.g. when the script started), which may be None.
+    Pass the vehicle's ClockSync (VehicleView.clock) when several vehicles share the process.
     """
 
     def __init__(
         self,
         target_system: int,
         target_component: int,
-        boot_time_ms: int,
+        boot_time_ms: int | None,
         q: np.ndarray,
         thrust: float,
         body_roll_rate: float = 0.0,
         body_pitch_rate: float = 0.0,
         body_yaw_rate: float = 0.0,
         type_mask: int = -1,
+        sync: ClockSync | None = None,
     ):
-        super().__init__("CUSTOM_SETPOINT_ATTITUDE")
+        super().__init__("CUSTOM_SETPOINT_ATTITUDE", priority=SendPriority.CONTROL)
 
         self.target_system = target_system
         self.target_component = target_component
 
         self.boot_time_ms = boot_time_ms  # time since system boot in milliseconds (for sync)
+        self.sync = sync
 
         # quaternion (w, x, y, z)
         self.q = np.array(q, dtype=float)
@@ -56,7 +61,7 @@ class SetpointAttitude(MAVMessage):
 
     def encode(self, system_id, component_id):
         return dialect.MAVLink_set_attitude_target_message(
-            time_boot_ms=int(time.time() * 1000 - self.boot_time_ms),
+            time_boot_ms=time_boot_ms(self.boot_time_ms, self.sync),
             target_system=int(self.target_system),
             target_component=int(self.target_component),
             type_mask=int(self.type_mask),
@@ -1,12 +1,54 @@
-from mavcore.mav_message import MAVMessage, thread_safe
+from mavcore.mav_clock import ClockSync, clock
+from mavcore.mav_message import MAVMessage
 from mavcore.messages.attitude_msg import Attitude
 from mavcore.messages.attitude_quat_msg import AttitudeQuat
 from mavcore.messages.local_position_msg import LocalPosition
 from mavcore.messages.global_position_msg import GlobalPosition
 
-import bisect
+import threading
+from collections import deque
+from dataclasses import dataclass
+
 import numpy as np
-from mavcore.types.mav_pose import Pose
+from mavcore.types import mav_quaternion as quaternion
+from mavcore.types.mav_pose import Pose, PoseBatch
+from mavcore.types.mav_pose_buffer import PoseBuffer
+
+SYNC_WINDOW = (
+    0.1  # seconds of autopilot time a position waits for the attitude sample after it
+)
+MAX_ATTITUDE_GAP = (
+    0.1  # furthest (s) attitude is extrapolated past its newest sample to a position
+)
+ATTITUDE_BUFFER_SIZE = 32  # attitude samples kept for alignment
+OFFSET_RISE = (
+    0.002  # how fast the boot -> host time offset follows upward (drift), per sample
+)
+# Furthest (s) a pose is predicted past the newest one, later queries get the pose at this horizon
+PREDICTION_HORIZON = 0.5
+
+
+@dataclass(frozen=True)
+class FullPoseState:
+    """
+    The newest fused pose, see FullPose.snapshot. Position and velocity (ENU, m and m/s) are from one
+    LOCAL_POSITION_NED, quat (x, y, z, w) and body rates (rad/s) are the attitude at its time_boot_ms,
+    so all of them describe the same instant. The arrays are read-only.
+    """
+
+    timestamp: float  # host time (time.time()) of the pose
+    time_boot_ms: int
+    position: np.ndarray
+    velocity: np.ndarray
+    quat: np.ndarray
+    rates: np.ndarray
+
+    def __post_init__(self):
+        for array in (self.position, self.velocity, self.quat, self.rates):
+            array.flags.writeable = False
+
+    def pose(self) -> Pose:
+        return Pose(position=self.position, quat=self.quat, timestamp=self.timestamp)
 
 
 class FullPose(MAVMessage):
@@ -16,10 +58,24 @@ class FullPose(MAVMessage):
     - Local Position (x, y, z in NED frame and velocities)
     - Global Position (latitude, longitude, altitude)
 
-    Contains an additonal method to get an interpolated local pose at a given timestamp.
+    Contains additional methods to get interpolated local poses at given timestamps.
+    buffer_size: number of past poses kept for interpolation.
+
+    Poses are fused on the autopilot clock: every LOCAL_POSITION_NED sample is paired with the attitude
+    interpolated to its time_boot_ms, waiting up to SYNC_WINDOW for the matching ATTITUDE_QUATERNION.
+    Pose timestamps are host time (time.time()), mapped from time_boot_ms by sync (default the shared
+    ClockSync, pass VehicleView.clock for a vehicle of several) once it is synced, before that with the
+    smallest observed receive delay, so queueing jitter does not move them.
+
+    Queries after the newest pose are predicted from it with the measured velocity (LOCAL_POSITION_NED
+    vx, vy, vz) and body angular rates (ATTITUDE_QUATERNION rollspeed, pitchspeed, yawspeed) instead of
+    extrapolating the last two poses, up to PREDICTION_HORIZON ahead.
+
+    snapshot() returns that newest pose as a FullPoseState, one consistent record read without locking.
+    The getters read the submessages' snapshots, also without locking.
     """
 
-    def __init__(self):
+    def __init__(self, buffer_size: int = 200, sync: ClockSync | None = None):
         super().__init__("FULL_POSE")
         self.attitude = AttitudeQuat()
         self.local_position = LocalPosition()
@@ -32,90 +88,211 @@ class FullPose(MAVMessage):
 
         # interpolation params
         self.local_position.callback_func = self.pose_callback
-        self.pose_buffer: list[Pose] = []
-        self.timestamp_buffer: list[float] = []
-        self.buffer_size = 200
+        self.pose_buffer = PoseBuffer(buffer_size)
+        self.buffer_size = buffer_size
+
+        # Alignment on time_boot_ms: attitude samples keyed by boot time (s), their position column holds the
+        # body rates so they are interpolated with the attitude. Positions and velocities waiting for attitude
+        self.attitude.callback_func = self.attitude_callback
+        self._attitude_buffer = PoseBuffer(ATTITUDE_BUFFER_SIZE)
+        self._pending: deque[tuple[float, np.ndarray, np.ndarray]] = deque()
+        # Newest fused pose, also used for prediction
+        self._snapshot: FullPoseState | None = None
+        self.clock = sync if sync is not None else clock
+        self._boot_offset: float | None = None  # host time - boot time, seconds
+        self._last_boot = -1.0
+        self._sync_lock = threading.Lock()
+        self.time_boot_ms = -1  # autopilot time of the newest fused pose
+        self.fused_count = 0
+        self.discarded_count = 0
 
     def get_local_position(self, timestamp=None) -> Pose:
         if timestamp is not None:
+            state = self._snapshot
+            if state is not None and timestamp > state.timestamp:
+                return self._predict(state, timestamp)
             return self._get_interpolated_pose(timestamp)
+        local_position = self.local_position.snapshot()
+        x, y, z = local_position.position_ned
         return Pose.from_array(
-            position=self.local_position.get_pos_enu(),
-            quat=self.attitude.get_quat(),
+            position=np.array([y, x, -z]),
+            quat=np.array(self.attitude.snapshot().quat),
             order=True,
-            timestamp=self.local_position.timestamp,
+            timestamp=local_position.timestamp,
         )
 
-    @thread_safe
+    def get_local_positions(self, timestamps: np.ndarray) -> PoseBatch:
+        """
+        Interpolated (or predicted) local poses at many timestamps in one vectorized call,
+        e.g. to tag a burst of camera frames.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        state = self._snapshot
+        if len(self.pose_buffer) < 2:
+            pose = self.pose_buffer.latest()
+            if pose is None:
+                print(
+                    "Not enough data in pose buffer to interpolate. Returning identity pose."
+                )
+                pose = Pose.identity()
+            batch = PoseBatch(
+                positions=np.tile(pose.position, (len(timestamps), 1)),
+                quats=np.tile(pose.quat, (len(timestamps), 1)),
+                timestamps=np.full(len(timestamps), pose.timestamp),
+            )
+        else:
+            batch = self.pose_buffer.interpolate(timestamps)
+        if state is not None:
+            ahead = timestamps > state.timestamp
+            if ahead.any():
+                dt = np.minimum(timestamps[ahead] - state.timestamp, PREDICTION_HORIZON)
+                dt = dt[:, None]
+                batch.positions[ahead] = state.position + dt * state.velocity
+                batch.quats[ahead] = quaternion.rotate_body(
+                    state.quat, dt * state.rates
+                )
+                batch.timestamps[ahead] = timestamps[ahead]
+        return batch
+
     def get_local_velocity(self) -> np.ndarray:
         return self.local_position.get_vel_enu()
 
-    @thread_safe
     def get_global_position(self) -> np.ndarray:
         return self.global_position.get_pos()
 
-    @thread_safe
     def get_global_velocity(self) -> np.ndarray:
         return np.array(self.global_position.get_vel_enu())
 
+    def attitude_callback(self, msg):
+        """
+        Adds an attitude sample to the alignment buffer and fuses the positions that were waiting for it.
+        """
+        attitude = self.attitude.snapshot()
+        boot = attitude.time_boot_ms / 1000.0
+        w, x, y, z = attitude.quat
+        quat = np.array([x, y, z, w])
+        norm = np.linalg.norm(quat)
+        if norm == 0.0:
+            return
+        rates = np.array(attitude.rates)
+        with self._sync_lock:
+            self._check_reboot(boot)
+            self._attitude_buffer.append(boot, rates, quat / norm)
+            self._fuse()
+
     def pose_callback(self, msg):
         """
-        Updates the pose buffer with the current local position and attitude.
-        Maintains the buffer size by removing the oldest entry if necessary.
+        Queues the local position sample for fusion with the attitude at its time_boot_ms.
+        The pose buffer is a ring, the oldest pose is overwritten once it is full.
+        Runs on the LocalPosition snapshot after its lock is released, so fusion never stalls its getters.
         """
-        current_pose = self.get_local_position()
-        if abs(self.attitude.timestamp - self.local_position.timestamp) > 0.1:
-            print(
-                f"Warning: Discarding pose since Attitude({self.attitude.get_hz()}hz) and Local Position({self.local_position.get_hz()}hz) timestamps differ by more than 100 ms."
+        local_position = self.local_position.snapshot()
+        boot = local_position.time_boot_ms / 1000.0
+        x, y, z = local_position.position_ned
+        vx, vy, vz = local_position.velocity_ned
+        position = np.array([y, x, -z])
+        velocity = np.array([vy, vx, -vz])
+        with self._sync_lock:
+            self._check_reboot(boot)
+            offset = local_position.timestamp - boot
+            if self._boot_offset is None or offset < self._boot_offset:
+                self._boot_offset = offset
+            else:
+                self._boot_offset += OFFSET_RISE * (offset - self._boot_offset)
+            self._pending.append((boot, position, velocity))
+            self._fuse()
+
+    def _check_reboot(self, boot: float):
+        """
+        Clears the alignment state if the autopilot clock went backwards (reboot). Call with _sync_lock held.
+        """
+        if boot < self._last_boot - 1.0:
+            self._attitude_buffer.clear()
+            self._pending.clear()
+            self._boot_offset = None
+            self._last_boot = boot
+        elif boot > self._last_boot:
+            self._last_boot = boot
+
+    def _fuse(self):
+        """
+        Turns pending positions into poses once attitude covers their time, or after SYNC_WINDOW with
+        extrapolated attitude. Call with _sync_lock held.
+        """
+        attitudes = self._attitude_buffer
+        while self._pending:
+            boot, position, velocity = self._pending[0]
+            times = attitudes.timestamps()
+            if len(times) == 0 or times[-1] < boot:
+                # Attitude for this time may still be on its way
+                if self._pending[-1][0] - boot < SYNC_WINDOW:
+                    return
+                usable = len(times) > 0 and boot - times[-1] <= MAX_ATTITUDE_GAP
+            else:
+                usable = boot >= times[0] - MAX_ATTITUDE_GAP
+            self._pending.popleft()
+            if not usable:
+                self.discarded_count += 1
+                print(
+                    f"Warning: Discarding pose since no Attitude({self.attitude.get_hz()}hz) within 100 ms "
+                    f"of Local Position({self.local_position.get_hz()}hz) time_boot_ms."
+                )
+                continue
+            if len(attitudes) >= 2:
+                attitude = attitudes.at(boot)
+            else:
+                attitude = attitudes.latest()
+            quat = attitude.quat
+            rates = attitude.position
+            timestamp = self.clock.try_boot_to_unix(boot)
+            if timestamp is None:
+                timestamp = boot + self._boot_offset
+            # The estimates can step down, keep the pose buffer in order
+            timestamp = max(timestamp, self.timestamp)
+            self.pose_buffer.append(timestamp, position, quat)
+            self.time_boot_ms = int(round(boot * 1000.0))
+            self._snapshot = FullPoseState(
+                timestamp=timestamp,
+                time_boot_ms=self.time_boot_ms,
+                position=position,
+                velocity=velocity,
+                quat=quat,
+                rates=rates,
             )
-            return
-        self.update_timestamp(
-            np.average([self.attitude.timestamp, self.local_position.timestamp])
-        )
+            self.fused_count += 1
+            self.update_timestamp(timestamp)
 
-        self.pose_buffer.append(current_pose)
-        self.timestamp_buffer.append(self.timestamp)
-        assert len(self.pose_buffer) == len(self.timestamp_buffer)
-        if len(self.pose_buffer) > self.buffer_size:
-            self.pose_buffer.pop(0)
-            self.timestamp_buffer.pop(0)
+    def freeze(self) -> FullPoseState | None:
+        # Published by the fusion, not by decode
+        return self._snapshot
 
-    def _get_interpolated_pose(self, timestamp: int) -> Pose:
+    @staticmethod
+    def _predict(state: FullPoseState, timestamp: float) -> Pose:
+        """
+        Pose at a timestamp after the newest fused pose: position moved by the velocity and the attitude
+        rotated by the body rates for the elapsed time (at most PREDICTION_HORIZON).
+        """
+        dt = min(timestamp - state.timestamp, PREDICTION_HORIZON)
+        return Pose(
+            position=state.position + dt * state.velocity,
+            quat=quaternion.rotate_body(state.quat, dt * state.rates),
+            timestamp=timestamp,
+        )
+
+    def _get_interpolated_pose(self, timestamp: float) -> Pose:
         """
         Returns an interpolated pose at the given timestamp using the pose buffer.
-        If the timestamp is outside the buffer range, it extrapolates using the closest two poses.
+        If the timestamp is before the buffer range, it extrapolates using the oldest two poses.
         """
         if len(self.pose_buffer) < 2:
-            if len(self.pose_buffer) == 1:
-                return self.pose_buffer[0]
+            pose = self.pose_buffer.latest()
+            if pose is not None:
+                return pose
             print(
                 "Not enough data in pose buffer to interpolate. Returning identity pose."
             )
             return Pose.identity()
-
-        # if timestamp is outside the buffer range, extrapolate
-        if timestamp < self.timestamp_buffer[0]:
-            pose0 = self.pose_buffer[0]
-            pose1 = self.pose_buffer[1]
-            proportion = (timestamp - self.timestamp_buffer[0]) / (
-                self.timestamp_buffer[1] - self.timestamp_buffer[0]
-            )
-            return pose0.interpolate(pose1, proportion, timestamp)
-        elif timestamp > self.timestamp_buffer[-1]:
-            pose0 = self.pose_buffer[-2]
-            pose1 = self.pose_buffer[-1]
-            proportion = (timestamp - self.timestamp_buffer[-2]) / (
-                self.timestamp_buffer[-1] - self.timestamp_buffer[-2]
-            )
-            return pose0.interpolate(pose1, proportion, timestamp)
-
-        # find the two poses surrounding the timestamp
-        idx = bisect.bisect_left(self.timestamp_buffer, timestamp)
-        t0, pose0 = self.timestamp_buffer[idx - 1], self.pose_buffer[idx - 1]
-        t1, pose1 = self.timestamp_buffer[idx], self.pose_buffer[idx]
-        proportion = (timestamp - t0) / (t1 - t0)
-        # print(f"Interpolating between t0={t0} s and t1={t1} s for requested timestamp={timestamp} with proportion={proportion}")
-        return pose0.interpolate(pose1, proportion, timestamp)
+        return self.pose_buffer.at(timestamp)
 
     def __repr__(self):
         out = "FullPose : Timestamp: " + str(self.timestamp) + " s\n"
@@ -1,10 +1,28 @@
 import numpy as np
+from dataclasses import dataclass
 from mavcore.mav_message import MAVMessage, thread_safe
 
 
+@dataclass(frozen=True)
+class GlobalPositionState:
+    """
+    One decoded GLOBAL_POSITION_INT, see GlobalPosition.snapshot. Units as in GlobalPosition.
+    """
+
+    timestamp: float  # receive time in seconds
+    time_boot_ms: int
+    lat: float
+    lon: float
+    alt_msl: float
+    alt_relative: float
+    velocity_ned: tuple[float, float, float]
+    heading: float
+
+
 class GlobalPosition(MAVMessage):
     """
     Reads global position. Note altitude is in meters, speed is in meters/second, and heading is in degrees.
+    The getters read the latest GlobalPositionState without locking.
     """
 
     def __init__(self):
@@ -18,6 +36,7 @@ class GlobalPosition(MAVMessage):
         self.vy = 0.0  # ground y speed in m/s  (positive east)
         self.vz = 0.0  # ground z speed in m/s  (positive down)
         self.heading = 0.0  # in degrees, 0.0..359.99
+        self._snapshot: GlobalPositionState = self.freeze()
 
     def decode(self, msg):
         self.time_boot_ms = msg.time_boot_ms
@@ -30,17 +49,28 @@ class GlobalPosition(MAVMessage):
         self.vz = msg.vz / 100.0
         self.heading = msg.hdg / 100.0
 
-    @thread_safe
+    def freeze(self) -> GlobalPositionState:
+        return GlobalPositionState(
+            timestamp=self.decoded_timestamp,
+            time_boot_ms=self.time_boot_ms,
+            lat=self.lat,
+            lon=self.lon,
+            alt_msl=self.alt_msl,
+            alt_relative=self.alt_relative,
+            velocity_ned=(self.vx, self.vy, self.vz),
+            heading=self.heading,
+        )
+
     def get_pos(self):
-        return np.array([self.lat, self.lon, self.alt_relative])
+        state = self._snapshot
+        return np.array([state.lat, state.lon, state.alt_relative])
 
-    @thread_safe
     def get_vel_ned(self):
-        return (self.vx, self.vy, self.vz)
+        return self._snapshot.velocity_ned
 
-    @thread_safe
     def get_vel_enu(self):
-        return (self.vy, self.vx, -self.vz)
+        vx, vy, vz = self._snapshot.velocity_ned
+        return (vy, vx, -vz)
 
     @thread_safe
     def __repr__(self) -> str:
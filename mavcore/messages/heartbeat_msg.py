@@ -83,6 +83,8 @@ class Heartbeat(MAVMessage):
         self.mode = FlightMode(-1)
         self.target_system = target_system
         self.target_component = target_component
+        # Heartbeats from other sources (gcs, companion computer, gimbal) are filtered out by the Receiver
+        self.from_source(target_system, target_component)
 
     def encode(self, system_id, component_id):
         return dialect.MAVLink_heartbeat_message(
@@ -103,16 +105,12 @@ class Heartbeat(MAVMessage):
         return bool(self.mask >> 7)
 
     def decode(self, msg):
-        if (
-            msg.get_srcSystem() == self.target_system
-            and msg.get_srcComponent() == self.target_component
-        ):
-            self.type_id = msg.type
-            self.state = MAVState(msg.system_status)
-            self.src_sys = msg.get_srcSystem()
-            self.src_comp = msg.get_srcComponent()
-            self.mask = msg.base_mode
-            self.mode = FlightMode(msg.custom_mode)
+        self.type_id = msg.type
+        self.state = MAVState(msg.system_status)
+        self.src_sys = msg.get_srcSystem()
+        self.src_comp = msg.get_srcComponent()
+        self.mask = msg.base_mode
+        self.mode = FlightMode(msg.custom_mode)
 
     @thread_safe
     def __repr__(self) -> str:
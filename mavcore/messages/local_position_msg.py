@@ -1,11 +1,26 @@
 import numpy as np
+from dataclasses import dataclass
 from mavcore.mav_message import MAVMessage, thread_safe
 
 
+@dataclass(frozen=True)
+class LocalPositionState:
+    """
+    One decoded LOCAL_POSITION_NED, see LocalPosition.snapshot. Meters and m/s in the NED frame.
+    """
+
+    timestamp: float  # receive time in seconds
+    time_boot_ms: int
+    position_ned: tuple[float, float, float]
+    velocity_ned: tuple[float, float, float]
+
+
 class LocalPosition(MAVMessage):
     """
     Gets the local position in NED or ENU frame. Origin is at ardupilot origin which is often at first gps fix.
     In meters for distances and m/s for velocities.
+    The getters read the latest LocalPositionState without locking, so position and velocity are never
+    from two different messages.
     """
 
     def __init__(self):
@@ -17,6 +32,7 @@ class LocalPosition(MAVMessage):
         self.vx = 0.0  # in m/s
         self.vy = 0.0  # in m/s
         self.vz = 0.0  # in m/s
+        self._snapshot: LocalPositionState = self.freeze()
 
     def decode(self, msg):
         self.time_boot_ms = msg.time_boot_ms
@@ -27,21 +43,27 @@ class LocalPosition(MAVMessage):
         self.vy = msg.vy
         self.vz = msg.vz
 
-    @thread_safe
+    def freeze(self) -> LocalPositionState:
+        return LocalPositionState(
+            timestamp=self.decoded_timestamp,
+            time_boot_ms=self.time_boot_ms,
+            position_ned=(self.x, self.y, self.z),
+            velocity_ned=(self.vx, self.vy, self.vz),
+        )
+
     def get_pos_ned(self) -> np.ndarray:
-        return np.array([self.x, self.y, self.z])
+        return np.array(self._snapshot.position_ned)
 
-    @thread_safe
     def get_pos_enu(self) -> np.ndarray:
-        return np.array([self.y, self.x, -self.z])
+        x, y, z = self._snapshot.position_ned
+        return np.array([y, x, -z])
 
-    @thread_safe
     def get_vel_ned(self) -> np.ndarray:
-        return np.array([self.vx, self.vy, self.vz])
+        return np.array(self._snapshot.velocity_ned)
 
-    @thread_safe
     def get_vel_enu(self) -> np.ndarray:
-        return np.array([self.vy, self.vx, -self.vz])
+        vx, vy, vz = self._snapshot.velocity_ned
+        return np.array([vy, vx, -vz])
 
     @thread_safe
     def __repr__(self) -> str:
@@ -1,6 +1,6 @@
 import pymavlink.dialects.v20.all as dialect
 import numpy as np
-from mavcore.mav_message import MAVMessage, thread_safe
+from mavcore.mav_message import MAVMessage, SendPriority, thread_safe
 
 
 class RCOverride(MAVMessage):
@@ -9,7 +9,7 @@ class RCOverride(MAVMessage):
     """
 
     def __init__(self, target_system: int, target_component: int, channels: np.ndarray):
-        super().__init__("RC_CHANNELS_OVERRIDE")
+        super().__init__("RC_CHANNELS_OVERRIDE", priority=SendPriority.CONTROL)
         self.target_system = target_system
         self.target_component = target_component
         self.channels = channels
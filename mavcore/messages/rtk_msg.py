@@ -1,5 +1,5 @@
 import pymavlink.dialects.v20.all as dialect
-from mavcore.mav_message import MAVMessage, thread_safe
+from mavcore.mav_message import MAVMessage, SendPriority, thread_safe
 
 
 class RTKData(MAVMessage):
@@ -14,7 +14,7 @@ class RTKData(MAVMessage):
         sequence_num: int,
         payload: list[int],
     ):
-        super().__init__("RTK_DATA")
+        super().__init__("RTK_DATA", priority=SendPriority.BULK)
         self.flags = (
             (sequence_num << 3) | (fragment_id << 1) | (1 if is_fragmented else 0)
         )
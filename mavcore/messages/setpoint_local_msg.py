@@ -1,38 +1,42 @@
 import pymavlink.dialects.v20.all as dialect
-import time
 import numpy as np
-from mavcore.mav_message import MAVMessage, thread_safe
+from mavcore.mav_clock import ClockSync, time_boot_ms
+from mavcore.mav_message import MAVMessage, SendPriority, thread_safe
 
 
 class SetpointLocal(MAVMessage):
     """
     A position setpoint in local NED frame. Measured in meters.
-    Boot time ms is the time since system boot in ms.
+    time_boot_ms comes from sync (default the shared ClockSync) once it is synced (start_clock_sync), otherwise
+    it is the time since boot_time_ms (host time.time() in ms, e.g. when the script started), which may be None.
+    Pass the vehicle's ClockSync (VehicleView.clock) when several vehicles share the process.
     """
 
     def __init__(
         self,
         target_system: int,
         target_component: int,
-        boot_time_ms: int,
+        boot_time_ms: int | None,
         x: float,
         y: float,
         z: float,
+        sync: ClockSync | None = None,
     ):
-        super().__init__("CUSTOM_SETPOINT_LOCAL")
+        super().__init__("CUSTOM_SETPOINT_LOCAL", priority=SendPriority.CONTROL)
         self.target_system = target_system
         self.target_component = target_component
 
         self.boot_time_ms = (
             boot_time_ms  # time since system boot in milliseconds (for sync)
         )
+        self.sync = sync
         self.x = x  # in meters
         self.y = y  # in meters
         self.z = z  # in meters
 
     def encode(self, system_id, component_id):
         return dialect.MAVLink_set_position_target_local_ned_message(
-            time_boot_ms=int(time.time() * 1000 - self.boot_time_ms),
+            time_boot_ms=time_boot_ms(self.boot_time_ms, self.sync),
             target_system=int(self.target_system),
             target_component=int(self.target_component),
             coordinate_frame=int(1),  # MAV_FRAME_LOCAL_NED
@@ -1,38 +1,43 @@
 import pymavlink.dialects.v20.all as dialect
-import time
 import numpy as np
-from mavcore.mav_message import MAVMessage
+from mavcore.mav_clock import ClockSync, time_boot_ms
+from mavcore.mav_message import MAVMessage, SendPriority
 
 
 class SetpointVelocity(MAVMessage):
     """
     A velocity setpoint in local NED frame. Measured in m/s.
     Uses same MAVLink message as SetpointLocal, but different type mask.
+    time_boot_ms comes from sync (default the shared ClockSync) once it is synced (start_clock_sync), otherwise
+    it is the time since boot_time_ms (host time.time() in ms, e.g. when the script started), which may be None.
+    Pass the vehicle's ClockSync (VehicleView.clock) when several vehicles share the process.
     """
 
     def __init__(
         self,
         target_system: int,
         target_component: int,
-        boot_time_ms: int,
+        boot_time_ms: int | None,
         vx: float,
         vy: float,
         vz: float,
+        sync: ClockSync | None = None,
     ):
-        super().__init__("CUSTOM_SETPOINT_VELOCITY")
+        super().__init__("CUSTOM_SETPOINT_VELOCITY", priority=SendPriority.CONTROL)
         self.target_system = target_system
         self.target_component = target_component
 
         self.boot_time_ms = (
             boot_time_ms  # time since system boot in milliseconds (for sync)
         )
+        self.sync = sync
         self.vx = vx  # velocity North in m/s
         self.vy = vy  # velocity East in m/s
         self.vz = vz  # velocity Down in m/s
 
     def encode(self, system_id, component_id):
         return dialect.MAVLink_set_position_target_local_ned_message(
-            time_boot_ms=int(time.time() * 1000 - self.boot_time_ms),
+            time_boot_ms=time_boot_ms(self.boot_time_ms, self.sync),
             target_system=int(self.target_system),
             target_component=int(self.target_component),
             coordinate_frame=int(1),  # MAV_FRAME_LOCAL_NED
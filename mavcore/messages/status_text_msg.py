@@ -1,7 +1,7 @@
 import pymavlink.dialects.v20.all as dialect
 from enum import Enum
 
-from mavcore.mav_message import MAVMessage, thread_safe
+from mavcore.mav_message import MAVMessage, SendPriority, thread_safe
 
 
 class MAVSeverity(Enum):
@@ -21,7 +21,7 @@ class StatusText(MAVMessage):
     """
 
     def __init__(self, text: str, severity: MAVSeverity, cb=lambda x: None):
-        super().__init__("STATUSTEXT", callback_func=cb)
+        super().__init__("STATUSTEXT", priority=SendPriority.BULK, callback_func=cb)
         self.text = text
         self.severity = severity
 
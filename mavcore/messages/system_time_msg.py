@@ -1,19 +1,26 @@
+from mavcore.mav_clock import ClockSync
 from mavcore.mav_message import MAVMessage
 
 
 class SystemTime(MAVMessage):
     """
     Gets the system time.
+    sync: if given, every message is added to this ClockSync (see ClockSync.add_system_time).
     """
 
-    def __init__(self):
+    def __init__(self, sync: ClockSync | None = None):
         super().__init__("SYSTEM_TIME")
+        self.sync = sync
         self.time_unix_usec = -1
         self.time_boot_ms = -1
 
     def decode(self, msg):
         self.time_unix_usec = msg.time_unix_usec
         self.time_boot_ms = msg.time_boot_ms
+        if self.sync is not None:
+            self.sync.add_system_time(
+                msg.time_unix_usec, msg.time_boot_ms, self.decoded_timestamp
+            )
 
     def __repr__(self) -> str:
         return f"(SYSTEM_TIME) timestamp: {self.timestamp} s, time: {self.time_unix_usec}, boot time: {self.time_boot_ms}"
@@ -0,0 +1,56 @@
+import time
+from collections import deque
+
+import pymavlink.dialects.v20.all as dialect
+
+from mavcore.mav_clock import ClockSync, clock
+from mavcore.mav_message import MAVMessage, SendPriority
+
+
+class TimeSync(MAVMessage):
+    """
+    TIMESYNC request / reply (https://mavlink.io/en/services/timesync.html).
+    Listen with this and send self.request: requests carry tc1 = 0 and ts1 = host time.monotonic_ns(), the
+    autopilot replies with tc1 = its boot time in ns and the same ts1. Replies to our own requests are passed
+    to sync (default the shared clock). The request is a separate message because the sender stamps the
+    messages it sends, which would make the receiver skip replies to the same object.
+    """
+
+    def __init__(self, sync: ClockSync | None = None, repeat_period: float = 0.0):
+        super().__init__("TIMESYNC")
+        self.request = TimeSyncRequest(self, repeat_period)
+        self.sync = sync if sync is not None else clock
+        self.tc1 = 0  # autopilot boot time in ns, 0 in requests
+        self.ts1 = 0  # requester time in ns
+        self._sent: deque[int] = deque(maxlen=16)  # ts1 of our recent requests
+
+    def decode(self, msg):
+        self.tc1 = msg.tc1
+        self.ts1 = msg.ts1
+        if msg.tc1 == 0 or msg.ts1 not in self._sent:
+            return  # a request, or a reply to another requester
+        self._sent.remove(msg.ts1)
+        # Receive time from the socket read, not now, the listener queue would count as round trip time
+        received = self.decoded_timestamp - (time.time() - time.monotonic())
+        self.sync.add_timesync(msg.tc1, msg.ts1, int(received * 1e9))
+
+    def __repr__(self) -> str:
+        return f"(TIMESYNC) timestamp: {self.timestamp} s, tc1: {self.tc1}, ts1: {self.ts1}"
+
+
+class TimeSyncRequest(MAVMessage):
+    """
+    The request half of a TimeSync, records each ts1 it sends in the TimeSync.
+    Sent with CONTROL priority so it is not queued behind bulk traffic, which would skew the round trip.
+    """
+
+    def __init__(self, timesync: TimeSync, repeat_period: float = 0.0):
+        super().__init__(
+            "TIMESYNC", priority=SendPriority.CONTROL, repeat_period=repeat_period
+        )
+        self.timesync = timesync
+
+    def encode(self, system_id, component_id):
+        ts1 = time.monotonic_ns()
+        self.timesync._sent.append(ts1)
+        return dialect.MAVLink_timesync_message(tc1=0, ts1=ts1)
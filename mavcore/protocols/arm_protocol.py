@@ -1,3 +1,5 @@
+import asyncio
+
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages import Arm
 from mavcore.messages.command_ack_msg import CommandAck
@@ -20,3 +22,8 @@ class ArmProtocol(MAVProtocol):
         future_ack = receiver.wait_for_msg(self.ack_msg, blocking=False)
         sender.send_msg(self.arm_msg)
         future_ack.wait_until_finished()
+
+    async def run_async(self, sender, receiver):
+        future_ack = asyncio.wrap_future(receiver.expect_msg(self.ack_msg))
+        sender.send_msg(self.arm_msg)
+        await future_ack
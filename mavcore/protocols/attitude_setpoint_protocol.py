@@ -1,3 +1,4 @@
+from mavcore.mav_clock import ClockSync
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages.local_position_msg import LocalPosition as LocalPositionNED
 from mavcore.messages.raw_imu_msg import RawIMU
@@ -12,9 +13,10 @@ class AttitudeSetpointProtocol(MAVProtocol):
         self,
         current_pos: LocalPositionNED,
         imu: RawIMU,
-        boot_time_ms: int,
+        boot_time_ms: int | None = None,
         target_system: int = 1,
         target_component: int = 0,
+        sync: ClockSync | None = None,
     ):
         super().__init__()
         self.current_pos = current_pos
@@ -22,12 +24,13 @@ class AttitudeSetpointProtocol(MAVProtocol):
         self.boot_time_ms = boot_time_ms
         self.target_system = target_system
         self.target_component = target_component
+        self.sync = sync
 
         self.q = np.array([0.848, 0.0, -0.530, 0.0])
         self.thrust = 0.15
 
         self.setpoint_msg = SetpointAttitude(
-            self.target_system, self.target_component, self.boot_time_ms, self.q, self.thrust
+            self.target_system, self.target_component, self.boot_time_ms, self.q, self.thrust, sync=self.sync
         )
 
     def run(self, sender, receiver):
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from mavcore.messages import MissionAck
 from pymavlink.dialects.v20 import common as mav
@@ -39,6 +40,18 @@ class FenceUploadProtocol(MAVProtocol):
         self.ack_msg = MissionAck()
         self.mission_req_msg = MissionRequestInt()
 
+    def _item_msg(self, seq: int) -> FenceMissionItemInt:
+        lat, lon = self.vertices[seq]
+        return FenceMissionItemInt(
+            seq=seq,
+            lat_deg=float(lat),
+            lon_deg=float(lon),
+            total_vertices=len(self.vertices),
+            inclusion=True,
+            target_system=self.target_system,
+            target_component=self.target_component,
+        )
+
     def run(self, sender, receiver):
         # 1) Send MISSION_COUNT(FENCE)
         count_msg = FenceMissionCount(
@@ -62,17 +75,7 @@ class FenceUploadProtocol(MAVProtocol):
             if seq < 0 or seq >= len(self.vertices):
                 continue
 
-            lat, lon = self.vertices[seq]
-
-            item_msg = FenceMissionItemInt(
-                seq=seq,
-                lat_deg=float(lat),
-                lon_deg=float(lon),
-                total_vertices=len(self.vertices),
-                inclusion=True,
-                target_system=self.target_system,
-                target_component=self.target_component,
-            )
+            item_msg = self._item_msg(seq)
             if sent + 1 < len(self.vertices):
                 future_req = receiver.wait_for_msg(self.mission_req_msg, blocking=False)
             else:
@@ -87,3 +90,47 @@ class FenceUploadProtocol(MAVProtocol):
 
         # 3) Wait for MISSION_ACK(FENCE)
         future_ack.wait_until_finished()
+
+    async def run_async(self, sender, receiver):
+        count_msg = FenceMissionCount(
+            count=len(self.vertices),
+            target_system=self.target_system,
+            target_component=self.target_component,
+        )
+        future_req = asyncio.wrap_future(receiver.expect_msg(self.mission_req_msg))
+        sender.send_msg(count_msg)
+
+        sent = 0
+        deadline = time.time() + self.handshake_timeout_s
+        future_ack = None
+        while sent < len(self.vertices):
+            try:
+                await asyncio.wait_for(future_req, max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                break
+            seq = self.mission_req_msg.seq
+            if (
+                self.mission_req_msg.mission_type != MissionType.FENCE
+                or seq < 0
+                or seq >= len(self.vertices)
+            ):
+                future_req = asyncio.wrap_future(
+                    receiver.expect_msg(self.mission_req_msg)
+                )
+                continue
+
+            item_msg = self._item_msg(seq)
+            if sent + 1 < len(self.vertices):
+                future_req = asyncio.wrap_future(
+                    receiver.expect_msg(self.mission_req_msg)
+                )
+            else:
+                future_ack = asyncio.wrap_future(receiver.expect_msg(self.ack_msg))
+            sender.send_msg(item_msg)
+            sent += 1
+
+        if sent != len(self.vertices):
+            print(f"ERROR: sent {sent}/{len(self.vertices)} fence vertices")
+            return
+
+        await future_ack
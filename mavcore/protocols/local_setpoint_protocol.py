@@ -1,3 +1,4 @@
+from mavcore.mav_clock import ClockSync
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages.local_position_msg import LocalPosition as LocalPositionNED
 from mavcore.messages.command_ack_msg import CommandAck
@@ -19,9 +20,10 @@ class LocalSetpointProtocol(MAVProtocol):
         self,
         current_pos: LocalPositionNED,
         waypoints: list[Waypoint],
-        boot_time_ms: int,
+        boot_time_ms: int | None = None,
         target_system: int = 1,
         target_component: int = 0,
+        sync: ClockSync | None = None,
     ):
         super().__init__()
         self.current_pos = current_pos
@@ -29,9 +31,16 @@ class LocalSetpointProtocol(MAVProtocol):
         self.boot_time_ms = boot_time_ms
         self.target_system = target_system
         self.target_component = target_component
+        self.sync = sync
 
         self.setpoint_msg = SetpointLocal(
-            self.target_system, self.target_component, self.boot_time_ms, 0.0, 0.0, 0.0
+            self.target_system,
+            self.target_component,
+            self.boot_time_ms,
+            0.0,
+            0.0,
+            0.0,
+            sync=self.sync,
         )
         self.ack_msg = CommandAck()
 
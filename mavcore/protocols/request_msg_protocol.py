@@ -1,3 +1,5 @@
+import asyncio
+
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages import RequestMessageInterval, IntervalMessageID
 from mavcore.messages.command_ack_msg import CommandAck
@@ -33,3 +35,11 @@ class RequestMessageProtocol(MAVProtocol):
         sender.send_msg(self.mode_msg)
         if self.wait_for_ack:
             future_ack.wait_until_finished()
+
+    async def run_async(self, sender, receiver):
+        if not self.wait_for_ack:
+            sender.send_msg(self.mode_msg)
+            return
+        future_ack = asyncio.wrap_future(receiver.expect_msg(self.ack_msg))
+        sender.send_msg(self.mode_msg)
+        await future_ack
@@ -1,3 +1,5 @@
+import asyncio
+
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages import Takeoff, CommandAck
 
@@ -25,3 +27,8 @@ class TakeoffProtocol(MAVProtocol):
         future_ack = receiver.wait_for_msg(self.ack_msg, blocking=False)
         sender.send_msg(self.takeoff_msg)
         future_ack.wait_until_finished()
+
+    async def run_async(self, sender, receiver):
+        future_ack = asyncio.wrap_future(receiver.expect_msg(self.ack_msg))
+        sender.send_msg(self.takeoff_msg)
+        await future_ack
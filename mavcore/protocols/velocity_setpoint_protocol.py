@@ -1,3 +1,4 @@
+from mavcore.mav_clock import ClockSync
 from mavcore.mav_protocol import MAVProtocol
 from mavcore.messages import SetpointVelocity, CommandAck, LocalPositionNED
 from mavcore.types import Waypoint
@@ -23,11 +24,12 @@ class VelocitySetpointProtocol(MAVProtocol):
         self,
         current_pos: LocalPositionNED,
         waypoints: list[Waypoint],
-        boot_time_ms: int,
+        boot_time_ms: int | None = None,
         log_func=lambda msg: print(msg),
         mission_phase: str = "cruise",
         target_system: int = 1,
         target_component: int = 0,
+        sync: ClockSync | None = None,
     ):
         super().__init__()
         self.current_pos = current_pos
@@ -36,13 +38,20 @@ class VelocitySetpointProtocol(MAVProtocol):
         self.mission_phase = mission_phase
         self.target_system = target_system
         self.target_component = target_component
+        self.sync = sync
         self.log_func = log_func
 
         # Base speed for mission phase
         self.base_speed = self.SPEED_PROFILES.get(mission_phase, 10.0)
 
         self.velocity_msg = SetpointVelocity(
-            self.target_system, self.target_component, self.boot_time_ms, 0.0, 0.0, 0.0
+            self.target_system,
+            self.target_component,
+            self.boot_time_ms,
+            0.0,
+            0.0,
+            0.0,
+            sync=self.sync,
         )
 
         self.ack_msg = CommandAck()
@@ -1,2 +1,4 @@
 from mavcore.types.mav_pose import Pose as Pose
+from mavcore.types.mav_pose import PoseBatch as PoseBatch
+from mavcore.types.mav_pose_buffer import PoseBuffer as PoseBuffer
 from mavcore.types.waypoint import Waypoint as Waypoint
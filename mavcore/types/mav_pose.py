@@ -1,33 +1,81 @@
 import numpy as np
 from typing import TypeVar
-from typing import NamedTuple
 from dataclasses import dataclass
-from scipy.spatial.transform import Rotation, Slerp
+from functools import cached_property
+from scipy.spatial.transform import Rotation
+
+from mavcore.types import mav_quaternion as quaternion
 
 # This is solely for type hinting the interpolate method that can take another Pose as an argument
 Pose_T = TypeVar("Pose_T", bound="Pose")
 
 
-class Pose(NamedTuple):
+class Pose:
     """
     Position is represented as a 3D numpy array (x, y, z).
-    Rotation is represented as a scipy Rotation object (quaternion internally).
+    Rotation is stored as a unit quaternion numpy array (x, y, z, w), the scipy Rotation object, euler angles
+    and rotation vector are computed from it on first use and cached. Treat a Pose as immutable.
     Timestamp is in seconds (optional defaults to 0.0).
+
+    Pose(position, rotation, timestamp) takes a scipy Rotation, Pose(position, quat=quat, timestamp=...) an
+    (x, y, z, w) quaternion. Unpacks like a tuple: position, rotation, timestamp = pose.
     """
 
-    position: np.ndarray
-    rotation: Rotation
-    timestamp: float = 0.0  # in seconds
+    __slots__ = ("_cache", "_quat", "_rotation", "position", "timestamp")
+
+    def __init__(
+        self,
+        position: np.ndarray,
+        rotation: Rotation | None = None,
+        timestamp: float = 0.0,
+        quat: np.ndarray | None = None,
+    ):
+        if (rotation is None) == (quat is None):
+            raise ValueError("Pose needs exactly one of rotation and quat")
+        self.position = position
+        self.timestamp = timestamp  # in seconds
+        self._quat = quat
+        self._rotation = rotation
+        self._cache: dict | None = None
+
+    @property
+    def quat(self) -> np.ndarray:
+        """
+        Unit quaternion (x, y, z, w).
+        """
+        if self._quat is None:
+            self._quat = self._rotation.as_quat()
+        return self._quat
+
+    @property
+    def rotation(self) -> Rotation:
+        if self._rotation is None:
+            self._rotation = Rotation.from_quat(self._quat)
+        return self._rotation
+
+    def _cached(self, key, compute):
+        if self._cache is None:
+            self._cache = {}
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+    def __iter__(self):
+        return iter((self.position, self.rotation, self.timestamp))
+
+    def __repr__(self) -> str:
+        return f"Pose(position={self.position!r}, quat={self.quat!r}, timestamp={self.timestamp!r})"
 
     @staticmethod
     def identity() -> "Pose":
-        return Pose(np.zeros(3), Rotation.identity())
+        return Pose(np.zeros(3), quat=quaternion.IDENTITY.copy())
 
     def to_dict(self) -> dict:
         return {
             "timestamp": self.timestamp,
             "position": self.position.tolist(),
-            "rotation_quat": self.rotation.as_quat().tolist(),
+            "rotation_quat": self.quat.tolist(),
         }
 
     def as_euler(self, seq: str = "zyx", degrees: bool = True) -> np.ndarray:
@@ -35,7 +83,10 @@ class Pose(NamedTuple):
         Returns the rotation as euler angles in the specified sequence.
         Default is 'zyx' (yaw, pitch, roll) in degrees.
         """
-        return self.rotation.as_euler(seq, degrees=degrees)
+        return self._cached(
+            ("euler", seq, degrees),
+            lambda: self.rotation.as_euler(seq, degrees=degrees),
+        ).copy()
 
     def as_quat(self, scalar_first: bool = True) -> np.ndarray:
         """
@@ -43,22 +94,21 @@ class Pose(NamedTuple):
         Default is scalar first (w, x, y, z).
         If scalar_first is False, returns (x, y, z, w).
         """
-        quat = self.rotation.as_quat()  # returns (x, y, z, w)
         if scalar_first:
-            return np.array([quat[3], quat[0], quat[1], quat[2]])
-        return quat
+            return self.quat[[3, 0, 1, 2]]
+        return self.quat.copy()
 
     def as_rotvec(self) -> np.ndarray:
         """
         Returns the rotation as a rotation vector (axis-angle representation).
         """
-        return self.rotation.as_rotvec()
+        return self._cached("rotvec", lambda: quaternion.to_rotvec(self.quat)).copy()
 
     @staticmethod
     def from_dict(d: dict) -> "Pose":
         return Pose(
             position=np.array(d["position"]),
-            rotation=Rotation.from_quat(d["rotation_quat"]),
+            quat=quaternion.normalize(np.asarray(d["rotation_quat"], dtype=np.float64)),
             timestamp=d.get("timestamp", 0.0),
         )
 
@@ -69,9 +119,12 @@ class Pose(NamedTuple):
         order: bool = True,
         timestamp: float = 0.0,
     ) -> "Pose":
+        quat = np.asarray(quat, dtype=np.float64)
+        if order:
+            quat = quat[[1, 2, 3, 0]]
         return Pose(
             position=position,
-            rotation=Rotation.from_quat(quat, scalar_first=order),
+            quat=quaternion.normalize(quat),
             timestamp=timestamp,
         )
 
@@ -86,27 +139,68 @@ class Pose(NamedTuple):
                 For example, if proportion is -1, we go 1 unit "under" A (one unit is the delta between self and other)
         """
         new_pos = self.position + proportion * (other.position - self.position)
-        if 0 <= proportion <= 1:
-            return Pose(
-                position=new_pos,
-                rotation=Slerp(  # This interpolates two rotations. For complicated math reasons, it isn't as simple as interpolating vectors.
-                    [0, 1], Rotation.concatenate([self.rotation, other.rotation])
-                )(proportion),
-                timestamp=timestamp,
-            )
-        # extrapolate
-        rel_rot = other.rotation * self.rotation.inv()
         return Pose(
             position=new_pos,
-            rotation=(  # This extrapolates the rotation beyond 'self.rotation' in the direction of 'other.rotation' by 'proportion'
-                # No slerp here because we can scale directly for extrapolation
-                Rotation.from_rotvec(rel_rot.as_rotvec() * proportion) * self.rotation
-            ),
+            # Slerp between the rotations, or beyond them when extrapolating: (other self^-1)^proportion self
+            quat=quaternion.slerp(self.quat, other.quat, proportion),
             timestamp=timestamp,
         )
 
     def __eq__(self, other: "Pose"):
-        return (
-            np.allclose(self.position, other.position)
-            and self.rotation == other.rotation
+        # q and -q are the same rotation
+        return np.allclose(self.position, other.position) and bool(
+            np.isclose(abs(np.dot(self.quat, other.quat)), 1.0)
         )
+
+    __hash__ = None
+
+
+@dataclass(frozen=True)
+class PoseBatch:
+    """
+    N poses as arrays, returned by FullPose.get_local_positions.
+    positions: (N, 3), quats: (N, 4) unit quaternions (x, y, z, w), timestamps: (N,) in seconds.
+    batch[i] is the i-th Pose, batch.rotations one scipy Rotation holding all N (built on first use).
+    """
+
+    positions: np.ndarray
+    quats: np.ndarray
+    timestamps: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> Pose:
+        return Pose(
+            position=self.positions[index],
+            quat=self.quats[index],
+            timestamp=float(self.timestamps[index]),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @cached_property
+    def rotations(self) -> Rotation:
+        return Rotation.from_quat(self.quats)
+
+    def as_euler(self, seq: str = "zyx", degrees: bool = True) -> np.ndarray:
+        """
+        (N, 3) euler angles, see Pose.as_euler.
+        """
+        return self.rotations.as_euler(seq, degrees=degrees)
+
+    def as_quat(self, scalar_first: bool = True) -> np.ndarray:
+        """
+        (N, 4) quaternions, (w, x, y, z) by default, see Pose.as_quat.
+        """
+        if scalar_first:
+            return self.quats[:, [3, 0, 1, 2]]
+        return self.quats.copy()
+
+    def as_rotvec(self) -> np.ndarray:
+        """
+        (N, 3) rotation vectors.
+        """
+        return quaternion.to_rotvec(self.quats)
@@ -0,0 +1,148 @@
+import numpy as np
+
+from mavcore.types import mav_quaternion as quaternion
+from mavcore.types.mav_pose import Pose, PoseBatch
+
+# Slots kept beyond capacity and never shown to readers, a read is retried if more appends ran during it
+SPARE_SLOTS = 8
+
+
+class PoseBuffer:
+    """
+    Fixed capacity ring of timestamped poses in numpy arrays (timestamps, positions Nx3, quaternions Nx4 in
+    scipy's x, y, z, w order) for interpolating many timestamps in one call.
+
+    Every pose is written twice (slot i and i + ring size) so the newest poses are always one contiguous slice.
+    One thread appends, any thread reads without locking: the ring has SPARE_SLOTS more slots than the
+    capacity readers see and count is only advanced after both writes, so appends only reach the poses a
+    reader is using after SPARE_SLOTS of them. Readers copy what they need and retry if that many appends
+    ran meanwhile (e.g. the reader was descheduled), so results never mix poses being overwritten.
+    """
+
+    def __init__(self, capacity: int = 200):
+        if capacity < 2:
+            raise ValueError("capacity must be >= 2")
+        self.capacity = capacity
+        self._ring = capacity + SPARE_SLOTS
+        self._timestamps = np.zeros(2 * self._ring)
+        self._positions = np.zeros((2 * self._ring, 3))
+        self._quats = np.zeros((2 * self._ring, 4))
+        self.count = 0  # poses appended since creation
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp: float, position: np.ndarray, quat: np.ndarray):
+        """
+        Adds a pose. quat is (x, y, z, w).
+        """
+        slot = self.count % self._ring
+        for index in (slot, slot + self._ring):
+            self._timestamps[index] = timestamp
+            self._positions[index] = position
+            self._quats[index] = quat
+        self.count += 1
+
+    def _window(self, count: int) -> slice:
+        if count == 0:
+            return slice(0, 0)
+        end = (count - 1) % self._ring + self._ring + 1
+        return slice(end - min(count, self.capacity), end)
+
+    def _valid(self, count: int) -> bool:
+        """
+        True if the appends since count can not have overwritten the window of count.
+        """
+        return self.count - count < SPARE_SLOTS
+
+    def timestamps(self) -> np.ndarray:
+        """
+        Buffered timestamps, oldest first (a copy).
+        """
+        while True:
+            count = self.count
+            timestamps = self._timestamps[self._window(count)].copy()
+            if self._valid(count):
+                return timestamps
+
+    def latest(self) -> Pose | None:
+        while True:
+            count = self.count
+            if count == 0:
+                return None
+            index = self._window(count).stop - 1
+            pose = Pose(
+                position=self._positions[index].copy(),
+                quat=self._quats[index].copy(),
+                timestamp=float(self._timestamps[index]),
+            )
+            if self._valid(count):
+                return pose
+
+    def clear(self):
+        self.count = 0
+
+    def at(self, timestamp: float) -> Pose:
+        """
+        Pose at one timestamp, same result as interpolate([timestamp])[0] without the array overhead.
+        """
+        while True:
+            count = self.count
+            window = self._window(count)
+            if window.stop - window.start < 2:
+                raise ValueError("PoseBuffer needs at least 2 poses to interpolate")
+            buffered = self._timestamps[window]
+            after = min(
+                max(int(np.searchsorted(buffered, timestamp)), 1), len(buffered) - 1
+            )
+            before = window.start + after - 1
+            after += window.start
+            t0 = float(self._timestamps[before])
+            dt = float(self._timestamps[after]) - t0
+            proportion = (timestamp - t0) / dt if dt > 0 else 0.0
+            p0 = self._positions[before]
+            pose = Pose(
+                position=p0 + proportion * (self._positions[after] - p0),
+                quat=quaternion.slerp(
+                    self._quats[before], self._quats[after], proportion
+                ),
+                timestamp=timestamp,
+            )
+            if self._valid(count):
+                return pose
+
+    def interpolate(self, timestamps: np.ndarray) -> PoseBatch:
+        """
+        Poses at every timestamp, interpolated between the two buffered poses around it or extrapolated from
+        the first / last two poses when outside the buffer, like Pose.interpolate. Needs 2 or more poses.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        while True:
+            count = self.count
+            window = self._window(count)
+            if window.stop - window.start < 2:
+                raise ValueError("PoseBuffer needs at least 2 poses to interpolate")
+            buffered = self._timestamps[window]
+            # Neighbours: the pair around each timestamp, the first / last pair outside the buffer
+            after = np.clip(
+                np.searchsorted(buffered, timestamps, side="left"),
+                1,
+                len(buffered) - 1,
+            )
+            before = after - 1
+            t0 = buffered[before]
+            dt = buffered[after] - t0
+            proportion = np.divide(
+                timestamps - t0, dt, out=np.zeros_like(timestamps), where=dt > 0
+            )
+
+            positions = self._positions[window]
+            p0 = positions[before]
+            new_positions = p0 + proportion[:, None] * (positions[after] - p0)
+
+            quats = self._quats[window]
+            new_quats = quaternion.slerp(quats[before], quats[after], proportion)
+            if self._valid(count):
+                return PoseBatch(
+                    positions=new_positions, quats=new_quats, timestamps=timestamps
+                )
@@ -0,0 +1,155 @@
+"""
+Numpy quaternion helpers used by Pose instead of building scipy Rotation objects.
+Quaternions are (x, y, z, w) like scipy, every function works on one (4,) quaternion or an (N, 4) array,
+and the results match scipy.spatial.transform.Rotation.
+"""
+
+import math
+
+import numpy as np
+
+IDENTITY = np.array([0.0, 0.0, 0.0, 1.0])
+IDENTITY.flags.writeable = False
+
+
+def normalize(quat: np.ndarray) -> np.ndarray:
+    if quat.ndim == 1:
+        return quat / math.sqrt(quat.dot(quat))
+    return quat / np.linalg.norm(quat, axis=-1, keepdims=True)
+
+
+def multiply(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Hamilton product, the rotation q followed by p (Rotation p * Rotation q).
+    """
+    p_vec = p[..., :3]
+    q_vec = q[..., :3]
+    p_w = p[..., 3:]
+    q_w = q[..., 3:]
+    vec = p_w * q_vec + q_w * p_vec + np.cross(p_vec, q_vec)
+    w = p_w * q_w - np.sum(p_vec * q_vec, axis=-1, keepdims=True)
+    return np.concatenate([vec, w], axis=-1)
+
+
+def inverse(quat: np.ndarray) -> np.ndarray:
+    return quat * np.array([-1.0, -1.0, -1.0, 1.0])
+
+
+def to_rotvec(quat: np.ndarray) -> np.ndarray:
+    """
+    Rotation vector (axis * angle in radians, angle <= pi) of unit quaternions.
+    """
+    quat = np.where(quat[..., 3:] < 0, -quat, quat)
+    vec = quat[..., :3]
+    angle = 2.0 * np.arctan2(np.linalg.norm(vec, axis=-1), quat[..., 3])
+    small = angle <= 1e-3
+    angle2 = angle * angle
+    # Taylor series of angle / sin(angle / 2) near 0
+    scale = np.where(
+        small,
+        2.0 + angle2 / 12.0 + 7.0 * angle2 * angle2 / 2880.0,
+        angle / np.sin(np.where(small, 1.0, angle / 2.0)),
+    )
+    return scale[..., None] * vec
+
+
+def from_rotvec(rotvec: np.ndarray) -> np.ndarray:
+    angle = np.linalg.norm(rotvec, axis=-1)
+    small = angle <= 1e-3
+    angle2 = angle * angle
+    # Taylor series of sin(angle / 2) / angle near 0
+    scale = np.where(
+        small,
+        0.5 - angle2 / 48.0 + angle2 * angle2 / 3840.0,
+        np.sin(angle / 2.0) / np.where(small, 1.0, angle),
+    )
+    return np.concatenate(
+        [scale[..., None] * rotvec, np.cos(angle / 2.0)[..., None]], axis=-1
+    )
+
+
+def _rotvec_scale(angle: float) -> float:
+    if angle <= 1e-3:
+        angle2 = angle * angle
+        return 2.0 + angle2 / 12.0 + 7.0 * angle2 * angle2 / 2880.0
+    return angle / math.sin(angle / 2.0)
+
+
+def _slerp_one(q0: np.ndarray, q1: np.ndarray, proportion: float) -> np.ndarray:
+    """
+    slerp of two single quaternions in plain floats, numpy call overhead dominates at this size.
+    """
+    x0, y0, z0, w0 = q0.tolist()
+    x1, y1, z1, w1 = q1.tolist()
+    # relative = q1 * q0^-1
+    x = w0 * x1 - w1 * x0 - (y1 * z0 - z1 * y0)
+    y = w0 * y1 - w1 * y0 - (z1 * x0 - x1 * z0)
+    z = w0 * z1 - w1 * z0 - (x1 * y0 - y1 * x0)
+    w = w1 * w0 + x1 * x0 + y1 * y0 + z1 * z0
+    if w < 0.0:
+        x, y, z, w = -x, -y, -z, -w
+    angle = 2.0 * math.atan2(math.sqrt(x * x + y * y + z * z), w)
+    # rotation vector of relative, scaled by proportion, back to a quaternion
+    scale = _rotvec_scale(angle) * proportion
+    angle *= abs(proportion)
+    if angle <= 1e-3:
+        angle2 = angle * angle
+        half = 0.5 - angle2 / 48.0 + angle2 * angle2 / 3840.0
+    else:
+        half = math.sin(angle / 2.0) / angle
+    scale *= half
+    x, y, z, w = x * scale, y * scale, z * scale, math.cos(angle / 2.0)
+    # result = exp * q0
+    return np.array(
+        [
+            w * x0 + w0 * x + (y * z0 - z * y0),
+            w * y0 + w0 * y + (z * x0 - x * z0),
+            w * z0 + w0 * z + (x * y0 - y * x0),
+            w * w0 - (x * x0 + y * y0 + z * z0),
+        ]
+    )
+
+
+def _rotate_one(quat: np.ndarray, rotvec: np.ndarray) -> np.ndarray:
+    """
+    rotate_body of a single quaternion and rotation vector in plain floats.
+    """
+    x0, y0, z0, w0 = quat.tolist()
+    rx, ry, rz = rotvec.tolist()
+    angle = math.sqrt(rx * rx + ry * ry + rz * rz)
+    if angle <= 1e-3:
+        angle2 = angle * angle
+        half = 0.5 - angle2 / 48.0 + angle2 * angle2 / 3840.0
+    else:
+        half = math.sin(angle / 2.0) / angle
+    x, y, z, w = rx * half, ry * half, rz * half, math.cos(angle / 2.0)
+    # result = quat * exp
+    return np.array(
+        [
+            w0 * x + w * x0 + (y0 * z - z0 * y),
+            w0 * y + w * y0 + (z0 * x - x0 * z),
+            w0 * z + w * z0 + (x0 * y - y0 * x),
+            w0 * w - (x0 * x + y0 * y + z0 * z),
+        ]
+    )
+
+
+def rotate_body(quat: np.ndarray, rotvec: np.ndarray) -> np.ndarray:
+    """
+    quat followed by a rotation by rotvec about the body axes (quat * exp(rotvec)),
+    e.g. propagating an attitude with body angular rates: rotate_body(quat, rates * dt).
+    """
+    if quat.ndim == 1 and rotvec.ndim == 1:
+        return _rotate_one(quat, rotvec)
+    return multiply(quat, from_rotvec(rotvec))
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, proportion: np.ndarray | float) -> np.ndarray:
+    """
+    Rotation proportion of the way from q0 to q1 along the shortest arc, extrapolated for proportion < 0 or > 1.
+    (q1 q0^-1)^proportion q0, the same as scipy's Slerp inside [0, 1].
+    """
+    if q0.ndim == 1 and q1.ndim == 1 and np.ndim(proportion) == 0:
+        return _slerp_one(q0, q1, float(proportion))
+    relative = to_rotvec(multiply(q1, inverse(q0)))
+    return multiply(from_rotvec(relative * np.asarray(proportion)[..., None]), q0)
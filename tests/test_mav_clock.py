@@ -0,0 +1,19 @@
+import time
+
+from mavcore.mav_clock import ClockSync, time_boot_ms
+
+
+def test_try_boot_to_unix_without_samples():
+    sync = ClockSync()
+    assert sync.try_boot_to_unix(10.0) is None
+    assert sync.try_now_boot_ms() is None
+    assert time_boot_ms(None, sync) == 0
+
+
+def test_try_boot_to_unix_matches_passive_sample():
+    sync = ClockSync()
+    received = time.time()
+    sync.add_passive(10_000, received)
+    assert abs(sync.try_boot_to_unix(10.0) - received) < 1e-3
+    assert abs(sync.try_now_boot_ms() - 10_000) < 50
+    assert abs(time_boot_ms(None, sync) - 10_000) < 50
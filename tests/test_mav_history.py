@@ -0,0 +1,26 @@
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+from mavcore.mav_history import History
+
+
+def test_append_writes_fields_and_wraps():
+    history = History("ATTITUDE", 4, fields=["roll", "yaw"])
+    for i in range(6):
+        history.append(
+            1000.0 + i, mavlink.MAVLink_attitude_message(i, i, 0.0, -i, 0.0, 0.0, 0.0)
+        )
+    window = history.latest()
+    assert list(window["timestamp"]) == [1002.0, 1003.0, 1004.0, 1005.0]
+    assert list(window["roll"]) == [2.0, 3.0, 4.0, 5.0]
+    assert list(window["yaw"]) == [-2.0, -3.0, -4.0, -5.0]
+
+
+def test_append_array_field():
+    history = History("ESC_TELEMETRY_1_TO_4", 2, fields=["temperature", "rpm"])
+    msg = mavlink.MAVLink_esc_telemetry_1_to_4_message(
+        [30, 31, 32, 33], [0] * 4, [0] * 4, [0] * 4, [1000, 1001, 1002, 1003], [0] * 4
+    )
+    history.append(1000.0, msg)
+    sample = history.latest(1)[0]
+    assert list(sample["temperature"]) == [30, 31, 32, 33]
+    assert list(sample["rpm"]) == [1000, 1001, 1002, 1003]
@@ -0,0 +1,19 @@
+from mavcore.messages.local_position_msg import LocalPosition
+
+
+def test_publish_stamps_hand_filled_snapshot():
+    msg = LocalPosition()
+    msg.time_boot_ms = 1500
+    msg.x, msg.y, msg.z = 1.0, 2.0, -3.0
+    msg.publish(1001.5)
+    state = msg.snapshot()
+    assert state.timestamp == 1001.5
+    assert state.time_boot_ms == 1500
+    assert state.position_ned == (1.0, 2.0, -3.0)
+
+
+def test_publish_defaults_to_message_timestamp():
+    msg = LocalPosition()
+    msg.timestamp = 1002.0
+    msg.publish()
+    assert msg.snapshot().timestamp == 1002.0
@@ -0,0 +1,31 @@
+from mavcore.mav_message import SendPriority
+from mavcore.mav_outbox import Outbox
+
+
+def gate_closed_for(closed: SendPriority):
+    return lambda lane, item: 1.0 if lane == closed else 0.0
+
+
+def test_gated_control_does_not_block_normal():
+    outbox = Outbox(gate=gate_closed_for(SendPriority.CONTROL))
+    outbox.put("setpoint", SendPriority.CONTROL)
+    outbox.put("command", SendPriority.NORMAL)
+    assert outbox.get(timeout=0.0) == "command"
+    assert outbox.get(timeout=0.0) is None
+    assert outbox.qsize()["CONTROL"] == 1
+
+
+def test_gated_normal_does_not_block_bulk():
+    outbox = Outbox(gate=gate_closed_for(SendPriority.NORMAL))
+    outbox.put("command", SendPriority.NORMAL)
+    outbox.put("rtk", SendPriority.BULK)
+    assert outbox.get(timeout=0.0) == "rtk"
+    assert outbox.qsize()["NORMAL"] == 1
+
+
+def test_control_goes_first_when_open():
+    outbox = Outbox(gate=lambda lane, item: 0.0)
+    outbox.put("command", SendPriority.NORMAL)
+    outbox.put("setpoint", SendPriority.CONTROL)
+    assert outbox.get(timeout=0.0) == "setpoint"
+    assert outbox.get(timeout=0.0) == "command"
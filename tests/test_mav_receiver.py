@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+from mavcore.mav_message import MAVMessage
+from mavcore.mav_receiver import Receiver
+
+
+class BrokenHeartbeat(MAVMessage):
+    def __init__(self):
+        super().__init__("HEARTBEAT")
+
+    def decode(self, msg):
+        raise ValueError("malformed frame")
+
+
+def heartbeat():
+    msg = mavlink.MAVLink_heartbeat_message(2, 3, 0, 0, 0, 3)
+    msg._header = mavlink.MAVLink_header(msg.id, srcSystem=1, srcComponent=1)
+    return msg
+
+
+def test_decode_failure_fails_pending_wait():
+    receiver = Receiver()
+    waiter = BrokenHeartbeat()
+    future = receiver.expect_msg(waiter)
+    receiver.deliver(1000.0, heartbeat())
+
+    assert waiter.wait_until_finished(timeout=2.0) is False
+    with pytest.raises(ValueError, match="malformed frame"):
+        future.result(timeout=0)
+    assert waiter.decode_errors == 1
+    waiter.stop_callback_thread()
+
+
+def test_blocking_wait_returns_after_decode_failure():
+    receiver = Receiver()
+    waiter = BrokenHeartbeat()
+    delivery = threading.Timer(0.1, receiver.deliver, (1000.0, heartbeat()))
+    delivery.start()
+    waiting = threading.Thread(
+        target=receiver.wait_for_msg, args=(waiter,), daemon=True
+    )
+    waiting.start()
+
+    waiting.join(timeout=2.0)
+    assert not waiting.is_alive()
+    assert waiter.is_finished()
+    waiter.stop_callback_thread()
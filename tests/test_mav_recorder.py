@@ -0,0 +1,24 @@
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+from mavcore.mav_recorder import Recorder, TelemetryLog
+
+
+def record_heartbeats(path: str, count: int = 3):
+    mav = mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    recorder = Recorder(path)
+    for i in range(count):
+        frame = mavlink.MAVLink_heartbeat_message(2, 3, 0, 0, 0, 3).pack(mav)
+        recorder.record(1000.0 + i, mavlink.MAVLINK_MSG_ID_HEARTBEAT, frame)
+    recorder.stop()
+
+
+def test_empty_filters_yield_nothing(tmp_path):
+    path = str(tmp_path / "flight.mavlog")
+    record_heartbeats(path)
+    with TelemetryLog(path) as log:
+        assert len(list(log.frames())) == 3
+        assert list(log.frames(msgids=[])) == []
+        assert list(log.messages(types=["UNKNOWN_NAME"])) == []
+        assert [msg.get_type() for _, msg in log.messages(types=["HEARTBEAT"])] == [
+            "HEARTBEAT"
+        ] * 3